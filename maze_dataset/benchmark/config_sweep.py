@@ -1,6 +1,7 @@
 """Benchmarking of how successful maze generation is for various values of percolation"""
 
 import functools
+import inspect
 import json
 import warnings
 from pathlib import Path
@@ -21,14 +22,33 @@ from muutils.parallel import run_maybe_parallel
 from zanj import ZANJ
 
 from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset.maze_dataset import MazeGenerationExecutor
 from maze_dataset.generation import LatticeMazeGenerators
 
 SweepReturnType = TypeVar("SweepReturnType")
 ParamType = TypeVar("ParamType")
-AnalysisFunc = Callable[[MazeDatasetConfig], SweepReturnType]
+AnalysisFunc = Callable[..., SweepReturnType]
+"""function analyzing a config, called as `analyze_func(cfg)`.
+to be used with an executor, it must also take an `executor` keyword argument"""
+
+
+def _accepts_executor(analyze_func: Callable) -> bool:
+	"""whether `analyze_func` can be called with an `executor` keyword argument"""
+	try:
+		parameters = inspect.signature(analyze_func).parameters.values()
+	except (TypeError, ValueError):
+		return False
+	return any(
+		p.kind == inspect.Parameter.VAR_KEYWORD
+		or (p.name == "executor" and p.kind != inspect.Parameter.POSITIONAL_ONLY)
+		for p in parameters
+	)
 
 
-def dataset_success_fraction(cfg: MazeDatasetConfig) -> float:
+def dataset_success_fraction(
+	cfg: MazeDatasetConfig,
+	executor: MazeGenerationExecutor | None = None,
+) -> float:
 	"""empirical success fraction of maze generation
 
 	for use as an `analyze_func` in `sweep()`
@@ -39,6 +59,7 @@ def dataset_success_fraction(cfg: MazeDatasetConfig) -> float:
 		load_local=False,
 		save_local=False,
 		verbose=False,
+		executor=executor,
 	)
 
 	return len(dataset) / cfg.n_mazes
@@ -53,7 +74,9 @@ def sweep(
 	cfg_base: MazeDatasetConfig,
 	param_values: list[ParamType],
 	param_key: str,
-	analyze_func: Callable[[MazeDatasetConfig], SweepReturnType],
+	analyze_func: AnalysisFunc,
+	*,
+	executor: MazeGenerationExecutor | None = None,
 ) -> list[SweepReturnType]:
 	"""given a base config, parameter values list, key, and analysis function, return the results of the analysis function for each parameter value
 
@@ -64,14 +87,27 @@ def sweep(
 		list of values to try
 	- `param_key : str`
 		value to modify in `cfg_base`
-	- `analyze_func : Callable[[MazeDatasetConfig], SweepReturnType]`
+	- `analyze_func : AnalysisFunc`
 		function which analyzes the resulting config. originally built for `dataset_success_fraction`
+	- `executor : MazeGenerationExecutor | None`
+		if given, passed as `executor=` to `analyze_func`, so every parameter value reuses the same pool.
+		`analyze_func` must then take an `executor` keyword argument
+		(defaults to `None`)
 
 	# Returns:
 	- `list[SweepReturnType]`
 		_description_
+
+	# Raises:
+	- `TypeError` : if an `executor` is given, but `analyze_func` doesn't take one
 	"""
 	outputs: list[SweepReturnType] = []
+	analyze: Callable[[MazeDatasetConfig], SweepReturnType] = analyze_func
+	if executor is not None:
+		if not _accepts_executor(analyze_func):
+			err_msg: str = f"an executor was given, but {analyze_func = } has no `executor` keyword argument"
+			raise TypeError(err_msg)
+		analyze = functools.partial(analyze_func, executor=executor)
 
 	for p in param_values:
 		# update the config
@@ -82,7 +118,7 @@ def sweep(
 		)
 		cfg_test: MazeDatasetConfig = MazeDatasetConfig.load(cfg_dict)
 
-		outputs.append(analyze_func(cfg_test))
+		outputs.append(analyze(cfg_test))
 
 	return outputs
 
@@ -209,8 +245,10 @@ class SweepResult(SerializableDataclass, Generic[ParamType, SweepReturnType]):
 		configs: list[MazeDatasetConfig],
 		param_values: list[ParamType],
 		param_key: str,
-		analyze_func: Callable[[MazeDatasetConfig], SweepReturnType],
+		analyze_func: AnalysisFunc,
 		parallel: bool | int = False,
+		*,
+		executor: MazeGenerationExecutor | None = None,
 		**kwargs,
 	) -> "SweepResult":
 		"""Analyze success rate of maze generation for different percolation values
@@ -220,10 +258,20 @@ class SweepResult(SerializableDataclass, Generic[ParamType, SweepReturnType]):
 		configs to try
 		- `param_values : np.ndarray`
 		numpy array of values to try
+		- `executor : MazeGenerationExecutor | None`
+		executor passed to `sweep`, only usable with `parallel=False`.
+		`analyze_func` must then take an `executor` keyword argument
 
 		# Returns:
 		- `SweepResult`
+
+		# Raises:
+		- `ValueError` : if both `parallel` and `executor` are given
 		"""
+		if parallel and executor is not None:
+			err_msg: str = "cannot use an `executor` with `parallel`, since executors cannot be sent to other processes. parallelize inside the executor instead"
+			raise ValueError(err_msg)
+
 		n_pvals: int = len(param_values)
 
 		result_values_list: list[float] = run_maybe_parallel(
@@ -233,6 +281,7 @@ class SweepResult(SerializableDataclass, Generic[ParamType, SweepReturnType]):
 				param_values=param_values,
 				param_key=param_key,
 				analyze_func=analyze_func,
+				executor=executor,
 			),
 			iterable=configs,
 			keep_ordered=True,
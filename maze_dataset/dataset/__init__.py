@@ -8,11 +8,15 @@ from maze_dataset.dataset.maze_dataset import MazeDataset, MazeDatasetConfig
 
 __all__ = [
 	# submodules
+	"cache",
 	"collected_dataset",
 	"configs",
 	"dataset",
+	"encoded",
+	"maze_arrays",
 	"maze_dataset",
 	"rasterized",
+	"shared",
 	# dataset classes
 	"MazeDataset",
 	"MazeDatasetConfig",
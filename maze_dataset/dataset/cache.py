@@ -0,0 +1,435 @@
+"""size-bounded local caches, with least recently used eviction
+
+- `DatasetCache` holds datasets, indexed by config hash. pass one to
+	`MazeDataset.from_config(cfg, cache=DatasetCache(...))` to look datasets up through a single
+	on-disk index instead of the filesystem
+- `TokenizationCache` holds datasets encoded to token ids by `MazeDataset.encode_all`, indexed by
+	the data hash of the dataset, the tokenizer, and the seed. cached token ids are memory mapped
+
+both evict the least recently used entries once the cache grows past a byte budget. the index is
+protected by a lock file, so several processes can share a cache directory. lookups read a copy
+of the index kept in memory, which is only reloaded when the index file changes, and access times
+are written back in batches, see `_LRUCache.flush`.
+
+> [!NOTE]
+> locking uses `fcntl`, and is skipped on platforms without it
+"""
+
+import contextlib
+import json
+import os
+import shutil
+import time
+import typing
+from pathlib import Path
+
+import numpy as np
+from jaxtyping import Int
+from muutils.misc import stable_hash
+
+try:
+	import fcntl
+except ImportError:  # pragma: no cover
+	fcntl = None  # type: ignore[assignment]
+
+if typing.TYPE_CHECKING:
+	from zanj import ZANJ
+
+	from maze_dataset.dataset.dataset import GPTDataset, GPTDatasetConfig
+	from maze_dataset.tokenization import MazeTokenizer, MazeTokenizerModular
+
+DATASET_CACHE_INDEX_FNAME: str = "_cache_index.json"
+"name of the index file in the cache directory"
+
+DATASET_CACHE_LOCK_FNAME: str = "_cache_index.lock"
+"name of the lock file in the cache directory"
+
+CACHE_ACCESS_FLUSH_INTERVAL: int = 64
+"number of lookups after which the recorded access times are written to the index"
+
+
+class _DatasetCachePrefixFields(typing.TypedDict, total=False):
+	n_mazes: int
+	prefix_key: str
+
+
+class DatasetCacheEntry(_DatasetCachePrefixFields):
+	"""entry in the index of a `DatasetCache`
+
+	entries for datasets which can be sliced or extended (see `DatasetCache.prefix_key`)
+	also record `n_mazes` and `prefix_key`
+	"""
+
+	fname: str
+	size: int
+	last_access: float
+
+
+class _LRUCache:
+	"""base of the caches in this module: a directory, and an index of its entries
+
+	the index at `root / DATASET_CACHE_INDEX_FNAME` maps each key to the file name, size in
+	bytes, and last access time of the entry. lookups only read the index, and eviction uses
+	the recorded sizes, so no file in the cache directory is ever stat-ed except the one being added.
+
+	lookups don't take the lock: they use the copy of the index in memory, reloading it only if
+	the index file was replaced since. the access times they record are kept in memory, and
+	written to the index with the next change to it, or every `CACHE_ACCESS_FLUSH_INTERVAL`
+	lookups. call `flush` to write them out sooner, e.g. before exiting
+	"""
+
+	def __init__(self, root: Path | str, max_bytes: int | None = None) -> None:
+		"create the cache, making the directory if needed"
+		self.root: Path = Path(root)
+		self.max_bytes: int | None = max_bytes
+		self.root.mkdir(parents=True, exist_ok=True)
+		self._index_memo: (
+			tuple[tuple[int, int, int], dict[str, DatasetCacheEntry]] | None
+		) = None
+		self._pending_access: dict[str, float] = dict()
+		self._n_pending_lookups: int = 0
+
+	@property
+	def index_path(self) -> Path:
+		"""path to the index file"""
+		return self.root / DATASET_CACHE_INDEX_FNAME
+
+	@contextlib.contextmanager
+	def _locked_index(
+		self,
+		write: bool = True,
+	) -> typing.Iterator[dict[str, DatasetCacheEntry]]:
+		"""hold the lock, and yield the index. if `write`, the (modified) index is saved on exit"""
+		with open(self.root / DATASET_CACHE_LOCK_FNAME, "a") as lock_file:
+			if fcntl is not None:
+				fcntl.flock(lock_file, fcntl.LOCK_EX)
+			try:
+				index: dict[str, DatasetCacheEntry] = self._read_index()
+				if write:
+					self._apply_pending_access(index)
+				yield index
+				if write:
+					self._write_index(index)
+					self._pending_access.clear()
+					self._n_pending_lookups = 0
+			finally:
+				if fcntl is not None:
+					fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+	def _read_index(self) -> dict[str, DatasetCacheEntry]:
+		try:
+			with open(self.index_path) as f:
+				return json.load(f)["entries"]
+		except FileNotFoundError:
+			return dict()
+
+	def _write_index(self, index: dict[str, DatasetCacheEntry]) -> None:
+		# write to a temp file and move it, so readers never see a partial index
+		temp_path: Path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+		with open(temp_path, "w") as f:
+			json.dump({"entries": index}, f)
+		temp_path.replace(self.index_path)
+
+	def _cached_index(self) -> dict[str, DatasetCacheEntry]:
+		"""the index as last read, reloaded if the index file was replaced since. don't modify it"""
+		try:
+			stat: os.stat_result = self.index_path.stat()
+		except FileNotFoundError:
+			return dict()
+		stat_key: tuple[int, int, int] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+		if self._index_memo is None or self._index_memo[0] != stat_key:
+			self._index_memo = (stat_key, self._read_index())
+		return self._index_memo[1]
+
+	def _record_access(self, key: str) -> None:
+		"""mark `key` as used now, writing the access times out every `CACHE_ACCESS_FLUSH_INTERVAL` lookups"""
+		self._pending_access[key] = time.time()
+		self._n_pending_lookups += 1
+		if self._n_pending_lookups >= CACHE_ACCESS_FLUSH_INTERVAL:
+			self.flush()
+
+	def _apply_pending_access(self, index: dict[str, DatasetCacheEntry]) -> None:
+		"""update the access times in `index` with those recorded since the last write"""
+		for key, last_access in self._pending_access.items():
+			if key in index:
+				index[key]["last_access"] = max(index[key]["last_access"], last_access)
+
+	def flush(self) -> None:
+		"""write the access times recorded by lookups to the index"""
+		if self._pending_access:
+			with self._locked_index():
+				pass
+
+	def total_bytes(self) -> int:
+		"""total size of all cached entries, according to the index"""
+		return sum(entry["size"] for entry in self._cached_index().values())
+
+	def entries(self) -> dict[str, DatasetCacheEntry]:
+		"""copy of the index, including access times not yet written to it"""
+		index: dict[str, DatasetCacheEntry] = {
+			key: entry.copy() for key, entry in self._cached_index().items()
+		}
+		self._apply_pending_access(index)
+		return index
+
+	def _evict(self, index: dict[str, DatasetCacheEntry], keep: str) -> None:
+		"""remove least recently used entries (other than `keep`) until under `max_bytes`"""
+		if self.max_bytes is None:
+			return
+		total: int = sum(entry["size"] for entry in index.values())
+		for key in sorted(index, key=lambda k: index[k]["last_access"]):
+			if total <= self.max_bytes:
+				break
+			if key == keep:
+				continue
+			entry: DatasetCacheEntry = index.pop(key)
+			self._delete(entry)
+			total -= entry["size"]
+
+	def _delete(self, entry: DatasetCacheEntry) -> None:
+		"""delete the file(s) of an entry which was removed from the index"""
+		(self.root / entry["fname"]).unlink(missing_ok=True)
+
+
+class DatasetCache(_LRUCache):
+	"""size-bounded local cache of datasets, keyed by the full hash of their config
+
+	# Parameters:
+	- `root : Path | str`
+		directory holding the datasets and the index
+	- `max_bytes : int | None`
+		evict least recently used datasets when the total size goes over this. `None` for no limit
+		(defaults to `None`)
+	"""
+
+	@staticmethod
+	def key(cfg: "GPTDatasetConfig") -> str:
+		"""cache key for a config: the hex digest of its full `stable_hash_cfg`"""
+		return f"{cfg.stable_hash_cfg():x}"  # type: ignore[attr-defined]
+
+	def path_for(self, cfg: "GPTDatasetConfig") -> Path:
+		"""where the dataset for `cfg` is stored in the cache"""
+		return self.root / f"{cfg.to_fname()}.zanj"
+
+	@staticmethod
+	def prefix_key(cfg: "GPTDatasetConfig") -> str | None:
+		"""key shared by the configs which differ from `cfg` only in `n_mazes`
+
+		`None` if `cfg` has no `n_mazes`, or has filters other than `collect_generation_meta`
+		applied, since then the dataset can't be sliced or extended
+		"""
+		cfg_ser: dict = json.loads(json.dumps(cfg.serialize()))
+		if "n_mazes" not in cfg_ser or any(
+			filter_info["name"] != "collect_generation_meta"
+			for filter_info in cfg_ser.get("applied_filters", [])
+		):
+			return None
+		comparable: dict = {
+			k: v for k, v in cfg_ser.items() if k not in ("n_mazes", "applied_filters")
+		}
+		return f"{stable_hash(json.dumps(comparable, sort_keys=True)):x}"
+
+	def get(self, cfg: "GPTDatasetConfig") -> Path | None:
+		"""path of the cached dataset for `cfg`, or `None` if not cached. marks it as recently used"""
+		key: str = self.key(cfg)
+		entry: DatasetCacheEntry | None = self._cached_index().get(key)
+		if entry is None:
+			return None
+		self._record_access(key)
+		return self.root / entry["fname"]
+
+	def prefix_candidates(self, cfg: "GPTDatasetConfig") -> list[tuple[int, Path]]:
+		"""`(n_mazes, path)` of the cached datasets whose configs differ from `cfg` only in `n_mazes`
+
+		found through the `prefix_key` recorded in the index, so no dataset file is opened
+		"""
+		prefix_key: str | None = self.prefix_key(cfg)
+		if prefix_key is None:
+			return list()
+		return [
+			(entry["n_mazes"], self.root / entry["fname"])
+			for entry in self._cached_index().values()
+			if entry.get("prefix_key") == prefix_key
+		]
+
+	def __contains__(self, cfg: "GPTDatasetConfig") -> bool:
+		"""whether `cfg` is in the index, without marking it as used"""
+		return self.key(cfg) in self._cached_index()
+
+	def put(
+		self,
+		cfg: "GPTDatasetConfig",
+		dataset: "GPTDataset",
+		zanj: "ZANJ | None" = None,
+	) -> Path:
+		"""save `dataset` as the entry for `cfg` at `path_for(cfg)`, then evict down to `max_bytes`
+
+		the dataset is written to a temp file, which is moved into place while holding the lock,
+		so other processes never read a partially written dataset. the entry being added is
+		never evicted, even if it alone is over the budget. returns the path of the dataset
+		"""
+		path: Path = self.path_for(cfg)
+		# hidden, so it never matches the name of a dataset
+		temp_path: Path = self.root / f".{path.stem}.{os.getpid()}.tmp.zanj"
+		dataset.save(temp_path, zanj=zanj)
+
+		key: str = self.key(cfg)
+		entry: DatasetCacheEntry = DatasetCacheEntry(
+			fname=path.name,
+			size=temp_path.stat().st_size,
+			last_access=time.time(),
+		)
+		prefix_key: str | None = self.prefix_key(cfg)
+		if prefix_key is not None:
+			entry["n_mazes"] = cfg.n_mazes  # type: ignore[attr-defined]
+			entry["prefix_key"] = prefix_key
+		with self._locked_index() as index:
+			temp_path.replace(path)
+			index[key] = entry
+			self._evict(index, keep=key)
+		return path
+
+	def remove(self, cfg: "GPTDatasetConfig") -> None:
+		"""remove the dataset for `cfg` from the index, and delete its file"""
+		with self._locked_index() as index:
+			entry: DatasetCacheEntry | None = index.pop(self.key(cfg), None)
+			if entry is not None:
+				self._delete(entry)
+
+
+TOKENIZATION_CACHE_FNAMES: tuple[str, str] = ("token_ids.npy", "offsets.npy")
+"names of the files holding the token ids and offsets, in the directory of each `TokenizationCache` entry"
+
+
+class TokenizationCache(_LRUCache):
+	"""size-bounded local cache of datasets encoded to token ids, as by `MazeDataset.encode_all`
+
+	each entry is a directory holding the flat token id buffer and the offsets as `.npy` files,
+	which are memory mapped when read. entries are keyed by the data hash of the dataset, the
+	tokenizer (its `hash_b64`, or name for a legacy `MazeTokenizer`), and the seed used for
+	shuffling, see `key`.
+
+	pass one as `cache=` to `MazeDataset.encode_all`, or enable it for all datasets with
+	`set_tokenization_cache`, which also makes `MazeDataset.as_tokens` use it
+
+	# Parameters:
+	- `root : Path | str`
+		directory holding the entries and the index
+	- `max_bytes : int | None`
+		evict least recently used entries when the total size goes over this. `None` for no limit
+		(defaults to `None`)
+	"""
+
+	@staticmethod
+	def key(
+		data_hash: int,
+		tokenizer: "MazeTokenizer | MazeTokenizerModular",
+		seed: int,
+	) -> str:
+		"""cache key, which is also the name of the entry's directory"""
+		tokenizer_key: str = (
+			tokenizer.hash_b64()  # type: ignore[union-attr]
+			if hasattr(tokenizer, "hash_b64")
+			else tokenizer.name
+		)
+		return f"{data_hash:016x}-{tokenizer_key}-{seed}"
+
+	def get(
+		self,
+		data_hash: int,
+		tokenizer: "MazeTokenizer | MazeTokenizerModular",
+		seed: int,
+	) -> tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]] | None:
+		"""memory mapped `(token_ids, offsets)`, or `None` if not cached. marks the entry as recently used"""
+		key: str = self.key(data_hash, tokenizer, seed)
+		entry: DatasetCacheEntry | None = self._cached_index().get(key)
+		if entry is None:
+			return None
+		try:
+			# plain arrays rather than `np.memmap`, which slices slower
+			arrays: list[np.ndarray] = [
+				np.asarray(np.load(self.root / entry["fname"] / fname, mmap_mode="r"))
+				for fname in TOKENIZATION_CACHE_FNAMES
+			]
+		except FileNotFoundError:
+			# deleted from outside the cache
+			with self._locked_index() as index:
+				removed: DatasetCacheEntry | None = index.pop(key, None)
+				if removed is not None:
+					self._delete(removed)
+			return None
+		self._record_access(key)
+		return arrays[0], arrays[1]
+
+	def put(
+		self,
+		data_hash: int,
+		tokenizer: "MazeTokenizer | MazeTokenizerModular",
+		seed: int,
+		token_ids: np.ndarray,
+		offsets: Int[np.ndarray, " n_mazes_plus_1"],
+	) -> None:
+		"""save encoded token ids, then evict down to `max_bytes`
+
+		the entry being added is never evicted, even if it alone is over the budget
+		"""
+		key: str = self.key(data_hash, tokenizer, seed)
+		# write to a temp directory and move it, so readers never see a partial entry
+		temp_path: Path = self.root / f"{key}.{os.getpid()}.tmp"
+		temp_path.mkdir(exist_ok=True)
+		size: int = 0
+		for fname, array in zip(
+			TOKENIZATION_CACHE_FNAMES,
+			(token_ids, offsets),
+			strict=True,
+		):
+			np.save(temp_path / fname, array)
+			size += (temp_path / fname).stat().st_size
+
+		with self._locked_index() as index:
+			shutil.rmtree(self.root / key, ignore_errors=True)
+			temp_path.replace(self.root / key)
+			index[key] = DatasetCacheEntry(
+				fname=key,
+				size=size,
+				last_access=time.time(),
+			)
+			self._evict(index, keep=key)
+
+	def remove(
+		self,
+		data_hash: int,
+		tokenizer: "MazeTokenizer | MazeTokenizerModular",
+		seed: int,
+	) -> None:
+		"""remove an entry from the index, and delete its files"""
+		with self._locked_index() as index:
+			entry: DatasetCacheEntry | None = index.pop(
+				self.key(data_hash, tokenizer, seed),
+				None,
+			)
+			if entry is not None:
+				self._delete(entry)
+
+	def _delete(self, entry: DatasetCacheEntry) -> None:
+		"""delete the directory of an entry. arrays already memory mapped from it stay valid"""
+		shutil.rmtree(self.root / entry["fname"], ignore_errors=True)
+
+
+_TOKENIZATION_CACHE: TokenizationCache | None = None
+
+
+def set_tokenization_cache(cache: TokenizationCache | None) -> TokenizationCache | None:
+	"""use `cache` by default in `MazeDataset.encode_all` and `MazeDataset.as_tokens`, or stop if `None`
+
+	returns the previous default, so it can be restored
+	"""
+	global _TOKENIZATION_CACHE  # noqa: PLW0603
+	previous: TokenizationCache | None = _TOKENIZATION_CACHE
+	_TOKENIZATION_CACHE = cache
+	return previous
+
+
+def get_tokenization_cache() -> TokenizationCache | None:
+	"""the default tokenization cache set by `set_tokenization_cache`, if any"""
+	return _TOKENIZATION_CACHE
@@ -23,9 +23,18 @@ from zanj.loading import LoaderHandler, load_item_recursive, register_loader_han
 
 from maze_dataset.constants import Coord, CoordTup
 from maze_dataset.dataset.dataset import GPTDataset, GPTDatasetConfig
-from maze_dataset.dataset.maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset.encoded import encode_mazes
+from maze_dataset.dataset.maze_dataset import (
+	GenerationTask,
+	MazeDataset,
+	MazeDatasetConfig,
+	MazeGenerationExecutor,
+)
 from maze_dataset.maze import LatticeMaze
 
+if typing.TYPE_CHECKING:
+	from maze_dataset.dataset.maze_arrays import MazeArrays
+
 
 @serializable_dataclass(kw_only=True)
 class MazeDatasetCollectionConfig(GPTDatasetConfig):
@@ -137,13 +146,54 @@ class MazeDatasetCollection(GPTDataset):
 	def generate(
 		cls,
 		cfg: MazeDatasetCollectionConfig,
-		**kwargs,
+		gen_parallel: bool = False,
+		pool_kwargs: dict | None = None,
+		verbose: bool = False,
+		*,
+		chunksize: int | None = None,
+		executor: MazeGenerationExecutor | None = None,
 	) -> "MazeDatasetCollection":
-		"""generate a dataset collection from a config"""
-		datasets = [
-			MazeDataset.generate(config, **kwargs)
+		"""generate a dataset collection from a config
+
+		all the datasets are generated by a single executor, with the work for every config
+		split into chunks and the most expensive chunks (by grid size and count) submitted
+		first. see `MazeDataset.generate` for the parameters
+		"""
+		if executor is None:
+			with MazeGenerationExecutor(
+				parallel=gen_parallel,
+				pool_kwargs=pool_kwargs,
+			) as temp_executor:
+				return cls.generate(
+					cfg,
+					verbose=verbose,
+					chunksize=chunksize,
+					executor=temp_executor,
+				)
+
+		# copy the configs to avoid modifying the originals, and split each into tasks
+		configs: list[MazeDatasetConfig] = [
+			MazeDatasetConfig.load(json.loads(json.dumps(config.serialize())))
 			for config in cfg.maze_dataset_configs
 		]
+		tasks: list[GenerationTask] = list()
+		task_owner: list[int] = list()
+		for config_idx, config in enumerate(configs):
+			config_tasks: list[GenerationTask] = executor.split_tasks(config, chunksize)
+			tasks.extend(config_tasks)
+			task_owner.extend([config_idx] * len(config_tasks))
+
+		chunks: list[MazeArrays] = executor.run(tasks, verbose=verbose)
+
+		# route the chunks back to their configs, tasks are in order within each config
+		chunks_per_config: list[list[MazeArrays]] = [list() for _ in configs]
+		for config_idx, chunk in zip(task_owner, chunks, strict=True):
+			chunks_per_config[config_idx].append(chunk)
+
+		datasets: list[MazeDataset] = [
+			MazeDataset._from_generated_chunks(config, config_chunks)
+			for config, config_chunks in zip(configs, chunks_per_config, strict=True)
+		]
 		return cls(cfg, datasets)
 
 	@classmethod
@@ -207,6 +257,28 @@ class MazeDatasetCollection(GPTDataset):
 		else:
 			return output
 
+	def encode_all(
+		self,
+		maze_tokenizer,  # noqa: ANN001
+		n_workers: int = 1,
+		seed: int | None = None,
+		*,
+		chunksize: int | None = None,
+		verbose: bool = False,
+	) -> tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]]:
+		"""encode every maze to token ids, as a flat buffer plus offsets
+
+		see `MazeDataset.encode_all`
+		"""
+		return encode_mazes(
+			self.mazes,  # type: ignore[arg-type]
+			maze_tokenizer,
+			seed=self.cfg.seed if seed is None else seed,
+			n_workers=n_workers,
+			chunksize=chunksize,
+			verbose=verbose,
+		)
+
 	def update_self_config(self) -> None:
 		"update the config to match the number of mazes, and update the underlying configs of each dataset"
 		# TODO: why cant we set this directly? its not frozen, and it seems to work in a regular MazeDataset
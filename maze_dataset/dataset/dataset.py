@@ -26,6 +26,9 @@ from zanj import ZANJ
 
 from maze_dataset.generation.seed import GLOBAL_SEED
 
+if typing.TYPE_CHECKING:
+	from maze_dataset.dataset.cache import DatasetCache
+
 
 def set_reproducibility(seed: int) -> None:
 	"set reproducibility in stdlib random and numpy (but not torch)"
@@ -172,6 +175,8 @@ class GPTDataset:
 	-  `update_self_config(self) -> None`
 		update the config of the dataset to match the current state of the dataset, used primarily in filtering and validation
 	-  decorating the appropriate filter namespace with `register_filter_namespace_for_dataset(your_dataset_class)` if you want to use filters
+	-  (optional) `_from_local_prefix(cls, cfg, local_base_path, zanj, do_generate, verbose, *, cache, **kwargs) -> GPTDataset | None`
+		build the unfiltered dataset from a local dataset with a compatible config (i.e. one differing only in size), see `MazeDataset._from_local_prefix`
 
 	# Parameters:
 	- `cfg : GPTDatasetConfig`
@@ -191,6 +196,9 @@ class GPTDataset:
 	- `local_base_path : Path`
 		where to save the dataset
 		(defaults to `Path("data/maze_dataset")`)
+	- `cache : DatasetCache | None`
+		size-bounded cache to load from and save to, instead of `local_base_path`
+		(defaults to `None`)
 
 	# Returns:
 	- `GPTDataset`
@@ -216,7 +224,7 @@ class GPTDataset:
 	cfg: GPTDatasetConfig
 
 	@classmethod
-	def from_config(  # noqa: C901, PLR0912
+	def from_config(  # noqa: C901, PLR0912, PLR0915
 		cls,
 		cfg: GPTDatasetConfig,
 		do_generate: bool = True,
@@ -228,6 +236,8 @@ class GPTDataset:
 		except_on_config_mismatch: bool = True,
 		allow_generation_metadata_filter_mismatch: bool = True,
 		verbose: bool = False,
+		*,
+		cache: "DatasetCache | None" = None,
 		**kwargs,
 	) -> "GPTDataset":
 		"""base class for gpt datasets
@@ -237,9 +247,13 @@ class GPTDataset:
 		2. download
 		3. generate
 
+		if a `DatasetCache` is given, it replaces `local_base_path`: datasets are looked up
+		through its index, and saved datasets are added to it (possibly evicting others)
 		"""
 		print_log: Callable = print if verbose else lambda *_a, **_kw: None
 
+		if cache is not None:
+			local_base_path = cache.root
 		local_base_path = Path(local_base_path)
 		fname: Path = Path(f"{cfg.to_fname()}.zanj")
 		output: GPTDataset | None = None
@@ -257,15 +271,37 @@ class GPTDataset:
 		dataset_path: Path = local_base_path / fname
 
 		# try loading
-		if load_local:  # noqa: SIM102
-			if dataset_path.exists():
-				print_log(f"loading dataset from {dataset_path.as_posix()}")
+		if load_local:
+			cached_path: Path | None = (
+				dataset_path
+				if cache is None
+				# only checks the index, not the filesystem
+				else cache.get(cfg)
+			)
+			if cached_path is not None and (cache is not None or cached_path.exists()):
+				print_log(f"loading dataset from {cached_path.as_posix()}")
 				try:
-					output = cls.read(dataset_path, zanj=zanj)
+					output = cls.read(cached_path, zanj=zanj)
 					did_load_local = True
 					print_log("load successful!")
 				except Exception as e:  # noqa: BLE001
 					print_log(f"failed to load dataset: {e}")
+					if cache is not None:
+						cache.remove(cfg)
+
+		# try reusing a local dataset which differs only in size
+		if load_local and output is None:
+			output = cls._from_local_prefix(
+				cfg,
+				local_base_path=local_base_path,
+				zanj=zanj,
+				do_generate=do_generate,
+				verbose=verbose,
+				cache=cache,
+				**kwargs,
+			)
+			if output is not None:
+				output = output._apply_filters_from_config()
 
 		if do_download and output is None:
 			print_log("seeing if we can download the dataset...")
@@ -312,7 +348,10 @@ class GPTDataset:
 
 		if save_local and not did_load_local:
 			print_log(f"saving dataset to {dataset_path}")
-			output.save(dataset_path, zanj=zanj)
+			if cache is None:
+				output.save(dataset_path, zanj=zanj)
+			else:
+				cache.put(cfg, output, zanj=zanj)
 
 		print_log(
 			f"Got dataset {output.cfg.name} with {len(output)} items. {output.cfg.to_fname() = }",
@@ -357,6 +396,24 @@ class GPTDataset:
 		"(implement in subclass!) download the dataset given the config"
 		raise NotImplementedError
 
+	@classmethod
+	def _from_local_prefix(
+		cls,
+		cfg: GPTDatasetConfig,  # noqa: ARG003
+		local_base_path: Path,  # noqa: ARG003
+		zanj: ZANJ,  # noqa: ARG003
+		do_generate: bool = True,  # noqa: ARG003
+		verbose: bool = False,  # noqa: ARG003
+		*,
+		cache: "DatasetCache | None" = None,  # noqa: ARG003
+		**kwargs,  # noqa: ARG003
+	) -> "GPTDataset | None":
+		"""(optionally implement in subclass) build the dataset from a compatible local one, before filtering
+
+		returns `None` if not supported or no compatible dataset is found
+		"""
+		return None
+
 	# filtering
 	def update_self_config(self) -> None:
 		"""(implement in subclass!) update the config of the dataset to match the actual data, if needed
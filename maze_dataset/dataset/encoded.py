@@ -0,0 +1,476 @@
+"""encoding whole datasets of mazes to token ids, as one flat buffer plus offsets
+
+`MazeDataset.as_tokens` returns one python list of strings per maze, which takes far more
+memory than the tokens themselves. `encode_mazes` (and `MazeDataset.encode_all`, which wraps
+it) instead returns every token id of every maze in a single `int16` or `int32` array, with
+`offsets[i]:offsets[i + 1]` being the tokens of maze `i`, the same way `MazeArrays` stores
+solutions.
+
+tokenizers which shuffle (the adjacency list, mostly) draw from the global rngs. these are
+reseeded before every maze from a seed and the index of the maze, so the output does not
+depend on the number of workers or the chunking.
+
+`decode_mazes` goes the other way, from such a buffer back to `MazeArrays`, for AOTP
+tokenizers.
+"""
+
+import itertools
+import multiprocessing
+import random
+import typing
+
+import numpy as np
+import tqdm
+from jaxtyping import Bool, Int
+from muutils.misc import isinstance_by_type_name
+
+from maze_dataset.constants import SPECIAL_TOKENS, CoordTup
+from maze_dataset.dataset.maze_arrays import MazeArrays
+from maze_dataset.generation import numpy_rng
+from maze_dataset.maze import SolvedMaze
+
+if typing.TYPE_CHECKING:
+	from maze_dataset.tokenization import (
+		MazeTokenizer,
+		MazeTokenizerModular,
+		TokenizationMode,
+	)
+
+ENCODE_MAX_CHUNKSIZE: int = 1024
+"upper bound on the default number of mazes per task in `encode_mazes`"
+
+EncodeTask = tuple[
+	"MazeTokenizer | MazeTokenizerModular",
+	int,
+	int,
+	MazeArrays | typing.Sequence[SolvedMaze],
+]
+"a unit of encoding work: a tokenizer, the seed, the index of the first maze, and the mazes"
+
+
+def token_id_dtype(tokenizer: "MazeTokenizer | MazeTokenizerModular") -> np.dtype:
+	"""smallest of `int16` and `int32` which holds every token id of `tokenizer`
+
+	`int32` if the vocab size is not known, as for a `MazeTokenizer` without a `max_grid_size`
+	"""
+	vocab_size: int | None = tokenizer.vocab_size
+	if vocab_size is not None and vocab_size <= np.iinfo(np.int16).max + 1:
+		return np.dtype(np.int16)
+	return np.dtype(np.int32)
+
+
+def _encode_seed(seed: int, index: int) -> int:
+	"seed for shuffling the tokens of the maze at `index`, given the dataset `seed`"
+	return int(np.random.SeedSequence([seed, index, 1]).generate_state(1)[0])
+
+
+def _encode_chunk(task: EncodeTask) -> tuple[np.ndarray, Int[np.ndarray, " n_mazes"]]:
+	"""encode the mazes of a task, returning their concatenated token ids and the number of tokens of each
+
+	the global rngs are restored afterwards, since this also runs in the calling process
+	"""
+	tokenizer, seed, start, mazes = task
+	encode: typing.Callable[[SolvedMaze], typing.Sequence[int] | np.ndarray]
+	if hasattr(tokenizer, "compile"):
+		encode = tokenizer.compile()
+	else:
+		encode = lambda maze: tokenizer.encode(maze.as_tokens(tokenizer))  # noqa: E731
+
+	if isinstance(mazes, MazeArrays):
+		mazes = mazes.to_mazes()
+
+	rng_states: tuple = (
+		random.getstate(),
+		np.random.get_state(),
+		numpy_rng.bit_generator.state,
+	)
+	token_ids: list[typing.Sequence[int] | np.ndarray] = list()
+	try:
+		for index, maze in enumerate(mazes, start=start):
+			maze_seed: int = _encode_seed(seed, index)
+			random.seed(maze_seed)
+			np.random.seed(maze_seed)
+			numpy_rng.bit_generator.state = np.random.PCG64(maze_seed).state
+			token_ids.append(encode(maze))
+	finally:
+		random.setstate(rng_states[0])
+		np.random.set_state(rng_states[1])
+		numpy_rng.bit_generator.state = rng_states[2]
+
+	lengths: Int[np.ndarray, " n_mazes"] = np.array(
+		[len(ids) for ids in token_ids],
+		dtype=np.int64,
+	)
+	if len(token_ids) == 0:
+		return np.empty(0, dtype=np.int64), lengths
+	return np.concatenate([np.asarray(ids) for ids in token_ids]), lengths
+
+
+def encode_mazes(
+	mazes: MazeArrays | typing.Sequence[SolvedMaze],
+	tokenizer: "MazeTokenizer | MazeTokenizerModular",
+	seed: int,
+	n_workers: int = 1,
+	*,
+	chunksize: int | None = None,
+	dtype: np.dtype | type | None = None,
+	verbose: bool = False,
+) -> tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]]:
+	"""encode every maze to token ids, as a single flat buffer plus offsets
+
+	a `MazeTokenizerModular` encodes through its `compile`d form, a legacy `MazeTokenizer`
+	through `maze.as_tokens` and `encode`. either way, the tokens of every maze are the same
+	as from `maze.as_tokens(tokenizer)` with the global rngs seeded from `seed` and the index
+	of the maze -- regardless of `n_workers` and `chunksize`.
+
+	# Parameters:
+	- `mazes : MazeArrays | typing.Sequence[SolvedMaze]`
+		mazes to encode. `MazeArrays` are cheaper to send to workers
+	- `tokenizer : MazeTokenizer | MazeTokenizerModular`
+		tokenizer to encode with
+	- `seed : int`
+		seed the per-maze seeds are derived from
+	- `n_workers : int`
+		number of processes to encode with. if 1, encodes in the calling process
+		(defaults to `1`)
+	- `chunksize : int | None`
+		number of mazes per task. if `None`, about 4 tasks per worker, capped at
+		`ENCODE_MAX_CHUNKSIZE`
+		(defaults to `None`)
+	- `dtype : np.dtype | type | None`
+		dtype of the token buffer, `token_id_dtype(tokenizer)` if `None`
+		(defaults to `None`)
+	- `verbose : bool`
+		whether to show a progress bar
+		(defaults to `False`)
+
+	# Returns:
+	- `tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]]`
+		the token ids, and the `int64` offsets such that `token_ids[offsets[i] : offsets[i + 1]]`
+		are the tokens of maze `i`
+	"""
+	n_mazes: int = len(mazes)
+	if chunksize is None:
+		chunksize = max(1, min(ENCODE_MAX_CHUNKSIZE, -(-n_mazes // (4 * n_workers))))
+	tasks: list[EncodeTask] = [
+		(
+			tokenizer,
+			seed,
+			start,
+			(
+				mazes.slice(start, start + chunksize)
+				if isinstance(mazes, MazeArrays)
+				else mazes[start : start + chunksize]
+			),
+		)
+		for start in range(0, n_mazes, chunksize)
+	]
+
+	results: list[tuple[np.ndarray, Int[np.ndarray, " n_mazes"]]] = list()
+	with tqdm.tqdm(
+		total=n_mazes,
+		unit="maze",
+		desc="encoding mazes",
+		disable=not verbose,
+	) as pbar:
+		if n_workers > 1:
+			with multiprocessing.Pool(n_workers) as pool:
+				for result in pool.imap(_encode_chunk, tasks):
+					results.append(result)
+					pbar.update(len(result[1]))
+		else:
+			for task in tasks:
+				results.append(_encode_chunk(task))
+				pbar.update(len(results[-1][1]))
+
+	offsets: Int[np.ndarray, " n_mazes_plus_1"] = np.zeros(n_mazes + 1, dtype=np.int64)
+	if n_mazes > 0:
+		np.cumsum(np.concatenate([lengths for _, lengths in results]), out=offsets[1:])
+	token_ids: np.ndarray = np.empty(
+		int(offsets[-1]),
+		dtype=token_id_dtype(tokenizer) if dtype is None else dtype,
+	)
+	position: int = 0
+	for ids, _ in results:
+		token_ids[position : position + len(ids)] = ids
+		position += len(ids)
+	return token_ids, offsets
+
+
+DECODE_DELIMITERS: tuple[str, ...] = (
+	SPECIAL_TOKENS.ADJLIST_START,
+	SPECIAL_TOKENS.ADJLIST_END,
+	SPECIAL_TOKENS.ORIGIN_START,
+	SPECIAL_TOKENS.ORIGIN_END,
+	SPECIAL_TOKENS.TARGET_START,
+	SPECIAL_TOKENS.TARGET_END,
+	SPECIAL_TOKENS.PATH_START,
+	SPECIAL_TOKENS.PATH_END,
+)
+"delimiters of the sections of an AOTP sequence, in the order `decode_mazes` expects them"
+
+
+def _coord_token_ids(
+	tokenizer: "MazeTokenizer | MazeTokenizerModular",
+	grid_shape: CoordTup,
+) -> Int[np.ndarray, "row col k"]:
+	"ids of the tokens of every coord of the grid, -1 where a token is not in the vocabulary"
+	if isinstance_by_type_name(tokenizer, "MazeTokenizerModular"):
+		return tokenizer.prompt_sequencer.coord_tokenizer.token_id_table(grid_shape)  # type: ignore[union-attr]
+	return tokenizer.coord_token_id_table(grid_shape)  # type: ignore[union-attr]
+
+
+class _CoordDecoder:
+	"""inverse of a coord token id table: maps `k` token ids back to a coord
+
+	each group of `k` ids is packed into a single `int64` key, so looking up many coords is one
+	`np.searchsorted` into the sorted keys of the table
+	"""
+
+	def __init__(self, id_table: Int[np.ndarray, "row col k"], vocab_size: int) -> None:
+		n_cols: int = id_table.shape[1]
+		self.k: int = id_table.shape[2]
+		if vocab_size**self.k > np.iinfo(np.int64).max:
+			err_msg: str = f"can't pack {self.k} token ids from a vocab of {vocab_size} into an int64"
+			raise ValueError(err_msg)
+		self._radix: Int[np.ndarray, " k"] = vocab_size ** np.arange(
+			self.k, dtype=np.int64
+		)
+
+		ids: Int[np.ndarray, "n_coords k"] = id_table.reshape(-1, self.k)
+		cells: Int[np.ndarray, " n_coords"] = np.flatnonzero((ids >= 0).all(axis=1))
+		keys: Int[np.ndarray, " n_coords"] = self.pack(ids[cells])
+		order: Int[np.ndarray, " n_coords"] = np.argsort(keys, kind="stable")
+		self._keys: Int[np.ndarray, " n_coords"] = keys[order]
+		self._coords: Int[np.ndarray, "n_coords row_col=2"] = np.stack(
+			np.divmod(cells[order], n_cols),
+			axis=1,
+		)
+
+	def pack(self, ids: Int[np.ndarray, "n k"]) -> Int[np.ndarray, " n"]:
+		"pack each row of `k` token ids into a single key"
+		return ids.astype(np.int64) @ self._radix
+
+	def __call__(
+		self,
+		ids: Int[np.ndarray, "n k"],
+	) -> tuple[Int[np.ndarray, "n row_col=2"], Bool[np.ndarray, " n"]]:
+		"the coords of each row of `k` token ids, and whether each was a coord at all"
+		if len(self._keys) == 0:
+			return np.zeros((len(ids), 2), dtype=np.int64), np.zeros(
+				len(ids), dtype=bool
+			)
+		keys: Int[np.ndarray, " n"] = self.pack(ids)
+		found: Int[np.ndarray, " n"] = np.minimum(
+			np.searchsorted(self._keys, keys),
+			len(self._keys) - 1,
+		)
+		return self._coords[found], self._keys[found] == keys
+
+
+def _first_occurrences(
+	token_ids: Int[np.ndarray, " total_tokens"],
+	seq_idx: Int[np.ndarray, " total_tokens"],
+	token_id: int,
+	n_seqs: int,
+) -> tuple[Int[np.ndarray, " n_seqs"], Int[np.ndarray, " n_seqs"]]:
+	"position in `token_ids` of the first `token_id` of every sequence (-1 if none), and how many there are"
+	hits: Int[np.ndarray, " n_hits"] = np.flatnonzero(token_ids == token_id)
+	first: Int[np.ndarray, " n_seqs"] = np.full(n_seqs, -1, dtype=np.int64)
+	# reversed, so the first hit of a sequence is written last
+	first[seq_idx[hits[::-1]]] = hits[::-1]
+	return first, np.bincount(seq_idx[hits], minlength=n_seqs)
+
+
+def _gather_blocks(
+	token_ids: Int[np.ndarray, " total_tokens"],
+	starts: Int[np.ndarray, " n_seqs"],
+	n_blocks: Int[np.ndarray, " n_seqs"],
+	block_size: int,
+) -> tuple[
+	Int[np.ndarray, "n_total_blocks block_size"], Int[np.ndarray, " n_total_blocks"]
+]:
+	"""split `n_blocks[i]` consecutive blocks of `block_size` tokens off at `starts[i]`, for every `i`
+
+	returns the blocks, and the index into `starts` each block came from
+	"""
+	block_seq: Int[np.ndarray, " n_total_blocks"] = np.repeat(
+		np.arange(len(starts)),
+		n_blocks,
+	)
+	block_offsets: Int[np.ndarray, " n_seqs"] = np.cumsum(n_blocks) - n_blocks
+	block_starts: Int[np.ndarray, " n_total_blocks"] = (
+		starts[block_seq]
+		+ (np.arange(len(block_seq)) - block_offsets[block_seq]) * block_size
+	)
+	return (
+		token_ids[block_starts[:, None] + np.arange(block_size)],
+		block_seq,
+	)
+
+
+def decode_mazes(  # noqa: PLR0915
+	token_ids: Int[np.ndarray, " total_tokens"],
+	offsets: Int[np.ndarray, " n_seqs_plus_1"],
+	tokenizer: "MazeTokenizer | TokenizationMode | MazeTokenizerModular",
+	grid_shape: CoordTup,
+) -> tuple[MazeArrays, Bool[np.ndarray, " n_seqs"]]:
+	"""decode many sequences of token ids back into mazes at once, the inverse of `encode_mazes`
+
+	the batched counterpart of `LatticeMaze.from_tokens`, and likewise only for AOTP legacy
+	tokenizers and their `MazeTokenizerModular` analogs. instead of parsing strings, the
+	sections of every sequence are found with a few whole-buffer comparisons, coords are
+	looked up by an inverse of the tokenizer's coord token id table, and the connections of
+	all mazes are set with a single scatter.
+
+	a sequence is invalid, and left out of the returned mazes, if it is not exactly
+	`<ADJLIST_START> edges <ADJLIST_END> <ORIGIN_START> coord <ORIGIN_END> <TARGET_START> coord
+	<TARGET_END> <PATH_START> coords <PATH_END>`, where every edge is `coord <--> coord ;` between
+	neighbouring cells and every coord is within `grid_shape`. as in `from_tokens`, the
+	solution is the path, and is not checked to follow the connections -- use
+	`MazeArrays.invalid_mask` for that.
+
+	# Parameters:
+	- `token_ids : Int[np.ndarray, " total_tokens"]`
+		token ids of all sequences, concatenated
+	- `offsets : Int[np.ndarray, " n_seqs_plus_1"]`
+		sequence `i` is `token_ids[offsets[i] : offsets[i + 1]]`
+	- `tokenizer : MazeTokenizer | TokenizationMode | MazeTokenizerModular`
+		tokenizer the sequences were encoded with. a `MazeTokenizer` needs a `max_grid_size`
+	- `grid_shape : CoordTup`
+		shape of the grid of every maze
+
+	# Returns:
+	- `tuple[MazeArrays, Bool[np.ndarray, " n_seqs"]]`
+		the mazes of the valid sequences, in order, and which sequences were valid
+
+	# Raises:
+	- `NotImplementedError` : if the tokenizer is not an AOTP legacy tokenizer or an exact
+		`MazeTokenizerModular` analog of one
+	- `ValueError` : if the tokenizer has no vocabulary
+	"""
+	if isinstance_by_type_name(tokenizer, "TokenizationMode"):
+		tokenizer = tokenizer.to_legacy_tokenizer()  # type: ignore[union-attr]
+	if (
+		isinstance_by_type_name(tokenizer, "MazeTokenizerModular")
+		and not tokenizer.is_legacy_equivalent()  # type: ignore[union-attr]
+	) or not tokenizer.is_AOTP():  # type: ignore[union-attr]
+		err_msg: str = f"only AOTP legacy tokenizers and their exact `MazeTokenizerModular` analogs are supported, not {tokenizer}"
+		raise NotImplementedError(err_msg)
+	tokenizer_map: dict[str, int] | None = tokenizer.tokenizer_map  # type: ignore[union-attr]
+	if tokenizer_map is None:
+		err_msg = f"tokenizer has no vocabulary, set a `max_grid_size`: {tokenizer}"
+		raise ValueError(err_msg)
+
+	grid_shape = tuple(grid_shape)  # type: ignore[assignment]
+	decoder: _CoordDecoder = _CoordDecoder(
+		_coord_token_ids(tokenizer, grid_shape),  # type: ignore[arg-type]
+		tokenizer.vocab_size,  # type: ignore[union-attr, arg-type]
+	)
+	k: int = decoder.k
+	token_ids = np.asarray(token_ids)
+	offsets = np.asarray(offsets, dtype=np.int64)
+	n_seqs: int = len(offsets) - 1
+	seq_idx: Int[np.ndarray, " total_tokens"] = np.repeat(
+		np.arange(n_seqs),
+		np.diff(offsets),
+	)
+
+	# every delimiter exactly once, in order
+	valid: Bool[np.ndarray, " n_seqs"] = np.ones(n_seqs, dtype=bool)
+	delims: list[Int[np.ndarray, " n_seqs"]] = list()
+	for delim in DECODE_DELIMITERS:
+		first, count = _first_occurrences(
+			token_ids,
+			seq_idx,
+			tokenizer_map[delim],
+			n_seqs,
+		)
+		valid &= count == 1
+		delims.append(first)
+	for before, after in itertools.pairwise(delims):
+		valid &= before < after
+	(
+		adj_start,
+		adj_end,
+		origin_start,
+		origin_end,
+		target_start,
+		target_end,
+		path_start,
+		path_end,
+	) = delims
+
+	# section lengths
+	edge_size: int = 2 * k + 2
+	adj_len: Int[np.ndarray, " n_seqs"] = adj_end - adj_start - 1
+	path_len: Int[np.ndarray, " n_seqs"] = path_end - path_start - 1
+	valid &= adj_len % edge_size == 0
+	valid &= origin_end - origin_start - 1 == k
+	valid &= target_end - target_start - 1 == k
+	valid &= (path_len > 0) & (path_len % k == 0)
+
+	seqs: Int[np.ndarray, " n_valid"] = np.flatnonzero(valid)
+
+	# edges: `coord <--> coord ;`
+	edges, edge_seq = _gather_blocks(
+		token_ids,
+		adj_start[seqs] + 1,
+		adj_len[seqs] // edge_size,
+		edge_size,
+	)
+	edge_a, found_a = decoder(edges[:, :k])
+	edge_b, found_b = decoder(edges[:, k + 1 : 2 * k + 1])
+	edge_ok: Bool[np.ndarray, " n_edges"] = (
+		found_a
+		& found_b
+		& (edges[:, k] == tokenizer_map[SPECIAL_TOKENS.CONNECTOR])
+		& (edges[:, 2 * k + 1] == tokenizer_map[SPECIAL_TOKENS.ADJACENCY_ENDLINE])
+		& (np.abs(edge_a - edge_b).sum(axis=1) == 1)
+	)
+	valid[seqs[edge_seq[~edge_ok]]] = False
+
+	# origin, target, and path coords. the path, last, is the solution
+	for start, n_coords in [
+		(origin_start, np.ones_like(seqs)),
+		(target_start, np.ones_like(seqs)),
+		(path_start, path_len[seqs] // k),
+	]:
+		coord_ids, path_seq = _gather_blocks(token_ids, start[seqs] + 1, n_coords, k)
+		path, found = decoder(coord_ids)
+		valid[seqs[path_seq[~found]]] = False
+
+	# keep only the valid sequences, renumbered
+	keep: Bool[np.ndarray, " n_valid"] = valid[seqs]
+	new_index: Int[np.ndarray, " n_valid"] = np.cumsum(keep) - 1
+	n_mazes: int = int(keep.sum())
+
+	connection_lists: Bool[np.ndarray, "n_mazes lattice_dim=2 row col"] = np.zeros(
+		(n_mazes, 2, *grid_shape),
+		dtype=np.bool_,
+	)
+	edge_keep: Bool[np.ndarray, " n_edges"] = keep[edge_seq]
+	edge_a, edge_b = edge_a[edge_keep], edge_b[edge_keep]
+	lower: Int[np.ndarray, "n_edges row_col=2"] = np.minimum(edge_a, edge_b)
+	# the connection is down if the coords differ in their row, right otherwise
+	connection_lists[
+		new_index[edge_seq[edge_keep]],
+		(edge_a[:, 1] != edge_b[:, 1]).astype(np.int64),
+		lower[:, 0],
+		lower[:, 1],
+	] = True
+
+	path_keep: Bool[np.ndarray, " n_path"] = keep[path_seq]
+	solution_offsets: Int[np.ndarray, " n_mazes_plus_1"] = np.zeros(
+		n_mazes + 1,
+		dtype=np.int64,
+	)
+	np.cumsum(path_len[seqs][keep] // k, out=solution_offsets[1:])
+	return (
+		MazeArrays(
+			connection_lists=connection_lists,
+			solutions=path[path_keep],
+			solution_offsets=solution_offsets,
+		),
+		valid,
+	)
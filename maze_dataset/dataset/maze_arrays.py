@@ -0,0 +1,565 @@
+"""`MazeArrays` is a columnar (struct-of-arrays) representation of a sequence of `SolvedMaze`s
+
+instead of one python object per maze, all connection lists live in a single `(n, 2, rows, cols)`
+array and all solutions are concatenated into a single `(total_len, 2)` array, indexed by offsets.
+this is what generation workers send back to the parent process, since pickling a handful of
+large arrays is much cheaper than pickling many small dataclasses.
+"""
+
+import hashlib
+import typing
+from collections import defaultdict
+from dataclasses import dataclass
+
+import numpy as np
+from jaxtyping import Bool, Int
+
+from maze_dataset.constants import CoordTup
+from maze_dataset.maze import SolvedMaze
+from maze_dataset.maze.lattice_maze import _solved_maze_unchecked
+
+MAZE_COLUMNS: tuple[str, ...] = (
+	"solution_length",
+	"start_end_distance",
+	"n_forks",
+	"n_deadends",
+	"component_size",
+)
+"""names of the per-maze scalar columns computed by `MazeArrays.compute_column`
+
+- `solution_length`: number of coordinates in the solution
+- `start_end_distance`: manhattan distance between the start and end of the solution, ignoring walls
+- `n_forks`: number of points on the solution with a choice of where to go, as in
+	`SolvedMaze.get_solution_forking_points`
+- `n_deadends`: number of cells with exactly one connection
+- `component_size`: number of cells reachable from the start of the solution
+"""
+
+DATA_HASH_DIGEST_SIZE: int = 8
+"digest size in bytes of the hash used by `MazeDataset.data_hash`, so the hash fits in a 64 bit int"
+
+
+def _raise_if_invalid(invalid: Bool[np.ndarray, " n_mazes"]) -> None:
+	"""raise a `ValueError` listing the first few invalid maze indices, if there are any"""
+	if invalid.any():
+		invalid_idxs: list[int] = np.flatnonzero(invalid).tolist()
+		err_msg: str = f"{len(invalid_idxs)} of {len(invalid)} mazes are invalid, at indices {invalid_idxs[:10]}{'...' if len(invalid_idxs) > 10 else ''}"  # noqa: PLR2004
+		raise ValueError(err_msg)
+
+
+DATA_HASH_CHUNK_SIZE: int = 2**16
+"number of mazes whose bytes are assembled at once by `MazeArrays.update_data_hasher`, bounding its memory use"
+
+
+def new_data_hasher() -> "hashlib.blake2b":
+	"""new hasher for `MazeArrays.update_data_hasher`"""
+	return hashlib.blake2b(digest_size=DATA_HASH_DIGEST_SIZE)
+
+
+@dataclass
+class MazeArrays:
+	"""columnar storage for a sequence of `SolvedMaze`s
+
+	# Parameters:
+	- `connection_lists : Bool[np.ndarray, "n_mazes lattice_dim=2 row col"]`
+		stacked connection lists of all mazes
+	- `solutions : Int[np.ndarray, "total_solution_len row_col=2"]`
+		all solutions, concatenated along the first axis
+	- `solution_offsets : Int[np.ndarray, " n_mazes_plus_1"]`
+		the solution of maze `i` is `solutions[solution_offsets[i] : solution_offsets[i + 1]]`
+	- `generation_meta : list[dict | None] | None`
+		per-maze generation metadata, or `None` if not present
+		(defaults to `None`)
+	- `generation_indices : Int[np.ndarray, " n_mazes"] | None`
+		index each maze was generated at (see `MazeDataset.generation_indices`), or `None` if unknown
+		(defaults to `None`)
+	"""
+
+	connection_lists: Bool[np.ndarray, "n_mazes lattice_dim=2 row col"]
+	solutions: Int[np.ndarray, "total_solution_len row_col=2"]
+	solution_offsets: Int[np.ndarray, " n_mazes_plus_1"]
+	generation_meta: list[dict | None] | None = None
+	generation_indices: Int[np.ndarray, " n_mazes"] | None = None
+
+	def __post_init__(self) -> None:
+		"check that the arrays are consistent with each other"
+		n_mazes: int = self.connection_lists.shape[0]
+		if self.solution_offsets.shape != (n_mazes + 1,):
+			err_msg: str = f"expected {n_mazes + 1} solution offsets, got {self.solution_offsets.shape = }"
+			raise ValueError(err_msg)
+		if self.generation_meta is not None and len(self.generation_meta) != n_mazes:
+			err_msg = f"expected {n_mazes} generation metadata entries, got {len(self.generation_meta) = }"
+			raise ValueError(err_msg)
+		if self.generation_indices is not None and self.generation_indices.shape != (
+			n_mazes,
+		):
+			err_msg = f"expected {n_mazes} generation indices, got {self.generation_indices.shape = }"
+			raise ValueError(err_msg)
+
+	def __len__(self) -> int:
+		"""number of mazes"""
+		return self.connection_lists.shape[0]
+
+	@property
+	def grid_shape(self) -> CoordTup:
+		"""shape of the grid of every maze"""
+		return self.connection_lists.shape[2:]  # type: ignore[return-value]
+
+	@property
+	def solution_lengths(self) -> Int[np.ndarray, " n_mazes"]:
+		"""length of the solution of each maze"""
+		return np.diff(self.solution_offsets)
+
+	def get_solution(self, i: int) -> Int[np.ndarray, "solution_len row_col=2"]:
+		"""get the solution of maze `i` as a view into `solutions`"""
+		return self.solutions[self.solution_offsets[i] : self.solution_offsets[i + 1]]
+
+	def slice(self, start: int, stop: int) -> "MazeArrays":
+		"""mazes `start` to `stop` (exclusive), as views into the columns"""
+		offsets: Int[np.ndarray, " n_mazes_plus_1"] = self.solution_offsets[
+			start : stop + 1
+		]
+		return MazeArrays(
+			connection_lists=self.connection_lists[start:stop],
+			solutions=self.solutions[offsets[0] : offsets[-1]],
+			solution_offsets=offsets - offsets[0],
+			generation_meta=(
+				None
+				if self.generation_meta is None
+				else self.generation_meta[start:stop]
+			),
+			generation_indices=(
+				None
+				if self.generation_indices is None
+				else self.generation_indices[start:stop]
+			),
+		)
+
+	def get_maze(self, i: int) -> SolvedMaze:
+		"""construct the `SolvedMaze` at index `i`, with arrays as views into the columns
+
+		the arrays are not checked, see `validate`
+		"""
+		return _solved_maze_unchecked(
+			connection_list=self.connection_lists[i],
+			solution=self.get_solution(i),
+			generation_meta=(
+				None if self.generation_meta is None else self.generation_meta[i]
+			),
+		)
+
+	def node_degrees(self) -> Int[np.ndarray, "n_mazes row col"]:
+		"""number of connections of each cell of each maze"""
+		down: Bool[np.ndarray, "n_mazes row-1 col"] = self.connection_lists[
+			:, 0, :-1, :
+		]
+		right: Bool[np.ndarray, "n_mazes row col-1"] = self.connection_lists[
+			:, 1, :, :-1
+		]
+		degrees: Int[np.ndarray, "n_mazes row col"] = np.zeros(
+			(len(self), *self.grid_shape),
+			dtype=np.int8,
+		)
+		degrees[:, :-1, :] += down
+		degrees[:, 1:, :] += down
+		degrees[:, :, :-1] += right
+		degrees[:, :, 1:] += right
+		return degrees
+
+	def _component_from_start(self) -> Bool[np.ndarray, "n_mazes row col"]:
+		"""cells reachable from the start of each solution, by flood filling all mazes at once"""
+		n_mazes: int = len(self)
+		lengths: Int[np.ndarray, " n_mazes"] = self.solution_lengths
+		reached: Bool[np.ndarray, "n_mazes row col"] = np.zeros(
+			(n_mazes, *self.grid_shape),
+			dtype=np.bool_,
+		)
+		active: Int[np.ndarray, " n_active"] = np.flatnonzero(lengths > 0)
+		starts: Int[np.ndarray, "n_active row_col=2"] = self.solutions[
+			self.solution_offsets[active]
+		]
+		reached[active, starts[:, 0], starts[:, 1]] = True
+
+		# expand by one step along open edges until nothing changes, only for mazes still growing
+		while len(active) > 0:
+			prev: Bool[np.ndarray, "n_active row col"] = reached[active]
+			down: Bool[np.ndarray, "n_active row-1 col"] = self.connection_lists[
+				active,
+				0,
+				:-1,
+				:,
+			]
+			right: Bool[np.ndarray, "n_active row col-1"] = self.connection_lists[
+				active,
+				1,
+				:,
+				:-1,
+			]
+			new: Bool[np.ndarray, "n_active row col"] = prev.copy()
+			new[:, 1:, :] |= prev[:, :-1, :] & down
+			new[:, :-1, :] |= prev[:, 1:, :] & down
+			new[:, :, 1:] |= prev[:, :, :-1] & right
+			new[:, :, :-1] |= prev[:, :, 1:] & right
+			reached[active] = new
+			active = active[(new != prev).any(axis=(1, 2))]
+
+		return reached
+
+	def _solution_endpoint_indices(
+		self,
+	) -> tuple[Int[np.ndarray, " n_mazes"], Int[np.ndarray, " n_mazes"]]:
+		"""indices into `solutions` of the start and end of each solution, 0 for empty solutions"""
+		has_solution: Bool[np.ndarray, " n_mazes"] = self.solution_lengths > 0
+		return (
+			np.where(has_solution, self.solution_offsets[:-1], 0),
+			np.where(has_solution, self.solution_offsets[1:] - 1, 0),
+		)
+
+	def compute_column(self, key: str) -> Int[np.ndarray, " n_mazes"]:
+		"""compute one of the per-maze scalar columns listed in `MAZE_COLUMNS`, vectorized over all mazes
+
+		# Raises:
+		- `KeyError` : if `key` is not in `MAZE_COLUMNS`
+		"""
+		n_mazes: int = len(self)
+		lengths: Int[np.ndarray, " n_mazes"] = self.solution_lengths
+		if key == "solution_length":
+			return lengths.astype(np.int64)
+		if key == "n_deadends":
+			return (self.node_degrees() == 1).sum(axis=(1, 2)).astype(np.int64)
+		if key == "component_size":
+			return self._component_from_start().sum(axis=(1, 2)).astype(np.int64)
+
+		start_idx, end_idx = self._solution_endpoint_indices()
+		if key == "start_end_distance":
+			if len(self.solutions) == 0:
+				return np.zeros(n_mazes, dtype=np.int64)
+			return np.where(
+				lengths > 0,
+				np.abs(self.solutions[start_idx] - self.solutions[end_idx]).sum(axis=1),
+				0,
+			).astype(np.int64)
+		if key == "n_forks":
+			# more than one choice at the endpoints, or more than two anywhere else
+			maze_of_coord: Int[np.ndarray, " total_solution_len"] = np.repeat(
+				np.arange(n_mazes),
+				lengths,
+			)
+			coord_idx: Int[np.ndarray, " total_solution_len"] = np.arange(
+				len(self.solutions),
+			)
+			is_endpoint: Bool[np.ndarray, " total_solution_len"] = (
+				coord_idx == start_idx[maze_of_coord]
+			) | (coord_idx == end_idx[maze_of_coord])
+			is_fork: Bool[np.ndarray, " total_solution_len"] = self.node_degrees()[
+				maze_of_coord,
+				self.solutions[:, 0],
+				self.solutions[:, 1],
+			] > np.where(is_endpoint, 1, 2)
+			return np.bincount(maze_of_coord[is_fork], minlength=n_mazes)
+
+		err_msg: str = f"unknown maze column {key!r}, expected one of {MAZE_COLUMNS}"
+		raise KeyError(err_msg)
+
+	def compute_columns(self) -> dict[str, Int[np.ndarray, " n_mazes"]]:
+		"""compute all the per-maze scalar columns listed in `MAZE_COLUMNS`, see `compute_column`"""
+		return {key: self.compute_column(key) for key in MAZE_COLUMNS}
+
+	def update_data_hasher(self, hasher: "hashlib.blake2b") -> None:
+		"""feed all mazes into `hasher`, in order, in a canonical byte layout
+
+		each maze is fed as its grid shape and solution length as little endian int64, then its
+		connection list as packed bits, then its solution as little endian int32. the bytes depend
+		only on the values, not on dtypes or memory layout, and feeding the mazes in several parts
+		gives the same hash as all at once, which is what lets `MazeDataset.data_hash` hash only
+		appended mazes. the bytes are assembled with whole-column operations, `DATA_HASH_CHUNK_SIZE`
+		mazes at a time
+		"""
+		for start in range(0, len(self), DATA_HASH_CHUNK_SIZE):
+			chunk: MazeArrays = self.slice(
+				start,
+				min(start + DATA_HASH_CHUNK_SIZE, len(self)),
+			)
+			hasher.update(chunk._data_hash_bytes())
+
+	def _data_hash_bytes(self) -> Int[np.ndarray, " n_bytes"]:
+		"""the bytes fed to the hasher by `update_data_hasher`, for all mazes at once, as a `uint8` array"""
+		n_mazes: int = len(self)
+		lengths: Int[np.ndarray, " n_mazes"] = self.solution_lengths
+		header: Int[np.ndarray, "n_mazes 3"] = np.empty((n_mazes, 3), dtype="<i8")
+		header[:, :2] = self.grid_shape
+		header[:, 2] = lengths
+		# fixed size part of each maze: the header, then the connection list bits
+		fixed: Int[np.ndarray, "n_mazes fixed_bytes"] = np.concatenate(
+			[
+				header.view(np.uint8),
+				np.packbits(
+					self.connection_lists.reshape(n_mazes, -1).astype(np.bool_),
+					axis=1,
+				),
+			],
+			axis=1,
+		)
+		solution_bytes: Int[np.ndarray, " solution_bytes"] = np.ascontiguousarray(
+			self.solutions[self.solution_offsets[0] : self.solution_offsets[-1]],
+			dtype="<i4",
+		).view(np.uint8)
+
+		# each fixed part is followed by the solution of its maze, 8 bytes per coordinate
+		part_sizes: Int[np.ndarray, "n_mazes 2"] = np.empty(
+			(n_mazes, 2), dtype=np.int64
+		)
+		part_sizes[:, 0] = fixed.shape[1]
+		part_sizes[:, 1] = lengths * 8
+		is_fixed: Bool[np.ndarray, " total_size"] = np.repeat(
+			np.tile(np.array([True, False]), n_mazes),
+			part_sizes.reshape(-1),
+		)
+		total_size: int = is_fixed.shape[0]
+		output: Int[np.ndarray, " total_size"] = np.empty(total_size, dtype=np.uint8)
+		output[is_fixed] = fixed.reshape(-1)
+		output[~is_fixed] = solution_bytes.reshape(-1)
+		return output
+
+	def to_mazes(self) -> list[SolvedMaze]:
+		"""construct all the `SolvedMaze`s, as in `get_maze`"""
+		offsets: list[int] = self.solution_offsets.tolist()
+		generation_meta: typing.Sequence[dict | None] = (
+			self.generation_meta
+			if self.generation_meta is not None
+			else [None] * len(self)
+		)
+		return [
+			_solved_maze_unchecked(
+				connection_list=connection_list,
+				solution=self.solutions[start:end],
+				generation_meta=meta,
+			)
+			for connection_list, start, end, meta in zip(
+				self.connection_lists,
+				offsets[:-1],
+				offsets[1:],
+				generation_meta,
+				strict=True,
+			)
+		]
+
+	def validate(self) -> None:
+		"""check every solution is non-empty, in bounds, and only steps through open connections
+
+		this is the vectorized equivalent of the checks skipped by `get_maze` and `to_mazes`
+
+		# Raises:
+		- `ValueError` : if any maze is invalid, listing the first few invalid indices
+		"""
+		_raise_if_invalid(self.invalid_mask())
+
+	def invalid_mask(self) -> Bool[np.ndarray, " n_mazes"]:
+		"""which mazes fail the checks of `validate`"""
+		n_mazes: int = len(self)
+		if self.solutions.ndim != 2 or self.solutions.shape[1] != 2:  # noqa: PLR2004
+			err_msg: str = f"expected solutions of shape (total_solution_len, 2), got {self.solutions.shape = }"
+			raise ValueError(err_msg)
+		lengths: Int[np.ndarray, " n_mazes"] = self.solution_lengths
+		invalid: Bool[np.ndarray, " n_mazes"] = lengths <= 0
+
+		solutions: Int[np.ndarray, "total_solution_len 2"] = self.solutions.astype(
+			np.int64,
+		)
+		maze_of_coord: Int[np.ndarray, " total_solution_len"] = np.repeat(
+			np.arange(n_mazes),
+			np.maximum(lengths, 0),
+		)
+		out_of_bounds: Bool[np.ndarray, " total_solution_len"] = (
+			(solutions < 0) | (solutions >= np.array(self.grid_shape))
+		).any(axis=1)
+		invalid[maze_of_coord[out_of_bounds]] = True
+
+		# steps within a maze, skipping the step from the end of one maze to the start of the next
+		is_step: Bool[np.ndarray, " total_solution_len_minus_1"] = (
+			(maze_of_coord[1:] == maze_of_coord[:-1])
+			& ~out_of_bounds[1:]
+			& ~out_of_bounds[:-1]
+		)
+		step_maze: Int[np.ndarray, " n_steps"] = maze_of_coord[1:][is_step]
+		step_from: Int[np.ndarray, "n_steps 2"] = solutions[:-1][is_step]
+		step_to: Int[np.ndarray, "n_steps 2"] = solutions[1:][is_step]
+		delta: Int[np.ndarray, "n_steps 2"] = np.abs(step_to - step_from)
+		# the connection between adjacent cells is stored at the one with smaller coordinates
+		step_node: Int[np.ndarray, "n_steps 2"] = np.minimum(step_from, step_to)
+		connected: Bool[np.ndarray, " n_steps"] = self.connection_lists[
+			step_maze,
+			np.argmax(delta, axis=1),
+			step_node[:, 0],
+			step_node[:, 1],
+		]
+		invalid[step_maze[~((delta.sum(axis=1) == 1) & connected)]] = True
+
+		return invalid
+
+	@classmethod
+	def from_mazes(
+		cls,
+		mazes: typing.Sequence[SolvedMaze],
+		grid_shape: CoordTup | None = None,
+		generation_indices: typing.Sequence[int] | None = None,
+	) -> "MazeArrays":
+		"""pack a sequence of `SolvedMaze`s into arrays
+
+		# Parameters:
+		- `mazes : typing.Sequence[SolvedMaze]`
+			mazes to pack, all must have the same grid shape
+		- `grid_shape : CoordTup | None`
+			grid shape to use when `mazes` is empty, ignored otherwise
+			(defaults to `None`)
+		- `generation_indices : typing.Sequence[int] | None`
+			index each maze was generated at, if known
+			(defaults to `None`)
+
+		# Returns:
+		- `MazeArrays`
+
+		# Raises:
+		- `ValueError` : if `mazes` is empty and no `grid_shape` is given
+		"""
+		generation_indices_arr: Int[np.ndarray, " n_mazes"] | None = (
+			None
+			if generation_indices is None
+			else np.asarray(generation_indices, dtype=np.int64)
+		)
+		if len(mazes) == 0:
+			if grid_shape is None:
+				err_msg: str = (
+					"cannot pack an empty sequence of mazes without a `grid_shape`"
+				)
+				raise ValueError(err_msg)
+			return cls(
+				connection_lists=np.empty((0, 2, *grid_shape), dtype=np.bool_),
+				solutions=np.empty((0, 2), dtype=np.int64),
+				solution_offsets=np.zeros(1, dtype=np.int64),
+				generation_meta=[],
+				generation_indices=generation_indices_arr,
+			)
+
+		solution_offsets: Int[np.ndarray, " n_mazes_plus_1"] = np.zeros(
+			len(mazes) + 1,
+			dtype=np.int64,
+		)
+		np.cumsum([m.solution.shape[0] for m in mazes], out=solution_offsets[1:])
+		return cls(
+			connection_lists=np.stack([m.connection_list for m in mazes]),
+			solutions=np.concatenate([m.solution for m in mazes]),
+			solution_offsets=solution_offsets,
+			generation_meta=[m.generation_meta for m in mazes],
+			generation_indices=generation_indices_arr,
+		)
+
+	@classmethod
+	def concatenate(cls, chunks: typing.Sequence["MazeArrays"]) -> "MazeArrays":
+		"""concatenate several `MazeArrays`, in order
+
+		`generation_meta` and `generation_indices` are kept only if present in every chunk
+		"""
+		if len(chunks) == 0:
+			err_msg: str = "need at least one chunk to concatenate"
+			raise ValueError(err_msg)
+		if len(chunks) == 1:
+			return chunks[0]
+
+		# shift each chunk's offsets by the total solution length before it
+		solution_offsets: list[np.ndarray] = [np.zeros(1, dtype=np.int64)]
+		total: int = 0
+		for chunk in chunks:
+			solution_offsets.append(chunk.solution_offsets[1:] + total)
+			total += int(chunk.solution_offsets[-1])
+
+		generation_meta: list[dict | None] | None = None
+		if all(chunk.generation_meta is not None for chunk in chunks):
+			generation_meta = [
+				meta
+				for chunk in chunks
+				for meta in chunk.generation_meta  # type: ignore[union-attr]
+			]
+
+		generation_indices: Int[np.ndarray, " n_mazes"] | None = None
+		if all(chunk.generation_indices is not None for chunk in chunks):
+			generation_indices = np.concatenate(
+				[chunk.generation_indices for chunk in chunks],  # type: ignore[misc]
+			)
+
+		return cls(
+			connection_lists=np.concatenate([c.connection_lists for c in chunks]),
+			solutions=np.concatenate([c.solutions for c in chunks]),
+			solution_offsets=np.concatenate(solution_offsets),
+			generation_meta=generation_meta,
+			generation_indices=generation_indices,
+		)
+
+
+class MazeColumns(typing.Mapping[str, Int[np.ndarray, " n_mazes"]]):
+	"""the per-maze scalar columns (see `MAZE_COLUMNS`) of a sequence of mazes, each computed on first access
+
+	so a filter on `solution_length` never runs the flood fill needed for `component_size`.
+	mazes of several grid shapes are packed into one `MazeArrays` per shape, when a column is first needed
+
+	# Parameters:
+	- `mazes : MazeArrays | typing.Sequence[SolvedMaze]`
+		the mazes, which must not change afterwards
+	- `computed : dict[str, Int[np.ndarray, " n_mazes"]] | None`
+		columns which are already known
+		(defaults to `None`)
+	"""
+
+	def __init__(
+		self,
+		mazes: MazeArrays | typing.Sequence[SolvedMaze],
+		computed: dict[str, Int[np.ndarray, " n_mazes"]] | None = None,
+	) -> None:
+		"store the mazes, nothing is computed yet"
+		self._mazes: MazeArrays | typing.Sequence[SolvedMaze] = mazes
+		self.computed: dict[str, Int[np.ndarray, " n_mazes"]] = dict(computed or {})
+		self._groups: list[tuple[Int[np.ndarray, " n_group"], MazeArrays]] | None = None
+
+	def _get_groups(self) -> list[tuple[Int[np.ndarray, " n_group"], MazeArrays]]:
+		"""indices of the mazes of each grid shape, and those mazes packed together"""
+		if self._groups is None:
+			if isinstance(self._mazes, MazeArrays):
+				self._groups = [(np.arange(len(self._mazes)), self._mazes)]
+			else:
+				shape_groups: dict[tuple[int, ...], list[int]] = defaultdict(list)
+				for i, maze in enumerate(self._mazes):
+					shape_groups[maze.connection_list.shape].append(i)
+				self._groups = [
+					(
+						np.array(idxs, dtype=np.int64),
+						MazeArrays.from_mazes([self._mazes[i] for i in idxs]),
+					)
+					for idxs in shape_groups.values()
+				]
+		return self._groups
+
+	def __getitem__(self, key: str) -> Int[np.ndarray, " n_mazes"]:
+		"""the column `key`, computing it if needed"""
+		if key not in self.computed:
+			if key not in MAZE_COLUMNS:
+				raise KeyError(key)
+			column: Int[np.ndarray, " n_mazes"] = np.zeros(
+				len(self._mazes),
+				dtype=np.int64,
+			)
+			for idxs, arrays in self._get_groups():
+				column[idxs] = arrays.compute_column(key)
+			self.computed[key] = column
+		return self.computed[key]
+
+	def __iter__(self) -> typing.Iterator[str]:
+		"""iterate over `MAZE_COLUMNS`"""
+		return iter(MAZE_COLUMNS)
+
+	def __len__(self) -> int:
+		"""number of columns"""
+		return len(MAZE_COLUMNS)
+
+	def __getstate__(self) -> dict:
+		"""the packed groups are rebuilt when needed, rather than pickled"""
+		return {**self.__dict__, "_groups": None}
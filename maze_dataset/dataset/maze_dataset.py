@@ -6,17 +6,21 @@ see [demo_dataset notebook](../../notebooks/demo_dataset)
 
 import copy
 import functools
+import itertools
 import json
 import multiprocessing
+import multiprocessing.pool
+import random
 import typing
 import warnings
+import zipfile
 from collections import Counter, defaultdict
 from pathlib import Path
 from typing import Callable, Literal, Optional, cast, overload
 
 import numpy as np
 import tqdm
-from jaxtyping import Float, Int
+from jaxtyping import Bool, Float, Int
 from muutils.json_serialize import (
 	json_serialize,
 	serializable_dataclass,
@@ -30,20 +34,39 @@ from muutils.json_serialize.util import (
 )
 from muutils.misc import sanitize_fname, shorten_numerical_to_str, stable_hash
 from zanj import ZANJ
+from zanj.externals import ZANJ_MAIN
 from zanj.loading import LoaderHandler, load_item_recursive, register_loader_handler
 
 from maze_dataset.constants import Coord, CoordArray, CoordTup
+from maze_dataset.dataset.cache import (
+	DatasetCache,
+	TokenizationCache,
+	get_tokenization_cache,
+)
 from maze_dataset.dataset.dataset import (
 	DatasetFilterProtocol,
 	GPTDataset,
 	GPTDatasetConfig,
 	register_dataset_filter,
 	register_filter_namespace_for_dataset,
+	set_reproducibility,
+)
+from maze_dataset.dataset.encoded import encode_mazes
+from maze_dataset.dataset.maze_arrays import (
+	MazeArrays,
+	MazeColumns,
+	_raise_if_invalid,
+	new_data_hasher,
 )
 from maze_dataset.dataset.success_predict_math import cfg_success_predict_fn
 from maze_dataset.generation.generators import _GENERATORS_PERCOLATED, GENERATORS_MAP
 from maze_dataset.maze import LatticeMaze, SolvedMaze
 
+if typing.TYPE_CHECKING:
+	import hashlib
+
+	from typing_extensions import Self
+
 # If `n_mazes>=SERIALIZE_MINIMAL_THRESHOLD`, then the MazeDataset will use `serialize_minimal`.
 # Setting to None means that `serialize_minimal` will never be used.
 # Set to -1 to make calls to `read` use `MazeDataset._load_legacy`. Used for profiling only.
@@ -124,6 +147,19 @@ def _load_endpoint_kwargs(data: dict) -> EndpointKwargsType:
 
 MAZEDATASETCONFIG_FNAME_HASH_LENGTH: int = 5
 
+MAZE_GENERATION_VERSION: int = 1
+"""version of the scheme by which mazes are generated from a config, see `MazeDatasetConfig.generation_version`
+
+`1` reseeds the rng from the config seed and the index before every maze. configs saved
+before the field existed load as version `0`, whose mazes came from a single rng stream
+"""
+
+
+@functools.cache
+def _getsource_cached(func: Callable) -> tuple[str, ...]:
+	"""`safe_getsource`, cached per function since reading the source file dominates `serialize`"""
+	return tuple(safe_getsource(func))
+
 
 @serializable_dataclass(kw_only=True, properties_to_serialize=["grid_shape"])
 class MazeDatasetConfig(GPTDatasetConfig):
@@ -140,7 +176,7 @@ class MazeDatasetConfig(GPTDatasetConfig):
 			"__name__": gen_func.__name__,
 			"__module__": gen_func.__module__,
 			"__doc__": string_as_lines(gen_func.__doc__),
-			"source_code": safe_getsource(gen_func),
+			"source_code": list(_getsource_cached(gen_func)),
 		},
 		loading_fn=lambda data: _load_maze_ctor(data["maze_ctor"]),
 		assert_type=False,  # TODO: check the type here once muutils supports checking Callable signatures
@@ -164,6 +200,10 @@ class MazeDatasetConfig(GPTDatasetConfig):
 		assert_type=False,
 	)
 
+	# part of the serialized config, so datasets generated under different schemes get different
+	# hashes and file names, and are never mixed by `MazeDataset.from_config`
+	generation_version: int = serializable_field(default=MAZE_GENERATION_VERSION)
+
 	@property
 	def grid_shape(self) -> CoordTup:
 		"""return the shape of the grid as a tuple"""
@@ -179,15 +219,29 @@ class MazeDatasetConfig(GPTDatasetConfig):
 		"""return the maximum of the grid shape"""
 		return max(self.grid_shape)
 
+	def _hash_memo_key(self) -> str:
+		"""cheap key which changes whenever any field does, including in-place edits of dicts and lists"""
+		return repr(tuple(getattr(self, name) for name in self.__dataclass_fields__))
+
 	def stable_hash_cfg(self) -> int:
-		"""return a stable hash of the config"""
-		return stable_hash(
+		"""return a stable hash of the config
+
+		the hash is memoized, and recomputed only when some field of the config has changed
+		"""
+		memo_key: str = self._hash_memo_key()
+		memo: tuple[str, int] | None = self.__dict__.get("_stable_hash_memo")
+		if memo is not None and memo[0] == memo_key:
+			return memo[1]
+
+		hash_value: int = stable_hash(
 			json.dumps(
 				self.serialize(),
 				sort_keys=True,
 				indent=None,
 			),
 		)
+		self.__dict__["_stable_hash_memo"] = (memo_key, hash_value)
+		return hash_value
 
 	# TODO: include fname in serialized form, but exclude it when hashing so we dont infinitely loop?
 	def to_fname(self) -> str:
@@ -383,6 +437,27 @@ class MazeDatasetConfig(GPTDatasetConfig):
 		return MazeDatasetConfig.load(cfg_dict)
 
 
+def _load_missing_generation_version(cfg_cls: type[MazeDatasetConfig]) -> None:
+	"""make `cfg_cls.load` give configs saved without a `generation_version` version `0`
+
+	`serializable_dataclass` fills in the default for missing fields, which here would be
+	the current version. call on every config class after `serializable_dataclass` is applied
+	"""
+	load_fields: Callable = cfg_cls.load.__func__  # type: ignore[attr-defined]
+
+	def load(
+		cls: type[MazeDatasetConfig], data: dict | MazeDatasetConfig
+	) -> MazeDatasetConfig:
+		if isinstance(data, typing.Mapping) and "generation_version" not in data:
+			data = {**data, "generation_version": 0}
+		return load_fields(cls, data)
+
+	cfg_cls.load = classmethod(load)  # type: ignore[method-assign, assignment]
+
+
+_load_missing_generation_version(MazeDatasetConfig)
+
+
 def _generate_maze_helper(index: int) -> Optional[SolvedMaze]:  # noqa: ARG001
 	"""Helper function for generating mazes in parallel.
 
@@ -416,32 +491,338 @@ def _generate_maze_helper(index: int) -> Optional[SolvedMaze]:  # noqa: ARG001
 	)
 
 
-def _maze_gen_init_worker(config: MazeDatasetConfig) -> None:
-	"""special worker helper
+GenerationTask = tuple[MazeDatasetConfig, int, int]
+"a unit of generation work: a config, and the `[start, stop)` range of maze indices to generate for it"
+
+
+def _maze_seed(seed: int, index: int) -> int:
+	"seed for generating the maze at `index` of a dataset with the given config `seed`"
+	return int(np.random.SeedSequence([seed, index]).generate_state(1)[0])
 
-	> [!CAUTION]
-	> this makes the generation depend both on whether parallelism is used, and on the number of processes. this is bad!
 
+def _generate_maze_chunk(task: GenerationTask) -> MazeArrays:
+	"""generate the mazes with indices in `range(start, stop)` for the given config, packed into a `MazeArrays`
+
+	mazes which fail to generate are dropped. returning a few large arrays instead of
+	one `SolvedMaze` per index keeps the cost of sending results back from workers low.
+
+	the config travels with the task, so a single pool can serve any number of configs.
+	the rng is reseeded from the config seed and the index before every maze, so each maze
+	depends only on the config (minus `n_mazes`) and its index -- not on parallelism,
+	chunking, or how many mazes are generated in total
 	"""
-	# TODO: dont use globals here!
+	cfg, start, stop = task
 	global _GLOBAL_WORKER_CONFIG  # noqa: PLW0603
-	_GLOBAL_WORKER_CONFIG = config
-
-	process_id: tuple[int] = multiprocessing.current_process()._identity
-	if len(process_id) == 0:
-		# no multiprocessing, seed was already set
-		pass
-	elif len(process_id) == 1:
-		# multiprocessing, adjust seed based on process id
-		# only set numpy seed, since we do not use other random gens
-		np.random.seed(_GLOBAL_WORKER_CONFIG.seed + process_id[0])
-	else:
-		err_msg = (
-			f"unexpected process id: {process_id = }\n{multiprocessing.Process() = }"
+	_GLOBAL_WORKER_CONFIG = cfg
+
+	mazes: list[SolvedMaze] = list()
+	generation_indices: list[int] = list()
+	# when not running in a worker, leave the caller's rng as it was
+	rng_states: tuple = (random.getstate(), np.random.get_state())
+	try:
+		for index in range(start, stop):
+			set_reproducibility(_maze_seed(cfg.seed, index))
+			maze: SolvedMaze | None = _generate_maze_helper(index)
+			if maze is not None:
+				mazes.append(maze)
+				generation_indices.append(index)
+	finally:
+		random.setstate(rng_states[0])
+		np.random.set_state(rng_states[1])
+
+	return MazeArrays.from_mazes(
+		mazes,
+		grid_shape=cfg.grid_shape,
+		generation_indices=generation_indices,
+	)
+
+
+def _generate_maze_chunk_indexed(
+	indexed_task: tuple[int, GenerationTask],
+) -> tuple[int, MazeArrays]:
+	"wrapper around `_generate_maze_chunk` which passes through the task index, for use with `imap_unordered`"
+	task_idx, task = indexed_task
+	return task_idx, _generate_maze_chunk(task)
+
+
+GENERATION_MAX_CHUNKSIZE: int = 256
+"upper bound on the default number of mazes per task in `MazeDataset.generate`"
+
+
+def _split_generation_tasks(
+	cfg: MazeDatasetConfig,
+	chunksize: int,
+	index_start: int = 0,
+) -> list[GenerationTask]:
+	"split `range(index_start, cfg.n_mazes)` into contiguous tasks of at most `chunksize` mazes"
+	return [
+		(cfg, start, min(start + chunksize, cfg.n_mazes))
+		for start in range(index_start, cfg.n_mazes, chunksize)
+	]
+
+
+def _generation_task_cost(task: GenerationTask) -> int:
+	"rough cost estimate of a task: number of mazes times cells per maze"
+	cfg, start, stop = task
+	return (stop - start) * cfg.grid_n**2
+
+
+class MazeGenerationExecutor:
+	"""reusable executor for maze generation, optionally backed by a persistent `multiprocessing.Pool`
+
+	pass the same executor as `executor=` to `MazeDataset.generate`, `MazeDataset.from_config`,
+	`MazeDatasetCollection.generate` or `maze_dataset.benchmark.config_sweep.sweep` to avoid starting
+	a new pool for every dataset. since every task carries its own config, one executor can
+	generate any number of different configs. the pool is started on first use, and shut down
+	by `close()` or on leaving a `with` block:
+
+		>>> with MazeGenerationExecutor(processes=4) as executor:
+		...     for cfg in cfgs:
+		...         datasets.append(MazeDataset.from_config(cfg, executor=executor))
+
+	# Parameters:
+	- `parallel : bool`
+		whether to use a process pool. if `False`, tasks run in the calling process
+		(defaults to `True`)
+	- `processes : int | None`
+		number of worker processes, `None` for `multiprocessing.cpu_count()`
+		(defaults to `None`)
+	- `chunksize : int | None`
+		default number of mazes per task, see `default_chunksize` when `None`
+		(defaults to `None`)
+	- `pool_kwargs : dict | None`
+		any other kwargs passed to `multiprocessing.Pool`
+		(defaults to `None`)
+	"""
+
+	def __init__(
+		self,
+		parallel: bool = True,
+		processes: int | None = None,
+		chunksize: int | None = None,
+		pool_kwargs: dict | None = None,
+	) -> None:
+		"create the executor. the pool itself is only started on first use"
+		self.parallel: bool = parallel
+		self.pool_kwargs: dict = dict(pool_kwargs or dict())
+		if processes is not None:
+			self.pool_kwargs["processes"] = processes
+		self.chunksize: int | None = chunksize
+		self._pool: multiprocessing.pool.Pool | None = None
+
+	@property
+	def n_processes(self) -> int:
+		"""number of processes tasks are spread over, 1 if not parallel"""
+		if not self.parallel:
+			return 1
+		return self.pool_kwargs.get("processes") or multiprocessing.cpu_count()
+
+	def default_chunksize(self, n_mazes: int) -> int:
+		"""mazes per task for a dataset of `n_mazes`: `self.chunksize` if set, otherwise about 4 chunks per process (so slow chunks don't leave other processes idle at the end), capped at `GENERATION_MAX_CHUNKSIZE`"""
+		if self.chunksize is not None:
+			return self.chunksize
+		return max(
+			1,
+			min(GENERATION_MAX_CHUNKSIZE, -(-n_mazes // (4 * self.n_processes))),
 		)
-		raise ValueError(
-			err_msg,
+
+	def split_tasks(
+		self,
+		cfg: MazeDatasetConfig,
+		chunksize: int | None = None,
+		index_start: int = 0,
+	) -> list[GenerationTask]:
+		"""split generating the mazes of `cfg` from `index_start` onwards into tasks of `chunksize` mazes, defaulting to `default_chunksize`"""
+		return _split_generation_tasks(
+			cfg,
+			chunksize or self.default_chunksize(cfg.n_mazes - index_start),
+			index_start=index_start,
+		)
+
+	def _get_pool(self) -> multiprocessing.pool.Pool:
+		if self._pool is None:
+			self._pool = multiprocessing.Pool(**self.pool_kwargs)
+		return self._pool
+
+	def run(
+		self,
+		tasks: typing.Sequence[GenerationTask],
+		verbose: bool = False,
+	) -> list[MazeArrays]:
+		"""run generation tasks, returning one `MazeArrays` per task in the order of `tasks`
+
+		when running in parallel, tasks are submitted most expensive first (by
+		`_generation_task_cost`), so large grids don't end up as stragglers at the end.
+		tasks may belong to different configs.
+
+		# Parameters:
+		- `tasks : typing.Sequence[GenerationTask]`
+			`(config, start, stop)` tuples
+		- `verbose : bool`
+			whether to show a progress bar
+			(defaults to `False`)
+
+		# Returns:
+		- `list[MazeArrays]`
+			results, `output[i]` corresponding to `tasks[i]`
+		"""
+		results: list[MazeArrays | None] = [None] * len(tasks)
+		pbar: tqdm.tqdm = tqdm.tqdm(
+			total=sum(stop - start for _, start, stop in tasks),
+			unit="maze",
+			desc="generating & solving mazes",
+			disable=not verbose,
 		)
+		if self.parallel:
+			order: list[int] = sorted(
+				range(len(tasks)),
+				key=lambda i: _generation_task_cost(tasks[i]),
+				reverse=True,
+			)
+			for task_idx, chunk in self._get_pool().imap_unordered(
+				_generate_maze_chunk_indexed,
+				[(i, tasks[i]) for i in order],
+			):
+				results[task_idx] = chunk
+				pbar.update(tasks[task_idx][2] - tasks[task_idx][1])
+		else:
+			for task_idx, task in enumerate(tasks):
+				results[task_idx] = _generate_maze_chunk(task)
+				pbar.update(task[2] - task[1])
+		pbar.close()
+
+		return results  # type: ignore[return-value]
+
+	def close(self) -> None:
+		"""shut down the pool, if one was started. the executor can still be used afterwards, and will start a new pool"""
+		if self._pool is not None:
+			self._pool.terminate()
+			self._pool.join()
+			self._pool = None
+
+	def __enter__(self) -> "Self":
+		"use as a context manager, closing the pool on exit"
+		return self
+
+	def __exit__(self, *args) -> None:
+		"close the pool"
+		self.close()
+
+	def __getstate__(self) -> dict:
+		"executors hold a pool, and cannot be sent to other processes"
+		err_msg: str = "`MazeGenerationExecutor` cannot be pickled, create one in each process instead"
+		raise TypeError(err_msg)
+
+
+def _load_generation_indices(data: JSONdict) -> dict:
+	"kwargs for `generation_indices` and `n_generation_attempts`, for loading. missing in files from older versions"
+	if "generation_indices" not in data:
+		return dict()
+	return dict(
+		generation_indices=np.asarray(
+			load_item_recursive(data["generation_indices"], tuple()),
+			dtype=np.int64,
+		),
+		n_generation_attempts=int(data["n_generation_attempts"]),  # type: ignore[arg-type]
+	)
+
+
+def _load_minimal_arrays(
+	data: JSONdict,
+	solution_lengths: Int[np.ndarray, " n_mazes"],
+	solutions_concat: Int[np.ndarray, "total_solution_len 2"],
+) -> MazeArrays:
+	"""columns of a dataset saved in one of the minimal formats, as loaded, without copies
+
+	mazes built from these are views into the loaded arrays and are not validated, which is
+	what makes loading millions of mazes take seconds. call `MazeDataset.validate` for untrusted files
+	"""
+	solution_offsets: Int[np.ndarray, " n_mazes_plus_1"] = np.zeros(
+		len(solution_lengths) + 1,
+		dtype=np.int64,
+	)
+	np.cumsum(solution_lengths, out=solution_offsets[1:])
+	return MazeArrays(
+		connection_lists=np.asarray(
+			load_item_recursive(data["maze_connection_lists"], tuple()),
+		),
+		solutions=solutions_concat,
+		solution_offsets=solution_offsets,
+	)
+
+
+def _find_local_prefix_candidates(
+	cfg: MazeDatasetConfig,
+	local_base_path: Path,
+) -> list[tuple[int, Path]]:
+	"""find local datasets which can be sliced or extended into the unfiltered dataset for `cfg`
+
+	these are datasets saved with their `generation_indices`, whose configs match `cfg`
+	apart from `n_mazes` and (at most) `collect_generation_meta` having been applied.
+	datasets with more generation attempts than `cfg.n_mazes` whose metadata was collected
+	are left out, since the collected counts can't be sliced (see `MazeDataset._from_local_prefix`).
+	only the main json of each file with a matching name prefix is read.
+
+	# Returns:
+	- `list[tuple[int, Path]]`
+		`(n_generation_attempts, path)` for each candidate
+	"""
+	if not local_base_path.is_dir():
+		return list()
+
+	def _comparable(cfg_ser: dict) -> dict:
+		return {
+			k: v for k, v in cfg_ser.items() if k not in ("n_mazes", "applied_filters")
+		}
+
+	cfg_target: dict = _comparable(json.loads(json.dumps(cfg.serialize())))
+	# everything in `to_fname` before the number of mazes
+	fname_prefix: str = sanitize_fname(f"{cfg.name}-g{cfg.grid_n}-n")
+	candidates: list[tuple[int, Path]] = list()
+	for path in local_base_path.glob(f"{fname_prefix}*.zanj"):
+		try:
+			with zipfile.ZipFile(path) as zf:
+				data: dict = json.loads(zf.read(ZANJ_MAIN))
+		except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+			continue
+
+		if (
+			not isinstance(data, dict)
+			or not str(data.get(_FORMAT_KEY, "")).startswith("MazeDataset")
+			or "n_generation_attempts" not in data
+		):
+			continue
+		if _comparable(data["cfg"]) != cfg_target:
+			continue
+		if any(
+			filter_info["name"] != "collect_generation_meta"
+			for filter_info in data["cfg"].get("applied_filters", [])
+		):
+			continue
+
+		n_generation_attempts: int = int(data["n_generation_attempts"])
+		if (
+			n_generation_attempts > cfg.n_mazes
+			and data.get("generation_metadata_collected") is not None
+		):
+			continue
+
+		candidates.append((n_generation_attempts, path))
+
+	return candidates
+
+
+def _merge_generation_metadata_collected(a: dict, b: dict) -> dict:
+	"""add up the counts of two collected generation metadata dicts
+
+	both are `json_serialize`d first, so that keys match those of metadata loaded from disk
+	"""
+	merged: dict = json_serialize(a)  # type: ignore[assignment]
+	for key, counts in json_serialize(b).items():  # type: ignore[union-attr]
+		merged_counts: dict = merged.setdefault(key, dict())
+		for value, count in counts.items():
+			merged_counts[value] = merged_counts.get(value, 0) + count
+	return merged
 
 
 class MazeDataset(GPTDataset):
@@ -450,14 +831,35 @@ class MazeDataset(GPTDataset):
 	def __init__(
 		self,
 		cfg: MazeDatasetConfig,
-		mazes: typing.Sequence[SolvedMaze],
+		mazes: typing.Sequence[SolvedMaze] | MazeArrays,
 		generation_metadata_collected: dict | None = None,
+		generation_indices: Int[np.ndarray, " n_mazes"] | None = None,
+		n_generation_attempts: int | None = None,
 	) -> None:
-		"""initialize a maze dataset from a config and a list of solved mazes"""
+		"""initialize a maze dataset from a config and a list of solved mazes
+
+		`mazes` may also be a `MazeArrays`, in which case the `SolvedMaze` objects are only
+		built (as views into the arrays, and without validation) when `mazes` is first accessed.
+		indexing, `len`, `data_hash` and `maze_columns` work directly on the arrays
+
+		`generation_indices` and `n_generation_attempts` are set by `generate`: maze `i` was
+		generated at index `generation_indices[i]` of `range(n_generation_attempts)`, the
+		missing indices being mazes which failed to generate. they are what lets `from_config`
+		reuse local datasets which differ only in `n_mazes`, and are `None` once filtered
+		"""
 		super().__init__()
 		self.cfg: MazeDatasetConfig = cfg
-		self.mazes: list[SolvedMaze] = list(mazes)
+		self._mazes: list[SolvedMaze] | None = None
+		self._maze_arrays: MazeArrays | None = None
+		if isinstance(mazes, MazeArrays):
+			self._maze_arrays = mazes
+		else:
+			self._mazes = list(mazes)
 		self.generation_metadata_collected: dict | None = generation_metadata_collected
+		self.generation_indices: Int[np.ndarray, " n_mazes"] | None = (
+			None if generation_indices is None else np.asarray(generation_indices)
+		)
+		self.n_generation_attempts: int | None = n_generation_attempts
 
 	@classmethod
 	def from_config(
@@ -472,14 +874,17 @@ class MazeDataset(GPTDataset):
 		except_on_config_mismatch: bool = True,
 		allow_generation_metadata_filter_mismatch: bool = True,
 		verbose: bool = False,
+		*,
+		cache: DatasetCache | None = None,
 		**kwargs,
 	) -> "MazeDataset":
 		"""create a maze dataset from a config
 
 		priority of loading:
-		1. load from local
-		2. download
-		3. generate
+		1. load from local (or from `cache`, if given)
+		2. build from a local dataset differing only in `n_mazes`
+		3. download
+		4. generate
 
 		"""
 		return cast(
@@ -495,16 +900,136 @@ class MazeDataset(GPTDataset):
 				except_on_config_mismatch=except_on_config_mismatch,
 				allow_generation_metadata_filter_mismatch=allow_generation_metadata_filter_mismatch,
 				verbose=verbose,
+				cache=cache,
 				**kwargs,
 			),
 		)
 
+	@property
+	def mazes(self) -> list[SolvedMaze]:
+		"""the list of mazes, built from the arrays on first access if the dataset was loaded lazily"""
+		if self._mazes is None:
+			arrays: MazeArrays = self._maze_arrays  # type: ignore[assignment]
+			self._mazes = arrays.to_mazes()
+			self._maze_arrays = None
+			# memos computed from the arrays are still valid for the mazes built from them
+			for memo_key in ("_data_hash_memo", "_maze_columns_memo"):
+				memo: tuple | None = self.__dict__.get(memo_key)
+				if memo is not None and memo[0] is arrays:
+					self.__dict__[memo_key] = (list(self._mazes), memo[1])
+		return self._mazes
+
+	@mazes.setter
+	def mazes(self, mazes: typing.Sequence[SolvedMaze]) -> None:
+		self._mazes = list(mazes)
+		self._maze_arrays = None
+
+	def validate(self) -> None:
+		"""check all mazes have a valid solution, vectorized. see `MazeArrays.validate`
+
+		loading from the minimal formats skips the per-maze checks of `SolvedMaze.__init__`,
+		so call this on files which are not trusted
+
+		# Raises:
+		- `ValueError` : if any maze is invalid
+		"""
+		if self._maze_arrays is not None:
+			self._maze_arrays.validate()
+			return
+		shape_groups: dict[tuple[int, ...], list[int]] = defaultdict(list)
+		for i, maze in enumerate(self.mazes):
+			shape_groups[maze.connection_list.shape].append(i)
+		invalid: Bool[np.ndarray, " n_mazes"] = np.zeros(len(self), dtype=np.bool_)
+		for idxs in shape_groups.values():
+			invalid[idxs] = MazeArrays.from_mazes(
+				[self.mazes[i] for i in idxs],
+			).invalid_mask()
+		_raise_if_invalid(invalid)
+
 	def data_hash(self) -> int:
-		"""return a hash of the data"""
-		return stable_hash(str(tuple([x.serialize() for x in self.mazes])))
+		"""return a 64 bit hash of the connection lists and solutions of all mazes
+
+		raw array bytes are streamed through `blake2b` (see `MazeArrays.update_data_hasher`),
+		with mazes held as `SolvedMaze` objects packed with `MazeArrays.from_mazes` first, so both
+		storage backends hash identically. the hasher state is kept, so if mazes were only appended
+		since the last call, just the new mazes are hashed. generation metadata is not part of the hash
+		"""
+		hashed_mazes: list[SolvedMaze]
+		hasher: hashlib.blake2b
+		memo: tuple[list[SolvedMaze], hashlib.blake2b] | None = self.__dict__.get(
+			"_data_hash_memo",
+		)
+		if self._maze_arrays is not None:
+			arrays: MazeArrays = self._maze_arrays
+			if memo is None or memo[0] is not arrays:
+				hasher = new_data_hasher()
+				arrays.update_data_hasher(hasher)
+				self.__dict__["_data_hash_memo"] = (arrays, hasher)
+			return int.from_bytes(
+				self.__dict__["_data_hash_memo"][1].digest(), "little"
+			)
+
+		n_hashed: int = 0 if memo is None else len(memo[0])
+		if (
+			memo is not None
+			and n_hashed <= len(self.mazes)
+			and self.mazes[:n_hashed] == memo[0]
+		):
+			hashed_mazes, hasher = memo[0], memo[1].copy()
+		else:
+			hashed_mazes, hasher = [], new_data_hasher()
+			n_hashed = 0
+
+		# runs of mazes with the same grid shape can be packed together
+		for _, run in itertools.groupby(
+			self.mazes[n_hashed:],
+			key=lambda maze: maze.connection_list.shape,
+		):
+			MazeArrays.from_mazes(list(run)).update_data_hasher(hasher)
+		self.__dict__["_data_hash_memo"] = (
+			hashed_mazes + self.mazes[n_hashed:],
+			hasher,
+		)
+		return int.from_bytes(hasher.digest(), "little")
+
+	def __getstate__(self) -> dict:
+		"""state for pickling, with the mazes packed into a `MazeArrays`
+
+		pickling a handful of large arrays is much faster than pickling each `SolvedMaze`, which
+		matters when sending big datasets to worker processes. once unpickled, the dataset is lazy
+		(see `__init__`). mazes of several grid shapes can't be packed, and are pickled as a list.
+		the `data_hash` memo is dropped, since hashers can't be pickled
+		"""
+		state: dict = self.__dict__.copy()
+		state.pop("_data_hash_memo", None)
+		mazes: list[SolvedMaze] | None = state["_mazes"]
+		if mazes and len({maze.connection_list.shape for maze in mazes}) == 1:
+			arrays: MazeArrays = MazeArrays.from_mazes(mazes)
+			if all(meta is None for meta in arrays.generation_meta):  # type: ignore[union-attr]
+				arrays.generation_meta = None
+			state["_mazes"] = None
+			state["_maze_arrays"] = arrays
+			columns: MazeColumns | None = self._get_maze_columns_memo()
+			state.pop("_maze_columns_memo", None)
+			if columns is not None:
+				state["_maze_columns_memo"] = (
+					arrays,
+					MazeColumns(arrays, columns.computed),
+				)
+		return state
+
+	def __setstate__(self, state: dict) -> None:
+		"""restore from `__getstate__`, including pickles from before `mazes` could be lazy"""
+		if "mazes" in state:
+			state["_mazes"] = state.pop("mazes")
+		state.setdefault("_maze_arrays", None)
+		self.__dict__.update(state)
 
 	def __getitem__(self, i: int) -> SolvedMaze:
 		"""get a maze by index"""
+		if self._maze_arrays is not None and isinstance(i, (int, np.integer)):
+			# don't build every maze just to get one
+			return self._maze_arrays.get_maze(range(len(self))[i])
 		return self.mazes[i]
 
 	def __deepcopy__(self, memo) -> "MazeDataset":  # noqa: ANN001
@@ -514,6 +1039,71 @@ class MazeDataset(GPTDataset):
 		"""
 		return MazeDataset.load(self._serialize_full())
 
+	def _select(
+		self,
+		keep: Bool[np.ndarray, " n_mazes"] | Int[np.ndarray, " n_selected"],
+		generation_metadata_collected: dict | None = None,
+	) -> "MazeDataset":
+		"""new dataset with the mazes picked by a boolean mask or an array of indices
+
+		this is what filters return instead of a deep copy: the config is copied, but the
+		`SolvedMaze` objects are shared with this dataset (they are frozen, and filters which
+		modify them replace them instead, see `_maze_without_generation_meta`).
+		a real copy is only made by `copy.deepcopy` or when saving
+		"""
+		keep = np.asarray(keep)
+		indices: Int[np.ndarray, " n_selected"] = (
+			np.flatnonzero(keep) if keep.dtype == np.bool_ else keep
+		)
+		output: MazeDataset = MazeDataset(
+			cfg=copy.deepcopy(self.cfg),
+			mazes=[self.mazes[i] for i in indices.tolist()],
+			generation_metadata_collected=copy.deepcopy(generation_metadata_collected),
+		)
+		# carry over the columns already computed
+		columns: MazeColumns | None = self._get_maze_columns_memo()
+		if columns is not None:
+			mazes: list[SolvedMaze] = list(output.mazes)
+			output.__dict__["_maze_columns_memo"] = (
+				mazes,
+				MazeColumns(
+					mazes,
+					{key: col[indices] for key, col in columns.computed.items()},
+				),
+			)
+		return output
+
+	def _get_maze_columns_memo(self) -> MazeColumns | None:
+		"""the memoized columns, if they are for the current mazes"""
+		memo: tuple[list[SolvedMaze], MazeColumns] | None = self.__dict__.get(
+			"_maze_columns_memo"
+		)
+		if memo is None:
+			return None
+		if self._maze_arrays is not None:
+			return memo[1] if memo[0] is self._maze_arrays else None
+		if memo[0] == self.mazes:
+			return memo[1]
+		return None
+
+	def maze_columns(self) -> MazeColumns:
+		"""per-maze scalar columns (see `maze_arrays.MAZE_COLUMNS`), used by column filters
+
+		each column is computed on first access, vectorized over all mazes, and memoized until the
+		mazes change. filtered datasets inherit the rows of the columns computed so far, so chains
+		of filters don't recompute them. columns are not saved with the dataset
+		"""
+		columns: MazeColumns | None = self._get_maze_columns_memo()
+		if columns is not None:
+			return columns
+
+		mazes: MazeArrays | list[SolvedMaze] = (
+			self._maze_arrays if self._maze_arrays is not None else list(self.mazes)
+		)
+		columns = MazeColumns(mazes)
+		self.__dict__["_maze_columns_memo"] = (mazes, columns)
+		return columns
+
 	# TYPING: get type hints on the tokenizer here
 	@overload
 	def as_tokens(
@@ -547,17 +1137,77 @@ class MazeDataset(GPTDataset):
 			[["a", "b", "c"], ["d", "e", "f"]]
 			>>> dataset.as_tokens(join_tokens_individual_maze=True)
 			["a b c", "d e f"]
+
+		if a default `TokenizationCache` is set with `set_tokenization_cache`, the tokens are
+		decoded from `encode_all` (which encodes and caches the whole dataset, even with a `limit`),
+		so shuffling tokenizers are seeded per maze as described there
 		"""
-		output: list[list[str]] = [
-			maze.as_tokens(maze_tokenizer) for maze in self.mazes[:limit]
-		]
+		output: list[list[str]]
+		token_arr: list[str] | None = getattr(maze_tokenizer, "token_arr", None)
+		if get_tokenization_cache() is not None and token_arr is not None:
+			token_ids, offsets = self.encode_all(maze_tokenizer)
+			n_mazes: int = len(range(len(self))[:limit])
+			output = [
+				tokens.tolist()
+				for tokens in np.split(
+					np.asarray(token_arr, dtype=object)[token_ids[: offsets[n_mazes]]],
+					offsets[1:n_mazes],
+				)
+			]
+		else:
+			output = [maze.as_tokens(maze_tokenizer) for maze in self.mazes[:limit]]
 		if join_tokens_individual_maze:
 			return [" ".join(tokens) for tokens in output]
 		else:
 			return output
 
+	def encode_all(
+		self,
+		maze_tokenizer,  # noqa: ANN001
+		n_workers: int = 1,
+		seed: int | None = None,
+		*,
+		chunksize: int | None = None,
+		verbose: bool = False,
+		cache: TokenizationCache | None = None,
+	) -> tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]]:
+		"""encode every maze to token ids, as a flat `int16`/`int32` buffer plus offsets
+
+		much lighter than `as_tokens` for large datasets, and can be spread over `n_workers`
+		processes. the tokens of maze `i` are `token_ids[offsets[i] : offsets[i + 1]]`.
+		shuffling tokenizers are reseeded per maze from `seed` (the config seed if `None`) and
+		the index of the maze, so the output is the same for any `n_workers`.
+		see `maze_dataset.dataset.encoded.encode_mazes` for details
+
+		if a `TokenizationCache` is given as `cache` or set with `set_tokenization_cache`, the
+		output is looked up in it by data hash, tokenizer, and seed, and memory mapped on a hit.
+		on a miss, it is added to the cache
+		"""
+		seed = self.cfg.seed if seed is None else seed
+		cache = cache if cache is not None else get_tokenization_cache()
+		if cache is not None:
+			cached: tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]] | None = (
+				cache.get(self.data_hash(), maze_tokenizer, seed)  # type: ignore[arg-type]
+			)
+			if cached is not None:
+				return cached
+
+		output: tuple[np.ndarray, Int[np.ndarray, " n_mazes_plus_1"]] = encode_mazes(
+			self._maze_arrays if self._maze_arrays is not None else self.mazes,
+			maze_tokenizer,
+			seed=seed,  # type: ignore[arg-type]
+			n_workers=n_workers,
+			chunksize=chunksize,
+			verbose=verbose,
+		)
+		if cache is not None:
+			cache.put(self.data_hash(), maze_tokenizer, seed, *output)  # type: ignore[arg-type]
+		return output
+
 	def __len__(self) -> int:
 		"""return the number of mazes in the dataset"""
+		if self._maze_arrays is not None:
+			return len(self._maze_arrays)
 		return len(self.mazes)
 
 	def __eq__(self, other: object) -> bool:
@@ -576,71 +1226,230 @@ class MazeDataset(GPTDataset):
 		gen_parallel: bool = False,
 		pool_kwargs: dict | None = None,
 		verbose: bool = False,
+		*,
+		chunksize: int | None = None,
+		executor: MazeGenerationExecutor | None = None,
+		_index_start: int = 0,
 	) -> "MazeDataset":
-		"""Generate a maze dataset given a config and some generation parameters"""
+		"""Generate a maze dataset given a config and some generation parameters
+
+		each maze depends only on the config (apart from `n_mazes`) and its index, so the
+		first `k` mazes of a dataset are the same as those of a smaller one with `n_mazes=k`
+
+		# Parameters:
+		- `cfg : MazeDatasetConfig`
+			config to generate the dataset from. not modified
+		- `gen_parallel : bool`
+			whether to generate in parallel using a `multiprocessing.Pool`. ignored if `executor` is given
+			(defaults to `False`)
+		- `pool_kwargs : dict | None`
+			kwargs passed to `multiprocessing.Pool`. ignored if `executor` is given
+			(defaults to `None`)
+		- `verbose : bool`
+			whether to show a progress bar
+			(defaults to `False`)
+		- `chunksize : int | None`
+			number of mazes generated per task. each task returns its mazes packed into
+			a `MazeArrays`, so larger chunks mean less per-task overhead and smaller
+			chunks mean better load balancing. if `None`, uses
+			`MazeGenerationExecutor.default_chunksize`
+			(defaults to `None`)
+		- `executor : MazeGenerationExecutor | None`
+			executor to run generation on, reusing its pool. if `None`, a temporary one is
+			created from `gen_parallel` and `pool_kwargs`, and closed afterwards
+			(defaults to `None`)
+		- `_index_start : int`
+			only generate the mazes at indices `_index_start` to `cfg.n_mazes`, used for
+			extending an existing dataset
+			(defaults to `0`)
+
+		# Raises:
+		- `ValueError` : if `cfg.generation_version` is not `MAZE_GENERATION_VERSION`, since
+			mazes can only be generated with the current scheme
+		"""
+		if cfg.generation_version != MAZE_GENERATION_VERSION:
+			err_msg: str = f"cannot generate mazes for a config with {cfg.generation_version = }, only {MAZE_GENERATION_VERSION = } is supported"
+			raise ValueError(err_msg)
+
+		if executor is None:
+			with MazeGenerationExecutor(
+				parallel=gen_parallel,
+				pool_kwargs=pool_kwargs,
+			) as temp_executor:
+				return cls.generate(
+					cfg,
+					verbose=verbose,
+					chunksize=chunksize,
+					executor=temp_executor,
+					_index_start=_index_start,
+				)
+
 		# Copy the config to avoid modifying the original
 		cfg_cpy: MazeDatasetConfig = MazeDatasetConfig.load(
 			json.loads(json.dumps(cfg.serialize())),
 		)
 
-		if pool_kwargs is None:
-			pool_kwargs = dict()
-		maze_indexes: Int[np.ndarray, " maze_index"] = np.arange(cfg_cpy.n_mazes)  # type: ignore[assignment]
-
-		solved_mazes: list[SolvedMaze | None]
-		# Configure tqdm for progress bar
-		tqdm_kwargs: dict = dict(
-			total=cfg_cpy.n_mazes,
-			unit="maze",
-			desc="generating & solving mazes",
-			disable=not verbose,
+		chunks: list[MazeArrays] = executor.run(
+			executor.split_tasks(cfg_cpy, chunksize, index_start=_index_start),
+			verbose=verbose,
 		)
-		# TODO: don't use the global unless generating in parallel!
-		if gen_parallel:
-			with multiprocessing.Pool(
-				**pool_kwargs,
-				initializer=_maze_gen_init_worker,
-				initargs=(cfg_cpy,),
-			) as pool:
-				solved_mazes = list(
-					tqdm.tqdm(
-						pool.imap(_generate_maze_helper, maze_indexes),
-						**tqdm_kwargs,
-					),
-				)
+		return cls._from_generated_chunks(cfg_cpy, chunks)
 
-		else:
-			_maze_gen_init_worker(cfg_cpy)
-			solved_mazes = list(
-				tqdm.tqdm(
-					map(
-						_generate_maze_helper,
-						maze_indexes.tolist(),
-					),
-					**tqdm_kwargs,
-				),
-			)
-
-		# Filter out None values explicitly after ensuring all results are collected
-		solved_mazes_: list[SolvedMaze] = [
-			maze for maze in solved_mazes if maze is not None
-		]
-		# solved_mazes_ = list(filter(lambda x: x is not None, solved_mazes))
+	@classmethod
+	def _from_generated_chunks(
+		cls,
+		cfg: MazeDatasetConfig,
+		chunks: list[MazeArrays],
+	) -> "MazeDataset":
+		"""assemble a dataset from the output of `MazeGenerationExecutor.run`, updating `cfg.n_mazes` in place"""
+		n_generation_attempts: int = cfg.n_mazes
+		# failed mazes were already dropped by the workers
+		arrays: MazeArrays | None = MazeArrays.concatenate(chunks) if chunks else None
 
 		# Update the config with the actual number of mazes
-		cfg_cpy.n_mazes = len(solved_mazes_)
+		cfg.n_mazes = 0 if arrays is None else len(arrays)
 
 		dataset: MazeDataset = cls(
-			cfg=cfg_cpy,
-			mazes=solved_mazes_,
+			cfg=cfg,
+			mazes=[] if arrays is None else arrays,
+			generation_indices=(
+				np.zeros(0, dtype=np.int64)
+				if arrays is None
+				else arrays.generation_indices
+			),
+			n_generation_attempts=n_generation_attempts,
 		)
 
 		dataset.update_self_config()  # Call `update_self_config()` to ensure the dataset's config reflects changes
 
-		np.random.seed(cfg_cpy.seed)  # Reset the seed to the value in the config copy
+		set_reproducibility(cfg.seed)  # Reset the seed to the value in the config copy
 
 		return dataset
 
+	@classmethod
+	def _from_local_prefix(
+		cls,
+		cfg: MazeDatasetConfig,
+		local_base_path: Path,
+		zanj: ZANJ,
+		do_generate: bool = True,
+		verbose: bool = False,
+		*,
+		cache: DatasetCache | None = None,
+		**kwargs,
+	) -> "MazeDataset | None":
+		"""build the unfiltered dataset for `cfg` from a local dataset which differs only in `n_mazes`
+
+		since each maze depends only on the config and its index (see `generate`), a local
+		dataset generated with at least `cfg.n_mazes` attempts can be sliced, and a smaller one
+		can be extended by generating only the missing indices. the result has the same mazes
+		as `generate(cfg)`, and filters from `cfg` still need to be applied.
+
+		with a `cache`, candidates are found through its index (see `DatasetCache.prefix_candidates`)
+		instead of by reading every local dataset with a matching name.
+
+		collected generation metadata can't be split by maze, so larger datasets whose metadata
+		was collected (which is every dataset saved in a minimal format) are never sliced. when
+		extending a dataset whose metadata was collected, the metadata of the new mazes is
+		collected and added to it, giving the same counts as collecting `generate(cfg)`.
+
+		kwargs are passed to `generate` when extending
+		"""
+		print_log: Callable = print if verbose else lambda *_a, **_kw: None
+		n_target: int = cfg.n_mazes
+		candidates: list[tuple[int, Path]] = (
+			_find_local_prefix_candidates(cfg, Path(local_base_path))
+			if cache is None
+			else cache.prefix_candidates(cfg)
+		)
+		# prefer slicing the smallest sufficient dataset, then extending the largest one
+		ordered: list[tuple[int, Path]] = sorted(
+			c for c in candidates if c[0] >= n_target
+		)
+		if do_generate:
+			ordered.extend(
+				sorted((c for c in candidates if c[0] < n_target), reverse=True),
+			)
+
+		for _, candidate_path in ordered:
+			print_log(f"trying to reuse local dataset {candidate_path.as_posix()}")
+			try:
+				cached: MazeDataset = cast(
+					"MazeDataset",
+					cls.read(candidate_path, zanj=zanj),
+				)
+			except Exception as e:  # noqa: BLE001
+				print_log(f"failed to load dataset: {e}")
+				continue
+			assert cached.generation_indices is not None
+			assert cached.n_generation_attempts is not None
+			if (
+				cached.n_generation_attempts > n_target
+				and cached.generation_metadata_collected is not None
+			):
+				print_log("generation metadata was collected, can't slice it")
+				continue
+			return cls._from_prefix_dataset(cfg, cached, verbose=verbose, **kwargs)
+
+		return None
+
+	@classmethod
+	def _from_prefix_dataset(
+		cls,
+		cfg: MazeDatasetConfig,
+		cached: "MazeDataset",
+		verbose: bool = False,
+		**kwargs,
+	) -> "MazeDataset":
+		"""slice or extend `cached` into the unfiltered dataset for `cfg`, see `_from_local_prefix`"""
+		print_log: Callable = print if verbose else lambda *_a, **_kw: None
+		n_target: int = cfg.n_mazes
+		n_attempts: int = cached.n_generation_attempts  # type: ignore[assignment]
+		generation_indices: np.ndarray = cached.generation_indices  # type: ignore[assignment]
+		cfg_out: MazeDatasetConfig = MazeDatasetConfig.load(
+			json.loads(json.dumps(cfg.serialize())),
+		)
+		output: MazeDataset
+		if n_attempts >= n_target:
+			keep: np.ndarray = generation_indices < n_target
+			output = cls(
+				cfg=cfg_out,
+				mazes=[m for m, k in zip(cached.mazes, keep, strict=True) if k],
+				# collected metadata only gets here if nothing is sliced off
+				generation_metadata_collected=cached.generation_metadata_collected,
+				generation_indices=generation_indices[keep],
+				n_generation_attempts=n_target,
+			)
+		else:
+			print_log(f"generating mazes {n_attempts} to {n_target}")
+			extension: MazeDataset = cls.generate(
+				cfg_out,
+				verbose=verbose,
+				_index_start=n_attempts,
+				**kwargs,
+			)
+			generation_metadata_collected: dict | None = (
+				cached.generation_metadata_collected
+			)
+			if generation_metadata_collected is not None and len(extension) > 0:
+				extension.filter_by.collect_generation_meta()
+				generation_metadata_collected = _merge_generation_metadata_collected(
+					generation_metadata_collected,
+					extension.generation_metadata_collected,  # type: ignore[arg-type]
+				)
+			output = cls(
+				cfg=cfg_out,
+				mazes=cached.mazes + extension.mazes,
+				generation_metadata_collected=generation_metadata_collected,
+				generation_indices=np.concatenate(
+					[generation_indices, extension.generation_indices],  # type: ignore[list-item]
+				),
+				n_generation_attempts=n_target,
+			)
+
+		output.update_self_config()
+		return output
+
 	@classmethod
 	def download(cls, cfg: MazeDatasetConfig, **kwargs) -> "MazeDataset":
 		"(not implemented yet!) download a maze dataset from the internet"
@@ -672,65 +1481,50 @@ class MazeDataset(GPTDataset):
 			cfg=MazeDatasetConfig.load(data["cfg"]),  # type: ignore[arg-type]
 			mazes=load_item_recursive(data["mazes"], tuple()),
 			generation_metadata_collected=data["generation_metadata_collected"],  # type: ignore[arg-type]
+			**_load_generation_indices(data),
 		)
 
 	@classmethod
 	def _load_minimal(cls, data: JSONdict) -> "MazeDataset":
+		"""load without validating the mazes, see `_load_minimal_arrays`"""
 		assert data[_FORMAT_KEY] == "MazeDataset:minimal"
+		# solutions are padded to the longest one, so pick out the unpadded coords
+		maze_solution_lengths: Int[np.ndarray, " n_mazes"] = np.asarray(
+			load_item_recursive(data["maze_solution_lengths"], tuple()),
+		)
+		maze_solutions: Int[np.ndarray, "n_mazes max_solution_len 2"] = np.asarray(
+			load_item_recursive(data["maze_solutions"], tuple()),
+		)
+		is_coord: Bool[np.ndarray, "n_mazes max_solution_len"] = (
+			np.arange(maze_solutions.shape[1]) < maze_solution_lengths[:, None]
+		)
 		return cls(
 			cfg=MazeDatasetConfig.load(data["cfg"]),  # type: ignore[arg-type]
 			generation_metadata_collected=data["generation_metadata_collected"],  # type: ignore[arg-type]
-			mazes=[
-				SolvedMaze(
-					clist,
-					soln[:slen, ...],
-				)
-				for clist, slen, soln in zip(
-					load_item_recursive(data["maze_connection_lists"], tuple()),
-					load_item_recursive(data["maze_solution_lengths"], tuple()),
-					load_item_recursive(data["maze_solutions"], tuple()),
-					strict=False,
-					# load_item_recursive(data["maze_endpoints"], tuple()),
-				)
-			],
+			**_load_generation_indices(data),
+			mazes=_load_minimal_arrays(
+				data,
+				maze_solution_lengths,
+				maze_solutions[is_coord],
+			),
 		)
 
 	@classmethod
 	def _load_minimal_soln_cat(cls, data: JSONdict) -> "MazeDataset":
+		"""load without validating the mazes, see `_load_minimal_arrays`"""
 		assert data[_FORMAT_KEY] == "MazeDataset:minimal_soln_cat"
-
-		maze_solution_lengths = load_item_recursive(
-			data["maze_solution_lengths"],
-			tuple(),
-		)
-		maze_solutions_concat = load_item_recursive(
-			data["maze_solutions_concat"],
-			tuple(),
-		)
-		maze_solutions = np.split(
-			maze_solutions_concat,
-			np.cumsum(maze_solution_lengths)[:-1],
-			axis=0,
-		)
-
 		return cls(
 			cfg=load_item_recursive(data["cfg"], tuple()),
 			generation_metadata_collected=load_item_recursive(
 				data["generation_metadata_collected"],
 				tuple(),
 			),
-			mazes=[
-				SolvedMaze(
-					connection_list=clist,
-					solution=soln,
-				)
-				for clist, soln in zip(
-					load_item_recursive(data["maze_connection_lists"], tuple()),
-					# load_item_recursive(data["maze_endpoints"], tuple()),
-					maze_solutions,
-					strict=False,
-				)
-			],
+			**_load_generation_indices(data),
+			mazes=_load_minimal_arrays(
+				data,
+				np.asarray(load_item_recursive(data["maze_solution_lengths"], tuple())),
+				np.asarray(load_item_recursive(data["maze_solutions_concat"], tuple())),
+			),
 		)
 
 	@classmethod
@@ -761,6 +1555,7 @@ class MazeDataset(GPTDataset):
 			"generation_metadata_collected": json_serialize(
 				self.generation_metadata_collected,
 			),
+			**self._serialize_generation_indices(),
 		}
 
 	def _serialize_minimal(self) -> JSONdict:
@@ -802,6 +1597,7 @@ class MazeDataset(GPTDataset):
 			# "maze_endpoints": maze_endpoints,
 			"maze_solution_lengths": maze_solution_lengths,  # type: ignore[dict-item]
 			"maze_solutions": maze_solutions,  # type: ignore[dict-item]
+			**filtered_meta._serialize_generation_indices(),
 		}
 
 	def _serialize_minimal_soln_cat(self) -> JSONdict:
@@ -850,11 +1646,21 @@ class MazeDataset(GPTDataset):
 			"maze_endpoints": maze_endpoints,  # type: ignore[dict-item]
 			"maze_solution_lengths": maze_solution_lengths,  # type: ignore[dict-item]
 			"maze_solutions_concat": maze_solutions_concat,  # type: ignore[dict-item]
+			**filtered_meta._serialize_generation_indices(),
+		}
+
+	def _serialize_generation_indices(self) -> JSONdict:
+		"the `generation_indices` and `n_generation_attempts`, omitted if unknown"
+		if self.generation_indices is None or self.n_generation_attempts is None:
+			return dict()
+		return {
+			"generation_indices": self.generation_indices,  # type: ignore[dict-item]
+			"n_generation_attempts": self.n_generation_attempts,
 		}
 
 	def update_self_config(self) -> None:
 		"""update the config to match the current state of the dataset (number of mazes, such as after filtering)"""
-		self.cfg.n_mazes = len(self.mazes)
+		self.cfg.n_mazes = len(self)
 
 	def custom_maze_filter(
 		self,
@@ -907,11 +1713,12 @@ def register_maze_filter(
 
 	@functools.wraps(method)
 	def wrapper(dataset: MazeDataset, *args, **kwargs) -> MazeDataset:
-		# copy and filter
-		new_dataset: MazeDataset = copy.deepcopy(
-			MazeDataset(
-				cfg=dataset.cfg,
-				mazes=[m for m in dataset.mazes if method(m, *args, **kwargs)],
+		# filter, sharing the mazes with the original dataset
+		new_dataset: MazeDataset = dataset._select(
+			np.fromiter(
+				(method(m, *args, **kwargs) for m in dataset.mazes),
+				dtype=np.bool_,
+				count=len(dataset),
 			),
 		)
 		# update the config
@@ -924,21 +1731,308 @@ def register_maze_filter(
 	return wrapper
 
 
+def register_column_filter(
+	method: typing.Callable[..., Bool[np.ndarray, " n_mazes"]],
+) -> DatasetFilterProtocol:
+	"""register a filter which computes a mask from the per-maze columns of the dataset
+
+	`method` is given the `MazeColumns` returned by `MazeDataset.maze_columns` and the filter arguments,
+	and returns a boolean mask of the mazes to keep. this avoids any python code per maze.
+
+	method should be a staticmethod of a namespace class registered with `register_filter_namespace_for_dataset`
+	"""
+
+	@functools.wraps(method)
+	def wrapper(dataset: MazeDataset, *args, **kwargs) -> MazeDataset:
+		new_dataset: MazeDataset = dataset._select(
+			method(dataset.maze_columns(), *args, **kwargs),
+		)
+		# update the config
+		new_dataset.cfg.applied_filters.append(
+			dict(name=method.__name__, args=args, kwargs=kwargs),
+		)
+		new_dataset.update_self_config()
+		return new_dataset
+
+	return wrapper
+
+
+_POPCOUNT_TABLE: Int[np.ndarray, " 256"] = np.array(
+	[i.bit_count() for i in range(256)],
+	dtype=np.int64,
+)
+"number of set bits in each possible byte"
+
+_NEAR_DUPLICATE_CHUNK_ELEMENTS: int = 2**22
+"max number of elements in the temporary arrays used when comparing candidate pairs"
+
+
+def _rows_as_void(rows: np.ndarray) -> np.ndarray:
+	"""view each row of a 2d array as a single opaque value, for hashing and sorting"""
+	rows = np.ascontiguousarray(rows)
+	return rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+
+
+def _pairwise_distance(a: np.ndarray, b: np.ndarray, packed_bits: bool) -> np.ndarray:
+	"""number of differing bits (if `packed_bits`) or elements between each row of `a` and `b`"""
+	if packed_bits:
+		return _POPCOUNT_TABLE[np.bitwise_xor(a[:, None, :], b[None, :, :])].sum(
+			axis=-1,
+		)
+	return (a[:, None, :] != b[None, :, :]).sum(axis=-1)
+
+
+def _near_duplicate_mask(
+	features: np.ndarray,
+	max_distance: int,
+	packed_bits: bool = False,
+) -> Bool[np.ndarray, " n"]:
+	"""find rows which have a later row within `max_distance` of them
+
+	distance is the number of differing elements, or differing bits if `packed_bits`
+	(in which case `features` should be `np.packbits` output). exact duplicates are grouped first,
+	then candidate pairs are found by multi-index hashing: if two rows are within `max_distance`,
+	then splitting them into `max_distance + 1` blocks, at least one block is identical. only rows
+	sharing a block are compared, so this is close to linear for rows which are not all similar
+
+	# Parameters:
+	- `features : np.ndarray`
+		2d array, one row per item
+	- `max_distance : int`
+		rows at distance `<= max_distance` are near duplicates
+	- `packed_bits : bool`
+		count differing bits rather than differing elements
+		(defaults to `False`)
+
+	# Returns:
+	- `Bool[np.ndarray, " n"]`
+		`True` for row `i` if some row `j > i` is within `max_distance` of it
+	"""
+	n: int = features.shape[0]
+	if n == 0 or max_distance < 0:
+		return np.zeros(n, dtype=np.bool_)
+
+	# exact duplicates: every occurrence but the last of each distinct row
+	inverse: Int[np.ndarray, " n"]
+	_, inverse = np.unique(_rows_as_void(features), return_inverse=True)
+	inverse = inverse.ravel()
+	last: Int[np.ndarray, " n_distinct"] = np.full(inverse.max() + 1, -1)
+	np.maximum.at(last, inverse, np.arange(n))
+	is_duplicate: Bool[np.ndarray, " n"] = np.arange(n) != last[inverse]
+	if max_distance == 0:
+		return is_duplicate
+
+	# among distinct rows, `distinct[r]` is a near duplicate if a row within `max_distance` of it
+	# has its last occurrence later
+	distinct: np.ndarray = features[last]
+	near: Bool[np.ndarray, " n_distinct"] = np.zeros(len(last), dtype=np.bool_)
+	width: int = features.shape[1]
+	# with fewer columns than blocks, the pigeonhole argument fails, so compare all rows
+	block_bounds: list[int] = (
+		np.linspace(0, width, max_distance + 2, dtype=int).tolist()
+		if width > max_distance
+		else [0, 0]
+	)
+	for lo, hi in itertools.pairwise(block_bounds):
+		bucket_ids: Int[np.ndarray, " n_distinct"]
+		if hi == lo:
+			bucket_ids = np.zeros(len(last), dtype=np.int64)
+		else:
+			_, bucket_ids = np.unique(
+				_rows_as_void(distinct[:, lo:hi]),
+				return_inverse=True,
+			)
+		order: Int[np.ndarray, " n_distinct"] = np.argsort(
+			bucket_ids.ravel(), kind="stable"
+		)
+		bucket_starts: Int[np.ndarray, " n_buckets_plus_1"] = np.flatnonzero(
+			np.diff(bucket_ids.ravel()[order], prepend=-1, append=-1),
+		)
+		for start, end in itertools.pairwise(bucket_starts):
+			if end - start < 2:  # noqa: PLR2004
+				continue
+			members: Int[np.ndarray, " bucket"] = order[start:end]
+			# rows already known to be near duplicates don't need checking again
+			queries: Int[np.ndarray, " n_queries"] = members[~near[members]]
+			chunk: int = max(
+				1,
+				_NEAR_DUPLICATE_CHUNK_ELEMENTS // (len(members) * width),
+			)
+			for q in range(0, len(queries), chunk):
+				query: Int[np.ndarray, " chunk"] = queries[q : q + chunk]
+				within: Bool[np.ndarray, "chunk bucket"] = (
+					_pairwise_distance(
+						distinct[query],
+						distinct[members],
+						packed_bits=packed_bits,
+					)
+					<= max_distance
+				) & (last[members][None, :] > last[query][:, None])
+				near[query] |= within.any(axis=1)
+
+	is_duplicate[last] = near
+	return is_duplicate
+
+
+def _near_duplicate_mask_grouped(
+	arrays: list[np.ndarray],
+	max_distance: int,
+	packed_bits: bool = False,
+) -> Bool[np.ndarray, " n"]:
+	"""`_near_duplicate_mask` on flattened `arrays`, only comparing arrays of the same shape"""
+	groups: dict[tuple[int, ...], list[int]] = defaultdict(list)
+	for i, arr in enumerate(arrays):
+		groups[arr.shape].append(i)
+
+	is_duplicate: Bool[np.ndarray, " n"] = np.zeros(len(arrays), dtype=np.bool_)
+	for idxs in groups.values():
+		features: np.ndarray = np.stack([arrays[i].ravel() for i in idxs])
+		if packed_bits:
+			features = np.packbits(features.astype(np.bool_), axis=1)
+		is_duplicate[idxs] = _near_duplicate_mask(
+			features.reshape(len(idxs), -1),
+			max_distance,
+			packed_bits=packed_bits,
+		)
+	return is_duplicate
+
+
+def _maze_without_generation_meta(maze: SolvedMaze) -> SolvedMaze:
+	"""shallow copy of `maze` with `generation_meta` cleared, leaving `maze` itself untouched"""
+	new_maze: SolvedMaze = object.__new__(type(maze))
+	new_maze.__dict__.update(maze.__dict__)
+	# hacky because it's a frozen dataclass
+	new_maze.__dict__["generation_meta"] = None
+	return new_maze
+
+
+def _count_coords(coords: Int[np.ndarray, "n lattice_dim"]) -> dict[CoordTup, int]:
+	"""count occurrences of each coordinate, by summing into a grid of counts"""
+	if len(coords) == 0:
+		return dict()
+	grid_shape: tuple[int, ...] = tuple((coords.max(axis=0) + 1).tolist())
+	counts: Int[np.ndarray, "row col"] = np.bincount(
+		np.ravel_multi_index(tuple(coords.T), grid_shape),
+		minlength=int(np.prod(grid_shape)),
+	).reshape(grid_shape)
+	return _grid_counts_to_dict(counts)
+
+
+def _grid_counts_to_dict(counts: Int[np.ndarray, "row col"]) -> dict[CoordTup, int]:
+	"""`{coord: count}` for every cell of `counts` with a nonzero count"""
+	nonzero: tuple[np.ndarray, ...] = np.nonzero(counts)
+	return dict(
+		zip(
+			zip(*(idx.tolist() for idx in nonzero), strict=True),
+			counts[nonzero].tolist(),
+			strict=True,
+		),
+	)
+
+
+def _count_generation_meta_values(  # noqa: C901, PLR0912
+	key: str,
+	values: list,
+	lattice_dim: int,
+) -> dict:
+	"""count the values of a single `generation_meta` key across mazes, for `collect_generation_meta`
+
+	basic types are counted by value, and coordinates (single coords, arrays or sets of coords,
+	or boolean masks over the grid) are counted per coordinate, as tuples
+
+	# Raises:
+	- `ValueError` : if a list or array is not a coord or an array of coords
+	- `TypeError` : if a value is of an unexpected type
+	"""
+	# fast path: all values are scalars of one basic type
+	value_type: type = type(values[0])
+	if value_type in (bool, int, float, str) and all(
+		type(v) is value_type for v in values
+	):
+		uniques: np.ndarray
+		counts: np.ndarray
+		uniques, counts = np.unique(np.array(values), return_counts=True)
+		return dict(zip(uniques.tolist(), counts.tolist(), strict=True))
+
+	counter: Counter = Counter()
+	coords: list[Int[np.ndarray, "n lattice_dim"]] = list()
+	# masks over the grid (the compact form of `visited_cells`) are summed per grid shape
+	mask_sums: dict[tuple[int, ...], Int[np.ndarray, "row col"]] = dict()
+	for value in values:
+		if isinstance(value, (bool, int, float, str)):  # noqa: UP038
+			counter[value] += 1
+
+		elif isinstance(value, np.ndarray) and value.dtype == np.bool_:
+			if value.shape in mask_sums:
+				mask_sums[value.shape] += value
+			else:
+				mask_sums[value.shape] = value.astype(np.int64)
+
+		elif isinstance(value, set):
+			# special case for visited_cells. `Counter.update` on a set of tuples is already fast
+			counter.update(value)
+
+		elif isinstance(value, (list, np.ndarray)):  # noqa: UP038
+			if isinstance(value, list):
+				try:
+					value = np.array(value)  # noqa: PLW2901
+				except ValueError as convert_to_np_err:
+					err_msg: str = (
+						f"Cannot collect generation meta for {key} as it is a list of type '{type(value[0]) = !s}'"
+						"\nexpected either a basic type (bool, int, float, str), a numpy coord, or a numpy array of coords"
+					)
+					raise ValueError(err_msg) from convert_to_np_err
+
+			if (len(value.shape) == 1) and (value.shape[0] == lattice_dim):
+				# assume its a single coordinate
+				coords.append(value[None, :])
+			# magic value is fine here
+			elif (len(value.shape) == 2) and (  # noqa: PLR2004
+				value.shape[1] == lattice_dim
+			):
+				# assume its a list of coordinates
+				coords.append(value)
+			else:
+				err_msg: str = (
+					f"Cannot collect generation meta for {key} as it is an ndarray of shape {value.shape}\n"
+					"expected either a coord of shape (2,) or a list of coords of shape (n, 2)"
+				)
+				raise ValueError(err_msg)
+		else:
+			err_msg: str = (
+				f"Cannot collect generation meta for {key} as it is of type '{type(value)!s}'\n"
+				"expected either a basic type (bool, int, float, str), a numpy coord, or a numpy array of coords"
+			)
+			raise TypeError(err_msg)
+
+	if coords:
+		counter.update(_count_coords(np.concatenate(coords).astype(np.int64)))
+	for mask_sum in mask_sums.values():
+		counter.update(_grid_counts_to_dict(mask_sum))
+	return dict(counter)
+
+
 @register_filter_namespace_for_dataset(MazeDataset)
 class MazeDatasetFilters:
 	"namespace for filters for `MazeDataset`s"
 
-	@register_maze_filter
+	@register_column_filter
 	@staticmethod
-	def path_length(maze: SolvedMaze, min_length: int) -> bool:
+	def path_length(
+		columns: MazeColumns,
+		min_length: int,
+	) -> Bool[np.ndarray, " n_mazes"]:
 		"""filter out mazes with a solution length less than `min_length`"""
-		return len(maze.solution) >= min_length
+		return columns["solution_length"] >= min_length
 
-	@register_maze_filter
+	@register_column_filter
 	@staticmethod
-	def start_end_distance(maze: SolvedMaze, min_distance: int) -> bool:
+	def start_end_distance(
+		columns: MazeColumns,
+		min_distance: int,
+	) -> Bool[np.ndarray, " n_mazes"]:
 		"""filter out datasets where the start and end pos are less than `min_distance` apart on the manhattan distance (ignoring walls)"""
-		return np.linalg.norm(maze.start_pos - maze.end_pos, 1) >= min_distance
+		return columns["start_end_distance"] >= min_distance
 
 	@register_dataset_filter
 	@staticmethod
@@ -950,15 +2044,10 @@ class MazeDatasetFilters:
 
 		`percentile` is 1-100, not 0-1, as this is what `np.percentile` expects
 		"""
-		lengths: np.ndarray = np.array([len(m.solution) for m in dataset])
+		lengths: np.ndarray = dataset.maze_columns()["solution_length"]
 		cutoff: int = int(np.percentile(lengths, percentile))
 
-		filtered_mazes: list[SolvedMaze] = [
-			m for m in dataset if len(m.solution) > cutoff
-		]
-		new_dataset: MazeDataset = MazeDataset(cfg=dataset.cfg, mazes=filtered_mazes)
-
-		return copy.deepcopy(new_dataset)
+		return dataset._select(lengths > cutoff)
 
 	@register_dataset_filter
 	@staticmethod
@@ -967,11 +2056,7 @@ class MazeDatasetFilters:
 		max_count: int,
 	) -> MazeDataset:
 		"""truncate the dataset to be at most `max_count` mazes"""
-		new_dataset: MazeDataset = MazeDataset(
-			cfg=dataset.cfg,
-			mazes=dataset.mazes[:max_count],
-		)
-		return copy.deepcopy(new_dataset)
+		return dataset._select(np.arange(len(dataset))[:max_count])
 
 	@register_dataset_filter
 	@staticmethod
@@ -983,88 +2068,71 @@ class MazeDatasetFilters:
 	) -> MazeDataset:
 		"""remove duplicates from a dataset, keeping the **LAST** unique maze
 
-		set minimum either minimum difference to `None` to disable checking
+		a maze is removed if some later maze differs from it in at most `minimum_difference_connection_list`
+		entries of the connection list, or in at most `minimum_difference_solution` coordinates of the solution.
+		set either minimum difference to `None` to disable checking
 
 		if you want to avoid mazes which have more overlap, set the minimum difference to be greater
 
+		candidate pairs are found by hashing blocks of the bit-packed connection lists and of the solutions
+		(see `_near_duplicate_mask`), so this scales to large datasets. `_max_dataset_len_threshold` is
+		ignored, and only kept so that existing `applied_filters` still load
+
 		Gotchas:
 		- if two mazes are of different sizes, they will never be considered duplicates
 		- if two solutions are of different lengths, they will never be considered duplicates
 
 		TODO: check for overlap?
 		"""
-		if len(dataset) > _max_dataset_len_threshold:
-			raise ValueError(
-				"this method is currently very slow for large datasets, consider using `remove_duplicates_fast` instead\n",
-				"if you know what you're doing, change `_max_dataset_len_threshold`",
+		is_duplicate: Bool[np.ndarray, " n_mazes"] = np.zeros(
+			len(dataset), dtype=np.bool_
+		)
+		if minimum_difference_connection_list is not None:
+			is_duplicate |= _near_duplicate_mask_grouped(
+				[maze.connection_list for maze in dataset.mazes],
+				minimum_difference_connection_list,
+				packed_bits=True,
+			)
+		if minimum_difference_solution is not None:
+			is_duplicate |= _near_duplicate_mask_grouped(
+				[maze.solution for maze in dataset.mazes],
+				minimum_difference_solution,
 			)
 
-		unique_mazes: list[SolvedMaze] = list()
-
-		maze_a: SolvedMaze
-		maze_b: SolvedMaze
-		for i, maze_a in enumerate(dataset.mazes):
-			a_unique: bool = True
-			for maze_b in dataset.mazes[i + 1 :]:
-				# after all that nesting, more nesting to perform checks
-				if (minimum_difference_connection_list is not None) and (  # noqa: SIM102
-					maze_a.connection_list.shape == maze_b.connection_list.shape
-				):
-					if (
-						np.sum(maze_a.connection_list != maze_b.connection_list)
-						<= minimum_difference_connection_list
-					):
-						a_unique = False
-						break
-
-				if (minimum_difference_solution is not None) and (  # noqa: SIM102
-					maze_a.solution.shape == maze_b.solution.shape
-				):
-					if (
-						np.sum(maze_a.solution != maze_b.solution)
-						<= minimum_difference_solution
-					):
-						a_unique = False
-						break
-
-			if a_unique:
-				unique_mazes.append(maze_a)
-
-		return copy.deepcopy(
-			MazeDataset(
-				cfg=dataset.cfg,
-				mazes=unique_mazes,
-				generation_metadata_collected=dataset.generation_metadata_collected,
-			),
+		return dataset._select(
+			~is_duplicate,
+			generation_metadata_collected=dataset.generation_metadata_collected,
 		)
 
 	@register_dataset_filter
 	@staticmethod
 	def remove_duplicates_fast(dataset: MazeDataset) -> MazeDataset:
-		"""remove duplicates from a dataset"""
-		unique_mazes = list(dict.fromkeys(dataset.mazes))
-		return copy.deepcopy(
-			MazeDataset(
-				cfg=dataset.cfg,
-				mazes=unique_mazes,
-				generation_metadata_collected=dataset.generation_metadata_collected,
-			),
+		"""remove duplicates from a dataset, keeping the first occurrence of each maze"""
+		first_index: dict[SolvedMaze, int] = dict()
+		for i, maze in enumerate(dataset.mazes):
+			first_index.setdefault(maze, i)
+		return dataset._select(
+			np.fromiter(first_index.values(), dtype=np.int64),
+			generation_metadata_collected=dataset.generation_metadata_collected,
 		)
 
 	@register_dataset_filter
 	@staticmethod
 	def strip_generation_meta(dataset: MazeDataset) -> MazeDataset:
 		"""strip the generation meta from the dataset"""
-		new_dataset: MazeDataset = copy.deepcopy(dataset)
-		for maze in new_dataset:
-			# hacky because it's a frozen dataclass
-			maze.__dict__["generation_meta"] = None
+		new_dataset: MazeDataset = dataset._select(
+			np.arange(len(dataset)),
+			generation_metadata_collected=dataset.generation_metadata_collected,
+		)
+		new_dataset.mazes = [
+			_maze_without_generation_meta(maze) for maze in new_dataset.mazes
+		]
 		return new_dataset
 
 	@register_dataset_filter
 	@staticmethod
 	# yes, this function is complicated hence the noqa
-	def collect_generation_meta(  # noqa: C901, PLR0912
+	def collect_generation_meta(
 		dataset: MazeDataset,
 		clear_in_mazes: bool = True,
 		inplace: bool = True,
@@ -1107,67 +2175,33 @@ class MazeDatasetFilters:
 		else:
 			new_dataset = copy.deepcopy(dataset)
 
-		gen_meta_lists: dict[bool | int | float | str | CoordTup, Counter] = (
-			defaultdict(Counter)
-		)
-		for maze in new_dataset:
+		# gather the values of each key, then count them all at once per key
+		values_by_key: dict[str, list] = defaultdict(list)
+		n_collected: int = len(new_dataset)
+		for i, maze in enumerate(new_dataset.mazes):
 			if maze.generation_meta is None:
 				if allow_fail:
+					n_collected = i
 					break
 				raise ValueError(
 					"generation meta is not present in a maze, cannot collect generation meta",
 				)
 			for key, value in maze.generation_meta.items():
-				if isinstance(value, (bool, int, float, str)):  # noqa: UP038
-					gen_meta_lists[key][value] += 1
-
-				elif isinstance(value, set):
-					# special case for visited_cells
-					gen_meta_lists[key].update(value)
-
-				elif isinstance(value, (list, np.ndarray)):  # noqa: UP038
-					if isinstance(value, list):
-						# TODO: `for` loop variable `value` overwritten by assignment target (Ruff PLW2901)
-						try:
-							value = np.array(value)  # noqa: PLW2901
-						except ValueError as convert_to_np_err:
-							err_msg: str = (
-								f"Cannot collect generation meta for {key} as it is a list of type '{type(value[0]) = !s}'"
-								"\nexpected either a basic type (bool, int, float, str), a numpy coord, or a numpy array of coords"
-							)
-							raise ValueError(err_msg) from convert_to_np_err
-
-					if (len(value.shape) == 1) and (value.shape[0] == maze.lattice_dim):
-						# assume its a single coordinate
-						gen_meta_lists[key][tuple(value)] += 1
-					# magic value is fine here
-					elif (len(value.shape) == 2) and (  # noqa: PLR2004
-						value.shape[1] == maze.lattice_dim
-					):
-						# assume its a list of coordinates
-						gen_meta_lists[key].update([tuple(v) for v in value])
-					else:
-						err_msg: str = (
-							f"Cannot collect generation meta for {key} as it is an ndarray of shape {value.shape}\n"
-							"expected either a coord of shape (2,) or a list of coords of shape (n, 2)"
-						)
-						raise ValueError(err_msg)
-				else:
-					err_msg: str = (
-						f"Cannot collect generation meta for {key} as it is of type '{type(value)!s}'\n"
-						"expected either a basic type (bool, int, float, str), a numpy coord, or a numpy array of coords"
-					)
-					raise TypeError(err_msg)
-
-			# clear the data
-			if clear_in_mazes:
-				# hacky because it's a frozen dataclass
-				maze.__dict__["generation_meta"] = None
+				values_by_key[key].append(value)
 
+		lattice_dim: int = new_dataset.mazes[0].lattice_dim
 		new_dataset.generation_metadata_collected = {
-			key: dict(value) for key, value in gen_meta_lists.items()
+			key: _count_generation_meta_values(key, values, lattice_dim)
+			for key, values in values_by_key.items()
 		}
 
+		# clear the data. the mazes may be shared with other datasets, so replace them
+		if clear_in_mazes:
+			new_dataset.mazes[:n_collected] = [
+				_maze_without_generation_meta(maze)
+				for maze in new_dataset.mazes[:n_collected]
+			]
+
 		return new_dataset
 
 
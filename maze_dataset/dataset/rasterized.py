@@ -26,6 +26,7 @@ from muutils.json_serialize import serializable_dataclass, serializable_field
 from zanj import ZANJ
 
 from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset.maze_dataset import _load_missing_generation_version
 from maze_dataset.maze import PixelColors, SolvedMaze
 from maze_dataset.maze.lattice_maze import PixelGrid, _remove_isolated_cells
 
@@ -132,6 +133,9 @@ class RasterizedMazeDatasetConfig(MazeDatasetConfig):  # type: ignore[misc]
 	endpoints_as_open: bool = serializable_field(default=False)
 
 
+_load_missing_generation_version(RasterizedMazeDatasetConfig)
+
+
 class RasterizedMazeDataset(MazeDataset):
 	"subclass of `MazeDataset` that uses a `RasterizedMazeDatasetConfig`"
 
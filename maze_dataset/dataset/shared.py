@@ -0,0 +1,259 @@
+"""`SharedMazeDataset` is a read-only view of a `MazeDataset` for multi-worker data loaders
+
+a `MazeDataset` holds one python object per maze, and just reading them from a forked worker
+updates their refcounts, which copies every page they live on into the worker. instead, a
+`SharedMazeDataset` keeps only the columns of a `MazeArrays`, in shared memory or in memory
+mapped `.npy` files, and builds each `SolvedMaze` on access as views into them. so:
+
+- forked workers never write to pages shared with the parent, and their memory stays flat
+- spawned workers receive only the names of the shared memory blocks (or the directory of the
+	`.npy` files) when pickled, and attach to them instead of copying the data
+
+generation metadata is not kept, since it is made of per-maze python objects.
+
+```python
+shared = SharedMazeDataset.from_dataset(dataset)
+loader = torch.utils.data.DataLoader(shared, num_workers=16, ...)
+...
+shared.close()  # frees the shared memory, once the workers are done
+```
+"""
+
+import os
+import sys
+import typing
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+import numpy as np
+from jaxtyping import Bool, Int
+
+from maze_dataset.dataset.maze_arrays import MazeArrays
+from maze_dataset.maze import SolvedMaze
+
+if typing.TYPE_CHECKING:
+	from typing_extensions import Self
+
+	from maze_dataset.dataset.maze_dataset import MazeDataset, MazeDatasetConfig
+
+SHARED_COLUMNS: tuple[str, ...] = (
+	"connection_lists",
+	"solutions",
+	"solution_offsets",
+)
+"columns of `MazeArrays` kept by a `SharedMazeDataset`"
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+	"""attach to an existing block without registering it with the resource tracker
+
+	otherwise, a worker exiting could unlink memory owned by the parent process
+	"""
+	if sys.version_info >= (3, 13):
+		return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+	shm: shared_memory.SharedMemory = shared_memory.SharedMemory(name=name)
+	resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+	return shm
+
+
+class SharedMazeDataset:
+	"""read-only view of a `MazeDataset`, backed by shared memory or memory mapped files
+
+	create with `from_dataset`. indexing returns `SolvedMaze`s whose arrays are views into
+	the shared columns, built without validation. the process which created the view owns
+	the shared memory, and should `close` it once no workers need it
+
+	# Parameters:
+	- `cfg : MazeDatasetConfig`
+		config of the dataset this is a view of
+	- `arrays : MazeArrays`
+		the (read-only) columns
+	- `path : Path | None`
+		directory of the `.npy` files `arrays` are memory mapped from, or `None` if in shared memory
+		(defaults to `None`)
+	- `shared_blocks : dict[str, shared_memory.SharedMemory] | None`
+		shared memory blocks holding each column, or `None` if memory mapped
+		(defaults to `None`)
+	"""
+
+	def __init__(
+		self,
+		cfg: "MazeDatasetConfig",
+		arrays: MazeArrays,
+		path: Path | None = None,
+		shared_blocks: dict[str, shared_memory.SharedMemory] | None = None,
+	) -> None:
+		"""wrap existing shared columns, see `from_dataset` for creating them"""
+		self.cfg: MazeDatasetConfig = cfg
+		self.arrays: MazeArrays = arrays
+		self.path: Path | None = path
+		self._shared_blocks: dict[str, shared_memory.SharedMemory] | None = (
+			shared_blocks
+		)
+		# only unlinked by the process which created the blocks, not by forked workers
+		self._owner_pid: int | None = None
+
+	@classmethod
+	def from_dataset(
+		cls,
+		dataset: "MazeDataset",
+		path: Path | str | None = None,
+	) -> "SharedMazeDataset":
+		"""copy the mazes of `dataset` into shared memory, or into `.npy` files in `path`
+
+		# Parameters:
+		- `dataset : MazeDataset`
+			dataset to share, all mazes must have the same grid shape
+		- `path : Path | str | None`
+			directory to write the columns to and memory map them from. if `None`, the columns
+			are put in shared memory instead
+			(defaults to `None`)
+
+		# Returns:
+		- `SharedMazeDataset`
+		"""
+		arrays: MazeArrays = (
+			dataset._maze_arrays
+			if dataset._maze_arrays is not None
+			else MazeArrays.from_mazes(dataset.mazes, grid_shape=dataset.cfg.grid_shape)
+		)
+		columns: dict[str, np.ndarray] = {
+			key: np.ascontiguousarray(getattr(arrays, key)) for key in SHARED_COLUMNS
+		}
+
+		if path is not None:
+			path = Path(path)
+			path.mkdir(parents=True, exist_ok=True)
+			for key, column in columns.items():
+				np.save(path / f"{key}.npy", column)
+			output: SharedMazeDataset = cls._from_npy(dataset.cfg, path)
+		else:
+			blocks: dict[str, shared_memory.SharedMemory] = dict()
+			shared_columns: dict[str, np.ndarray] = dict()
+			for key, column in columns.items():
+				# zero size blocks are not allowed
+				blocks[key] = shared_memory.SharedMemory(
+					create=True,
+					size=max(column.nbytes, 1),
+				)
+				shared_columns[key] = np.ndarray(
+					column.shape,
+					dtype=column.dtype,
+					buffer=blocks[key].buf,
+				)
+				shared_columns[key][...] = column
+				shared_columns[key].flags.writeable = False
+			output = cls(
+				cfg=dataset.cfg,
+				arrays=MazeArrays(**shared_columns),
+				shared_blocks=blocks,
+			)
+			output._owner_pid = os.getpid()
+
+		return output
+
+	@classmethod
+	def _from_npy(cls, cfg: "MazeDatasetConfig", path: Path) -> "SharedMazeDataset":
+		"""memory map the columns saved by `from_dataset` in `path`"""
+		return cls(
+			cfg=cfg,
+			arrays=MazeArrays(
+				**{
+					# plain arrays rather than `np.memmap`, which slices slower and
+					# compares unequal to arrays in `SolvedMaze.__eq__`
+					key: np.asarray(np.load(path / f"{key}.npy", mmap_mode="r"))
+					for key in SHARED_COLUMNS
+				},
+			),
+			path=path,
+		)
+
+	def __getstate__(self) -> dict:
+		"""pickle only where the columns are, not the columns themselves
+
+		# Raises:
+		- `ValueError` : if the view was `close`d, since its shared memory may be gone
+		"""
+		if self._shared_blocks is None and self.path is None:
+			err_msg: str = "cannot pickle a `SharedMazeDataset` after it was closed"
+			raise ValueError(err_msg)
+		state: dict = dict(cfg=self.cfg, path=self.path, shared_columns=None)
+		if self._shared_blocks is not None:
+			state["shared_columns"] = {
+				key: (
+					block.name,
+					getattr(self.arrays, key).shape,
+					getattr(self.arrays, key).dtype.str,
+				)
+				for key, block in self._shared_blocks.items()
+			}
+		return state
+
+	def __setstate__(self, state: dict) -> None:
+		"""attach to the shared memory, or memory map the files, of the pickled view"""
+		if state["shared_columns"] is None:
+			self.__dict__.update(self._from_npy(state["cfg"], state["path"]).__dict__)
+			return
+		blocks: dict[str, shared_memory.SharedMemory] = {
+			key: _attach_shared_memory(name)
+			for key, (name, _, _) in state["shared_columns"].items()
+		}
+		columns: dict[str, np.ndarray] = dict()
+		for key, (_, shape, dtype) in state["shared_columns"].items():
+			columns[key] = np.ndarray(shape, dtype=dtype, buffer=blocks[key].buf)
+			columns[key].flags.writeable = False
+		self.__init__(  # type: ignore[misc]
+			cfg=state["cfg"],
+			arrays=MazeArrays(**columns),
+			shared_blocks=blocks,
+		)
+
+	def __len__(self) -> int:
+		"""number of mazes"""
+		return len(self.arrays)
+
+	def __getitem__(self, i: int) -> SolvedMaze:
+		"""get a maze by index, as views into the shared columns"""
+		return self.arrays.get_maze(range(len(self))[i])
+
+	def get_arrays(
+		self,
+		i: int,
+	) -> tuple[
+		Bool[np.ndarray, "lattice_dim=2 row col"],
+		Int[np.ndarray, "solution_len row_col=2"],
+	]:
+		"""get the connection list and solution of a maze, without building a `SolvedMaze`"""
+		i = range(len(self))[i]
+		return self.arrays.connection_lists[i], self.arrays.get_solution(i)
+
+	def close(self) -> None:
+		"""detach from the shared memory, and free it if this process created it
+
+		the view can't be indexed afterwards. does nothing for memory mapped files,
+		which are left on disk
+		"""
+		if self._shared_blocks is None:
+			return
+		# drop the views before closing the buffers they point into
+		self.arrays = MazeArrays(
+			connection_lists=np.empty(
+				(0, 2, *self.arrays.grid_shape),
+				dtype=np.bool_,
+			),
+			solutions=np.empty((0, 2), dtype=np.int64),
+			solution_offsets=np.zeros(1, dtype=np.int64),
+		)
+		for block in self._shared_blocks.values():
+			block.close()
+			if self._owner_pid == os.getpid():
+				block.unlink()
+		self._shared_blocks = None
+
+	def __enter__(self) -> "Self":
+		"use as a context manager, to `close` on exit"
+		return self
+
+	def __exit__(self, *args) -> None:
+		"close the view"
+		self.close()
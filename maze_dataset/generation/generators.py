@@ -1,5 +1,6 @@
 """generation functions have signature `(grid_shape: Coord, **kwargs) -> LatticeMaze` and are methods in `LatticeMazeGenerators`"""
 
+import functools
 import random
 import warnings
 from typing import Any, Callable
@@ -34,6 +35,24 @@ def _random_start_coord(
 	return start_coord_
 
 
+@functools.cache
+def _interned_grid_shape(grid_shape: CoordTup) -> Coord:
+	"""read-only `grid_shape` array, shared by the `generation_meta` of every maze of that shape"""
+	grid_shape_: Coord = np.array(grid_shape)
+	grid_shape_.setflags(write=False)
+	return grid_shape_
+
+
+def _visited_cells_mask(
+	grid_shape: Coord,
+	visited_cells: CoordArray,
+) -> Bool[np.ndarray, "row col"]:
+	"""boolean mask of `visited_cells`, the compact form stored in `generation_meta`"""
+	mask: Bool[np.ndarray, "row col"] = np.zeros(tuple(grid_shape), dtype=np.bool_)
+	mask[visited_cells[:, 0], visited_cells[:, 1]] = True
+	return mask
+
+
 def get_neighbors_in_bounds(
 	coord: Coord,
 	grid_shape: Coord,
@@ -124,15 +143,19 @@ class LatticeMazeGenerators:
 		)
 
 		# initialize the stack with the target coord
-		visited_cells: set[tuple[int, int]] = set()
-		visited_cells.add(tuple(start_coord))  # this wasnt a bug after all lol
+		visited_cells: Bool[np.ndarray, "row col"] = np.zeros(
+			tuple(grid_shape_),
+			dtype=np.bool_,
+		)
+		visited_cells[start_coord[0], start_coord[1]] = True
+		n_visited_cells: int = 1
 		stack: list[Coord] = [start_coord]
 
 		# initialize tree_depth_counter
 		current_tree_depth: int = 1
 
 		# loop until the stack is empty or n_connected_cells is reached
-		while stack and (len(visited_cells) < n_accessible_cells):
+		while stack and (n_visited_cells < n_accessible_cells):
 			# get the current coord from the stack
 			current_coord: Coord
 			if randomized_stack:
@@ -150,9 +173,9 @@ class LatticeMazeGenerators:
 					strict=False,
 				)
 				if (
-					(tuple(neighbor) not in visited_cells)
-					and (0 <= neighbor[0] < grid_shape_[0])
+					(0 <= neighbor[0] < grid_shape_[0])
 					and (0 <= neighbor[1] < grid_shape_[1])
+					and not visited_cells[neighbor[0], neighbor[1]]
 				)
 			]
 
@@ -178,7 +201,8 @@ class LatticeMazeGenerators:
 				connection_list[dim, clist_node[0], clist_node[1]] = True
 
 				# add to visited cells and stack
-				visited_cells.add(tuple(chosen_neighbor))
+				visited_cells[chosen_neighbor[0], chosen_neighbor[1]] = True
+				n_visited_cells += 1
 				stack.append(chosen_neighbor)
 
 				# Update current tree depth
@@ -190,15 +214,15 @@ class LatticeMazeGenerators:
 			connection_list=connection_list,
 			generation_meta=dict(
 				func_name="gen_dfs",
-				grid_shape=grid_shape_,
+				grid_shape=_interned_grid_shape(tuple(grid_shape_.tolist())),
 				start_coord=start_coord,
 				n_accessible_cells=int(n_accessible_cells),
 				max_tree_depth=int(max_tree_depth),
 				# oh my god this took so long to track down. its almost 5am and I've spent like 2 hours on this bug
 				# it was checking that len(visited_cells) == n_accessible_cells, but this means that the maze is
 				# treated as fully connected even when it is most certainly not, causing solving the maze to break
-				fully_connected=bool(len(visited_cells) == n_total_cells),
-				visited_cells={tuple(int(x) for x in coord) for coord in visited_cells},
+				fully_connected=bool(n_visited_cells == n_total_cells),
+				visited_cells=visited_cells,
 			),
 		)
 
@@ -309,7 +333,7 @@ class LatticeMazeGenerators:
 			connection_list=connection_list,
 			generation_meta=dict(
 				func_name="gen_wilson",
-				grid_shape=grid_shape_,
+				grid_shape=_interned_grid_shape(tuple(grid_shape_.tolist())),
 				fully_connected=True,
 			),
 		)
@@ -344,15 +368,16 @@ class LatticeMazeGenerators:
 			connection_list=connection_list,
 			generation_meta=dict(
 				func_name="gen_percolation",
-				grid_shape=grid_shape_,
+				grid_shape=_interned_grid_shape(tuple(grid_shape_.tolist())),
 				percolation_p=p,
 				start_coord=start_coord,
 			),
 		)
 
 		# generation_meta is sometimes None, but not here since we just made it a dict above
-		output.generation_meta["visited_cells"] = output.gen_connected_component_from(  # type: ignore[index]
-			start_coord,
+		output.generation_meta["visited_cells"] = _visited_cells_mask(  # type: ignore[index]
+			grid_shape_,
+			output.gen_connected_component_from(start_coord),
 		)
 
 		return output
@@ -393,8 +418,9 @@ class LatticeMazeGenerators:
 		# generation_meta is sometimes None, but not here since we just made it a dict above
 		maze.generation_meta["func_name"] = "gen_dfs_percolation"  # type: ignore[index]
 		maze.generation_meta["percolation_p"] = p  # type: ignore[index]
-		maze.generation_meta["visited_cells"] = maze.gen_connected_component_from(  # type: ignore[index]
-			start_coord,
+		maze.generation_meta["visited_cells"] = _visited_cells_mask(  # type: ignore[index]
+			grid_shape_,
+			maze.gen_connected_component_from(start_coord),
 		)
 
 		return maze
@@ -381,9 +381,8 @@ class LatticeMaze(SerializableDataclass):
 			return self.get_nodes()
 		else:
 			# if metadata provided, use visited cells
-			visited_cells: set[CoordTup] | None = self.generation_meta.get(
-				"visited_cells",
-				None,
+			visited_cells: Bool[np.ndarray, "row col"] | set[CoordTup] | None = (
+				self.generation_meta.get("visited_cells", None)
 			)
 			if visited_cells is None:
 				# TODO: dynamically generate visited_cells?
@@ -391,6 +390,13 @@ class LatticeMaze(SerializableDataclass):
 				raise ValueError(
 					err_msg,
 				)
+			if (
+				isinstance(visited_cells, np.ndarray)
+				and visited_cells.dtype == np.bool_
+			):
+				# compact form from the generators: a mask over the grid
+				return np.argwhere(visited_cells)
+			# sets or arrays of coords, from older datasets
 			visited_cells_np: Int[np.ndarray, "N 2"] = np.array(list(visited_cells))
 			return visited_cells_np
 
@@ -655,6 +661,51 @@ class LatticeMaze(SerializableDataclass):
 			output += self._get_solution_tokens()
 		return output
 
+	def _as_tokens_AOTP(self, coord_tokens: np.ndarray) -> list[str]:
+		"""legacy AOTP tokens, gathering the tokens of all coords at once from a coord token table
+
+		same as `coords_to_strings(self._as_coords_and_special_AOTP())`, with `coord_tokens` a
+		`(rows, cols, k)` table such as `MazeTokenizer.coord_token_table`
+		"""
+		adj_list: Int8[np.ndarray, "conn start_end coord"] = self.as_adj_list()
+		edge_tokens: np.ndarray = coord_tokens[adj_list[..., 0], adj_list[..., 1]]
+		n_edges: int = edge_tokens.shape[0]
+		output: list[str] = [
+			SPECIAL_TOKENS.ADJLIST_START,
+			*np.concatenate(
+				[
+					edge_tokens[:, 0],
+					np.full((n_edges, 1), SPECIAL_TOKENS.CONNECTOR, dtype=object),
+					edge_tokens[:, 1],
+					np.full(
+						(n_edges, 1), SPECIAL_TOKENS.ADJACENCY_ENDLINE, dtype=object
+					),
+				],
+				axis=1,
+			)
+			.ravel()
+			.tolist(),
+			SPECIAL_TOKENS.ADJLIST_END,
+		]
+		if isinstance(self, TargetedLatticeMaze):
+			output += [
+				SPECIAL_TOKENS.ORIGIN_START,
+				*coord_tokens[self.start_pos[0], self.start_pos[1]].tolist(),
+				SPECIAL_TOKENS.ORIGIN_END,
+				SPECIAL_TOKENS.TARGET_START,
+				*coord_tokens[self.end_pos[0], self.end_pos[1]].tolist(),
+				SPECIAL_TOKENS.TARGET_END,
+			]
+		if isinstance(self, SolvedMaze):
+			output += [
+				SPECIAL_TOKENS.PATH_START,
+				*coord_tokens[self.solution[:, 0], self.solution[:, 1]]
+				.ravel()
+				.tolist(),
+				SPECIAL_TOKENS.PATH_END,
+			]
+		return output
+
 	def _as_tokens(
 		self,
 		maze_tokenizer: "MazeTokenizer | TokenizationMode",
@@ -666,12 +717,9 @@ class LatticeMaze(SerializableDataclass):
 			isinstance_by_type_name(maze_tokenizer, "MazeTokenizer")
 			and maze_tokenizer.is_AOTP()  # type: ignore[union-attr]
 		):
-			coords_raw: list[CoordTup | str] = self._as_coords_and_special_AOTP()
-			coords_processed: list[str] = maze_tokenizer.coords_to_strings(  # type: ignore[union-attr]
-				coords=coords_raw,
-				when_noncoord="include",
+			return self._as_tokens_AOTP(
+				maze_tokenizer.coord_token_table(self.grid_shape),  # type: ignore[union-attr]
 			)
-			return coords_processed
 		else:
 			err_msg: str = f"Unsupported tokenizer type: {maze_tokenizer}"
 			raise NotImplementedError(err_msg)
@@ -1330,6 +1378,19 @@ class SolvedMaze(TargetedLatticeMaze):  # type: ignore[misc]
 		"hash the `SolvedMaze` by hashing a tuple of the connection list and solution arrays as bytes"
 		return hash((self.connection_list.tobytes(), self.solution.tobytes()))
 
+	def __reduce__(self) -> tuple:
+		"""pickle as just the connection list, solution, and metadata
+
+		the endpoints are views into the solution again once unpickled, instead of being pickled
+		as separate arrays, and unpickling skips the checks in `__init__`
+		"""
+		if self.solution is None or len(self.solution) == 0:
+			return super().__reduce__()
+		return (
+			_solved_maze_unchecked,
+			(self.connection_list, self.solution, self.generation_meta, type(self)),
+		)
+
 	def _get_solution_tokens(self) -> list[str | CoordTup]:
 		return [
 			SPECIAL_TOKENS.PATH_START,
@@ -1425,6 +1486,29 @@ class SolvedMaze(TargetedLatticeMaze):  # type: ignore[misc]
 		)
 
 
+def _solved_maze_unchecked(
+	connection_list: ConnectionList,
+	solution: CoordArray,
+	generation_meta: dict | None = None,
+	cls: type[SolvedMaze] = SolvedMaze,
+) -> SolvedMaze:
+	"""construct a `SolvedMaze` from trusted arrays, without copying or checking them
+
+	`SolvedMaze.__init__` copies the solution and checks the endpoints are in bounds, which
+	dominates the time to load or unpickle a large dataset. see `MazeArrays.validate` for
+	checking in bulk
+	"""
+	maze: SolvedMaze = object.__new__(cls)
+	maze.__dict__.update(
+		connection_list=connection_list,
+		generation_meta=generation_meta,
+		start_pos=solution[0],
+		end_pos=solution[-1],
+		solution=solution,
+	)
+	return maze
+
+
 def detect_pixels_type(data: PixelGrid) -> typing.Type[LatticeMaze]:
 	"""Detects the type of pixels data by checking for the presence of start and end pixels"""
 	if color_in_pixel_grid(data, PixelColors.START) or color_in_pixel_grid(
@@ -258,6 +258,43 @@ def _coord_to_strings_indexed(coord: typing.Sequence[int]) -> list[str]:
 	]
 
 
+def coord_token_table(
+	coord_to_strings_func: Callable[[CoordTup], list[str]],
+	grid_shape: CoordTup,
+) -> np.ndarray:
+	"""tokens of every coord of a grid, as a read-only `(rows, cols, k)` object array of strings
+
+	`coord_token_table(f, grid_shape)[i, j].tolist() == f((i, j))`, so the tokens of a whole
+	array of coords are a single gather: `table[coords[..., 0], coords[..., 1]]`.
+	`coord_to_strings_func` must give `k` tokens for every coord
+	"""
+	grid_shape = tuple(grid_shape)  # type: ignore[assignment]
+	table: np.ndarray = np.array(
+		[
+			coord_to_strings_func((row, col))
+			for row in range(grid_shape[0])
+			for col in range(grid_shape[1])
+		],
+		dtype=object,
+	)
+	table = table.reshape(*grid_shape, -1)
+	table.flags.writeable = False
+	return table
+
+
+def coord_token_id_table(
+	token_table: np.ndarray,
+	token_to_index: typing.Mapping[str, int],
+) -> Int[np.ndarray, "row col k"]:
+	"""ids of the tokens in a `coord_token_table`, with -1 for tokens not in `token_to_index`"""
+	ids: Int[np.ndarray, "row col k"] = np.array(
+		[token_to_index.get(token, -1) for token in token_table.flat],
+		dtype=np.int32,
+	).reshape(token_table.shape)
+	ids.flags.writeable = False
+	return ids
+
+
 def coord_str_to_tuple(
 	coord_str: str,
 	allow_whitespace: bool = True,
@@ -487,43 +524,114 @@ def connection_list_to_adj_list(
 	- `Int8[np.ndarray, "conn start_end=2 coord=2"]`
 		adjacency list in the shape `(n_connections, 2, 2)`
 	"""
-	n_connections: int = conn_list.sum()
-	adj_list: Int8[np.ndarray, "conn start_end=2 coord=2"] = np.full(
-		(n_connections, 2, 2),
-		-1,
-		dtype=np.int8,
+	adj_list: Int8[np.ndarray, "conn start_end=2 coord=2"] = _connections_to_edges(
+		*np.nonzero(conn_list),
 	)
 
 	if shuffle_d1:
-		flip_d1: Float[np.ndarray, " conn"] = np.random.rand(n_connections)
-
-	# loop over all nonzero elements of the connection list
-	i: int = 0
-	for d, x, y in np.ndindex(conn_list.shape):
-		if conn_list[d, x, y]:
-			c_start: CoordTup = (x, y)
-			c_end: CoordTup = (
-				x + (1 if d == 0 else 0),
-				y + (1 if d == 1 else 0),
-			)
-			adj_list[i, 0] = np.array(c_start, dtype=np.int8)
-			adj_list[i, 1] = np.array(c_end, dtype=np.int8)
+		_flip_d1(adj_list, np.random.rand(adj_list.shape[0]))
+	if shuffle_d0:
+		adj_list = _shuffle_d0(adj_list)
 
-			# flip if shuffling
-			# magic value is fine here
-			if shuffle_d1 and (flip_d1[i] > 0.5):  # noqa: PLR2004
-				c_s, c_e = adj_list[i, 0].copy(), adj_list[i, 1].copy()
-				adj_list[i, 0] = c_e
-				adj_list[i, 1] = c_s
+	return adj_list
 
-			i += 1
 
-	if shuffle_d0:
-		np.random.shuffle(adj_list)
+def connection_lists_to_adj_lists(
+	conn_lists: Bool[np.ndarray, "n_mazes lattice_dim=2 row col"],
+	shuffle_d0: bool = True,
+	shuffle_d1: bool = True,
+) -> tuple[
+	Int8[np.ndarray, "total_conn start_end=2 coord=2"],
+	Int[np.ndarray, " n_mazes_plus_1"],
+]:
+	"""batched `connection_list_to_adj_list`, for a stack of connection lists
 
+	the adjacency lists are concatenated, with `adj_lists[offsets[i] : offsets[i + 1]]` being
+	the one of maze `i`. each is identical to what `connection_list_to_adj_list` would give for
+	that maze, with the global numpy rng consumed in the same way as calling it on every maze in
+	order
+
+	# Parameters:
+	- `conn_lists : Bool[np.ndarray, "n_mazes lattice_dim=2 row col"]`
+		connection lists of all the mazes
+	- `shuffle_d0 : bool`
+		shuffle each adjacency list along the 0th axis (order of pairs)
+		(defaults to `True`)
+	- `shuffle_d1 : bool`
+		shuffle the order of the coordinates in each pair
+		(defaults to `True`)
+
+	# Returns:
+	- `tuple[Int8[np.ndarray, "total_conn start_end=2 coord=2"], Int[np.ndarray, " n_mazes_plus_1"]]`
+		the concatenated adjacency lists, and the offsets of each maze into them
+	"""
+	maze_idx, d, x, y = np.nonzero(conn_lists)
+	adj_lists: Int8[np.ndarray, "total_conn start_end=2 coord=2"] = (
+		_connections_to_edges(d, x, y)
+	)
+	offsets: Int[np.ndarray, " n_mazes_plus_1"] = np.zeros(
+		conn_lists.shape[0] + 1,
+		dtype=np.int64,
+	)
+	np.cumsum(
+		np.bincount(maze_idx, minlength=conn_lists.shape[0]),
+		out=offsets[1:],
+	)
+
+	if shuffle_d0:
+		# shuffling draws from the rng between mazes, so the flips can't all be drawn at once
+		for start, stop in zip(
+			offsets[:-1].tolist(),
+			offsets[1:].tolist(),
+			strict=False,
+		):
+			if shuffle_d1:
+				_flip_d1(adj_lists[start:stop], np.random.rand(stop - start))
+			adj_lists[start:stop] = _shuffle_d0(adj_lists[start:stop])
+	elif shuffle_d1:
+		_flip_d1(adj_lists, np.random.rand(adj_lists.shape[0]))
+
+	return adj_lists, offsets
+
+
+def _connections_to_edges(
+	d: Int[np.ndarray, " conn"],
+	x: Int[np.ndarray, " conn"],
+	y: Int[np.ndarray, " conn"],
+) -> Int8[np.ndarray, "conn start_end=2 coord=2"]:
+	"""edges of the connections at `(d, x, y)` in a connection list, with the smaller coord first"""
+	adj_list: Int8[np.ndarray, "conn start_end=2 coord=2"] = np.empty(
+		(d.shape[0], 2, 2),
+		dtype=np.int8,
+	)
+	adj_list[:, 0, 0] = x
+	adj_list[:, 0, 1] = y
+	adj_list[:, 1, 0] = x + (d == 0)
+	adj_list[:, 1, 1] = y + (d == 1)
 	return adj_list
 
 
+def _shuffle_d0(
+	adj_list: Int8[np.ndarray, "conn start_end=2 coord=2"],
+) -> Int8[np.ndarray, "conn start_end=2 coord=2"]:
+	"""shuffled copy of `adj_list`, the same as `np.random.shuffle(adj_list)` would give
+
+	`np.random.permutation` makes the same draws as `np.random.shuffle`, but on a 1d array,
+	which is much faster than shuffling the pairs themselves
+	"""
+	return adj_list[np.random.permutation(adj_list.shape[0])]
+
+
+def _flip_d1(
+	adj_list: Int8[np.ndarray, "conn start_end=2 coord=2"],
+	flip_d1: Float[np.ndarray, " conn"],
+) -> None:
+	"""swap the coords of the pairs whose `flip_d1` value is above 0.5, in place"""
+	# magic value is fine here
+	flip: Bool[np.ndarray, " conn"] = flip_d1 > 0.5  # noqa: PLR2004
+	adj_list[flip] = adj_list[flip, ::-1]
+
+
 def is_connection(
 	edges: ConnectionArray,
 	connection_list: ConnectionList,
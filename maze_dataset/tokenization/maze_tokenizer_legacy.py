@@ -19,6 +19,7 @@ from typing import (
 )
 
 import numpy as np
+from jaxtyping import Int
 from muutils.json_serialize import (
 	SerializableDataclass,
 	serializable_dataclass,
@@ -36,6 +37,8 @@ from maze_dataset.token_utils import (
 	TokenizerPendingDeprecationWarning,
 	_coord_to_strings_indexed,
 	_coord_to_strings_UT,
+	coord_token_id_table,
+	coord_token_table,
 	coords_to_strings,
 	strings_to_coords,
 )
@@ -349,25 +352,76 @@ class MazeTokenizer(SerializableDataclass):
 		wraps `maze_dataset.token_utils.coords_to_strings` with either
 		`_coord_to_strings_UT` or `_coord_to_strings_indexed` depending on the tokenization mode
 		"""
+		return coords_to_strings(
+			coords=coords,
+			coord_to_strings_func=self._coord_to_strings_func,
+			when_noncoord=when_noncoord,
+		)
+
+	@property
+	def _coord_to_strings_func(self) -> Callable[[CoordTup], list[str]]:
+		"""`_coord_to_strings_UT` or `_coord_to_strings_indexed`, depending on the tokenization mode"""
 		if self.tokenization_mode in (
 			TokenizationMode.AOTP_UT_rasterized,
 			TokenizationMode.AOTP_UT_uniform,
 		):
-			return coords_to_strings(
-				coords=coords,
-				coord_to_strings_func=_coord_to_strings_UT,
-				when_noncoord=when_noncoord,
-			)
+			return _coord_to_strings_UT
 		elif self.tokenization_mode == TokenizationMode.AOTP_CTT_indexed:
-			return coords_to_strings(
-				coords=coords,
-				coord_to_strings_func=_coord_to_strings_indexed,
-				when_noncoord=when_noncoord,
-			)
+			return _coord_to_strings_indexed
 		else:
 			err_msg: str = f"Invalid tokenization mode {self.tokenization_mode}, expected one of {TokenizationMode.__members__}"
 			raise ValueError(err_msg)
 
+	@cached_property
+	def _coord_token_tables(self) -> dict[CoordTup, np.ndarray]:
+		"""memo for `coord_token_table`, by grid shape"""
+		return dict()
+
+	@cached_property
+	def _coord_token_id_tables(self) -> dict[CoordTup, Int[np.ndarray, "row col k"]]:
+		"""memo for `coord_token_id_table`, by grid shape"""
+		return dict()
+
+	def _table_grid_shape(self, grid_shape: CoordTup | None) -> CoordTup:
+		"`grid_shape` as a tuple, or a `max_grid_size` square if `None`"
+		if grid_shape is not None:
+			return tuple(grid_shape)  # type: ignore[return-value]
+		if self.max_grid_size is None:
+			err_msg: str = f"max_grid_size must be specified to use a default grid shape: {self.max_grid_size = }"
+			raise ValueError(err_msg)
+		return (self.max_grid_size, self.max_grid_size)
+
+	def coord_token_table(self, grid_shape: CoordTup | None = None) -> np.ndarray:
+		"""tokens of every coord of a grid, as a read-only `(rows, cols, k)` array of strings
+
+		so the tokens of an array of coords are a single gather, see
+		`maze_dataset.token_utils.coord_token_table`. `grid_shape` defaults to a
+		`max_grid_size` square. cached
+		"""
+		grid_shape = self._table_grid_shape(grid_shape)
+		if grid_shape not in self._coord_token_tables:
+			self._coord_token_tables[grid_shape] = coord_token_table(
+				self._coord_to_strings_func,
+				grid_shape,
+			)
+		return self._coord_token_tables[grid_shape]
+
+	def coord_token_id_table(
+		self,
+		grid_shape: CoordTup | None = None,
+	) -> Int[np.ndarray, "row col k"]:
+		"""ids of `coord_token_table(grid_shape)`, with -1 for tokens not in the vocabulary. cached
+
+		requires `max_grid_size`
+		"""
+		grid_shape = self._table_grid_shape(grid_shape)
+		if grid_shape not in self._coord_token_id_tables:
+			self._coord_token_id_tables[grid_shape] = coord_token_id_table(
+				self.coord_token_table(grid_shape),
+				self._tokenizer_map,
+			)
+		return self._coord_token_id_tables[grid_shape]
+
 	@overload
 	def strings_to_coords(
 		cls,  # noqa: N805
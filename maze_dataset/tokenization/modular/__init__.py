@@ -3,6 +3,7 @@
 __all__ = [
 	# modules
 	"all_tokenizers",
+	"compiled",
 	"element_base",
 	"elements",
 	"fst_load",
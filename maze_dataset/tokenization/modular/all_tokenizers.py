@@ -14,8 +14,14 @@ In general, uses for this module are limited to development of the library and s
   - Specific research training models on many tokenization behaviors can use `get_all_tokenizers()` as the maximally inclusive collection
   - `get_all_tokenizers()` may be subsequently filtered using `MazeTokenizerModular.has_element`
 For other uses, it's likely that the computational expense can be avoided by using
-- `maze_tokenizer.get_all_tokenizer_hashes()` for membership checks
+- `hashing.are_tested_tokenizers()` for membership checks against the memory-mapped table of hashes
 - `utils.all_instances` for generating smaller subsets of `MazeTokenizerModular` or `_TokenizerElement` objects
+- `all_tokenizers_space()` for counting, indexing, or sampling tokenizers without constructing all of them
+
+# `all_tokenizers_space()`
+an `utils.InstanceSpace` over the same tokenizers as `get_all_tokenizers()`, in the same order.
+it supports `len`, indexing, `index`, and uniform sampling, constructing only the tokenizers asked for.
+`get_tokenizer_index` finds the index of a tokenizer from its name.
 
 # `EVERY_TEST_TOKENIZERS`
 A collection of the tokenizers which should always be included in unit tests when test fuzzing is used.
@@ -24,13 +30,13 @@ This collection should be expanded as specific tokenizers become canonical or po
 
 import functools
 import multiprocessing
-import random
 from functools import cache
 from pathlib import Path
 from typing import Callable
 
 import frozendict
 import numpy as np
+from muutils.misc import flatten
 from muutils.spinner import NoOpContextManager, SpinnerContext
 from tqdm import tqdm
 
@@ -41,12 +47,21 @@ from maze_dataset.tokenization import (
 	StepTokenizers,
 	_TokenizerElement,
 )
+from maze_dataset.tokenization.modular.element_base import _split_name_args
 from maze_dataset.tokenization.modular.hashing import (
-	AllTokenizersHashBitLength,
-	AllTokenizersHashDtype,
+	TOKENIZER_HASHES_FNAME,
 	AllTokenizersHashesArray,
+	hashes_to_table_dtype,
+)
+from maze_dataset.utils import (
+	FiniteValued,
+	InstanceSpace,
+	_ProductSpace,
+	_UnionSpace,
+	_ValuesSpace,
+	all_instances,
+	instance_space,
 )
-from maze_dataset.utils import FiniteValued, all_instances
 
 # Always include this as the first item in the dict `validation_funcs` whenever using `all_instances` with `MazeTokenizerModular`
 # TYPING: error: Type variable "maze_dataset.utils.FiniteValued" is unbound  [valid-type]
@@ -88,6 +103,106 @@ def get_all_tokenizers() -> list[MazeTokenizerModular]:
 	)
 
 
+@cache
+def all_tokenizers_space() -> InstanceSpace:
+	"""Indexed version of `get_all_tokenizers()`, without constructing every tokenizer.
+
+	`all_tokenizers_space()[i] == get_all_tokenizers()[i]`
+	"""
+	return instance_space(
+		MazeTokenizerModular,
+		validation_funcs=MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS,
+	)
+
+
+def _subclasses(cls: type) -> list[type]:
+	"""`cls` and all of its subclasses, recursively"""
+	return [cls, *flatten(map(_subclasses, cls.__subclasses__()), levels_to_flatten=1)]
+
+
+@cache
+def _values_space_names(space: _ValuesSpace, field_name: str | None) -> dict[str, int]:
+	"""index of each value in `space` by its name, or how it is stringified as field `field_name`"""
+	return {
+		(
+			value.name
+			if field_name is None
+			else _TokenizerElement._stringify(field_name, value)
+		): i
+		for i, value in reversed(list(enumerate(space.values)))
+	}
+
+
+def _index_from_name(
+	space: InstanceSpace,
+	name: str,
+	field_name: str | None = None,
+) -> int:
+	"""index in `space` of the `_TokenizerElement` named `name`
+
+	or of the field value stringified as `name`, if `field_name` is given
+	"""
+	err_msg: str
+	if isinstance(space, _ValuesSpace):
+		try:
+			return _values_space_names(space, field_name)[name]
+		except KeyError as e:
+			err_msg = f"no {space.type_} named {name!r}"
+			raise ValueError(err_msg) from e
+
+	class_name: str = name.split("(", 1)[0]
+	if isinstance(space, _UnionSpace):
+		for offset, member in zip(space.offsets, space.members, strict=False):
+			if any(cls.__name__ == class_name for cls in _subclasses(member.type_)):
+				return offset + _index_from_name(member, name)
+		err_msg = f"no {space.type_} named {name!r}"
+		raise ValueError(err_msg)
+
+	assert isinstance(space, _ProductSpace)
+	if class_name != space.type_.__name__ or not name.endswith(")"):
+		err_msg = f"{name!r} is not the name of a {space.type_}"
+		raise ValueError(err_msg)
+	args: list[str] = _split_name_args(name[len(class_name) + 1 : -1])
+	fields: list[tuple[str, InstanceSpace]] = [
+		(key, field)
+		for key, field in zip(space.field_names, space.fields, strict=False)
+		if key != "_type_"
+	]
+	if len(args) != len(fields):
+		err_msg = f"expected {len(fields)} arguments in {name!r}, got {len(args)}"
+		raise ValueError(err_msg)
+	digits: dict[str, int] = {
+		key: _index_from_name(field, arg, key if arg.startswith(f"{key}=") else None)
+		for (key, field), arg in zip(fields, args, strict=False)
+	}
+	i: int = 0
+	for key, field in zip(space.field_names, space.fields, strict=False):
+		i = i * len(field) + digits.get(key, 0)
+	return i
+
+
+def get_tokenizer_index(tokenizer: MazeTokenizerModular | str) -> int:
+	"""Index of a tokenizer, or of the tokenizer with a given name, in `all_tokenizers_space()`.
+
+	Finding the index from the name only constructs the `_TokenizerElement`s of small subspaces,
+	which are cached after the first call.
+
+	# Raises:
+	- `ValueError` : if there is no such tokenizer in `all_tokenizers_space()`
+	"""
+	space: InstanceSpace = all_tokenizers_space()
+	if isinstance(tokenizer, MazeTokenizerModular):
+		return space.index(tokenizer)
+
+	prefix: str = f"{MazeTokenizerModular.__name__}-"
+	if not tokenizer.startswith(prefix):
+		err_msg: str = f"{tokenizer!r} is not the name of a `MazeTokenizerModular`"
+		raise ValueError(err_msg)
+	assert isinstance(space, _ProductSpace)
+	assert space.field_names == ["prompt_sequencer"]
+	return _index_from_name(space.fields[0], tokenizer[len(prefix) :])
+
+
 @cache
 def get_all_tokenizers_names() -> list[str]:
 	"""computes the sorted list of names of all tokenizers"""
@@ -109,15 +224,9 @@ def all_tokenizers_set() -> set[MazeTokenizerModular]:
 	return set(get_all_tokenizers())
 
 
-@cache
-def _all_tokenizers_except_every_test_tokenizers() -> list[MazeTokenizerModular]:
-	"""Returns"""
-	return list(all_tokenizers_set().difference(EVERY_TEST_TOKENIZERS))
-
-
 def sample_all_tokenizers(n: int) -> list[MazeTokenizerModular]:
-	"""Samples `n` tokenizers from `get_all_tokenizers()`."""
-	return random.sample(get_all_tokenizers(), n)
+	"""Samples `n` tokenizers from `get_all_tokenizers()`, without constructing the rest."""
+	return all_tokenizers_space().sample(n)
 
 
 def sample_tokenizers_for_test(n: int | None) -> list[MazeTokenizerModular]:
@@ -133,63 +242,73 @@ def sample_tokenizers_for_test(n: int | None) -> list[MazeTokenizerModular]:
 		raise ValueError(
 			err_msg,
 		)
-	sample: list[MazeTokenizerModular] = random.sample(
-		_all_tokenizers_except_every_test_tokenizers(),
+	sample: list[MazeTokenizerModular] = all_tokenizers_space().sample(
 		n - len(EVERY_TEST_TOKENIZERS),
+		exclude=[get_tokenizer_index(tokenizer) for tokenizer in EVERY_TEST_TOKENIZERS],
 	)
 	sample.extend(EVERY_TEST_TOKENIZERS)
 	return sample
 
 
+SAVE_HASHES_CHUNKSIZE: int = 50_000
+"number of indices of `all_tokenizers_space()` hashed per task in `save_hashes`"
+
+
+def _hash_tokenizers_range(bounds: tuple[int, int]) -> np.ndarray:
+	"""stable hashes of the valid tokenizers in `range(*bounds)` of `all_tokenizers_space()`"""
+	return np.fromiter(
+		map(hash, all_tokenizers_space().iter_range(*bounds)),  # uses stable hash
+		dtype=np.int64,
+	)
+
+
 def save_hashes(
 	path: Path | None = None,
 	verbose: bool = False,
 	parallelize: bool | int = False,
 ) -> AllTokenizersHashesArray:
-	"""Computes, sorts, and saves the hashes of every member of `get_all_tokenizers()`."""
+	"""Computes, sorts, and saves the hashes of every member of `get_all_tokenizers()`.
+
+	Saved as an uncompressed `.npy`, which `hashing` memory-maps, unless `path` ends in `.npz`.
+	Tokenizers are streamed from `all_tokenizers_space()`, so only the hashes are held in memory.
+	"""
 	spinner = (
 		functools.partial(SpinnerContext, spinner_chars="square_dot")
 		if verbose
 		else NoOpContextManager
 	)
 
-	# get all tokenizers
-	with spinner(initial_value="getting all tokenizers...", update_interval=2.0):
-		all_tokenizers = get_all_tokenizers()
-
-	# compute hashes
-	hashes_array_np64: AllTokenizersHashesArray
+	# compute hashes, streaming the tokenizers in chunks of indices
+	space: InstanceSpace = all_tokenizers_space()
+	chunks: list[tuple[int, int]] = [
+		(start, min(start + SAVE_HASHES_CHUNKSIZE, len(space)))
+		for start in range(0, len(space), SAVE_HASHES_CHUNKSIZE)
+	]
+	hashes_chunks: list[np.ndarray] = list()
 	if parallelize:
 		n_cpus: int = (
 			parallelize if int(parallelize) > 1 else multiprocessing.cpu_count()
 		)
 		with spinner(  # noqa: SIM117
-			initial_value=f"using {n_cpus} processes to compute {len(all_tokenizers)} tokenizer hashes...",
+			initial_value=f"using {n_cpus} processes to compute {len(space)} tokenizer hashes...",
 			update_interval=2.0,
 		):
 			with multiprocessing.Pool(processes=n_cpus) as pool:
-				hashes_list: list[int] = list(pool.map(hash, all_tokenizers))
-
-		with spinner(initial_value="converting hashes to numpy array..."):
-			hashes_array_np64 = np.array(hashes_list, dtype=np.int64)
+				hashes_chunks.extend(pool.imap(_hash_tokenizers_range, chunks))
 	else:
 		with spinner(
-			initial_value=f"computing {len(all_tokenizers)} tokenizer hashes...",
+			initial_value=f"computing {len(space)} tokenizer hashes...",
 		):
-			hashes_array_np64 = np.array(
-				[
-					hash(obj)  # uses stable hash
-					for obj in tqdm(all_tokenizers, disable=not verbose)
-				],
-				dtype=np.int64,
+			hashes_chunks.extend(
+				_hash_tokenizers_range(bounds)
+				for bounds in tqdm(chunks, disable=not verbose)
 			)
+	hashes_array_np64: AllTokenizersHashesArray = np.concatenate(
+		[np.empty(0, dtype=np.int64), *hashes_chunks],
+	)
 
 	# convert to correct dtype
-	hashes_array: AllTokenizersHashesArray = (
-		hashes_array_np64 % (1 << AllTokenizersHashBitLength)
-		if AllTokenizersHashBitLength < 64  # noqa: PLR2004
-		else hashes_array_np64
-	).astype(AllTokenizersHashDtype)
+	hashes_array: AllTokenizersHashesArray = hashes_to_table_dtype(hashes_array_np64)
 
 	# make sure there are no dupes
 	with spinner(initial_value="sorting and checking for hash collisions..."):
@@ -210,10 +329,12 @@ def save_hashes(
 	# save and return
 	with spinner(initial_value="saving hashes...", update_interval=0.5):
 		if path is None:
-			path = Path(__file__).parent / "MazeTokenizerModular_hashes.npz"
-		np.savez_compressed(
-			path,
-			hashes=sorted_hashes,
-		)
+			path = Path(__file__).parent / TOKENIZER_HASHES_FNAME
+		path = Path(path)
+		if path.suffix == ".npz":
+			# legacy compressed format, can't be memory-mapped
+			np.savez_compressed(path, hashes=sorted_hashes)
+		else:
+			np.save(path, sorted_hashes)
 
 	return sorted_hashes
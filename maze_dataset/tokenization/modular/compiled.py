@@ -0,0 +1,461 @@
+"""`CompiledMazeTokenizer` encodes mazes straight to arrays of token ids
+
+`MazeTokenizerModular.to_tokens` walks the tree of tokenizer elements and builds lists of strings,
+which `encode` then maps to ids. a `CompiledMazeTokenizer`, from `MazeTokenizerModular.compile()`,
+instead looks the tree up once, and then builds each region of the prompt by indexing tables of
+token ids with the arrays of the maze and concatenating the results.
+
+the output is identical to `encode(to_tokens(maze))`, including under the same RNG state: the
+random parts of the tokenization (edge permutation, grouping, and shuffling) are done by the same
+calls to the tokenizer elements, via `_AdjListTokenizer._get_edge_groups`.
+
+tokenizers or mazes which are not supported (see `CompiledMazeTokenizer.is_supported`) fall back to
+`encode(to_tokens(maze))`, as do mazes which would make `to_tokens` raise, so that it raises the same error.
+"""
+
+import typing
+
+import numpy as np
+from jaxtyping import Bool, Int
+
+from maze_dataset.constants import CARDINAL_MAP, VOCAB, VOCAB_TOKEN_TO_INDEX, CoordTup
+from maze_dataset.maze.lattice_maze import LatticeMaze, SolvedMaze
+from maze_dataset.token_utils import is_connection
+from maze_dataset.tokenization.modular.elements import (
+	AdjListTokenizers,
+	CoordTokenizers,
+	EdgeGroupings,
+	PathTokenizers,
+	PromptSequencers,
+	StepSizes,
+	StepTokenizers,
+	TargetTokenizers,
+)
+
+if typing.TYPE_CHECKING:
+	from maze_dataset.tokenization.modular.maze_tokenizer_modular import (
+		MazeTokenizerModular,
+	)
+
+TokenIds = Int[np.ndarray, " n_tokens"]
+"1D array of token ids, as returned by `CompiledMazeTokenizer.encode`"
+
+TOKEN_ID_DTYPE: type = np.int32
+"dtype of the token id arrays output by `CompiledMazeTokenizer`"
+
+
+def _token_id(token: str) -> int:
+	return VOCAB_TOKEN_TO_INDEX[token]
+
+
+def _ids(*tokens: str) -> TokenIds:
+	"""token ids of `tokens`, as an array"""
+	return np.array([_token_id(t) for t in tokens], dtype=TOKEN_ID_DTYPE)
+
+
+def _ids_if(flag: bool, token: str) -> TokenIds:
+	"""array of the id of `token` if `flag`, else an empty array"""
+	return _ids(token) if flag else _ids()
+
+
+def _direction_id_table(
+	direction_map: dict[tuple[int, int], str],
+) -> Int[np.ndarray, "3 3"]:
+	"""ids of the tokens in `direction_map`, indexed by `delta + 1`. missing deltas are `-1`"""
+	table: Int[np.ndarray, "3 3"] = np.full((3, 3), -1, dtype=TOKEN_ID_DTYPE)
+	for (d_row, d_col), token in direction_map.items():
+		table[d_row + 1, d_col + 1] = _token_id(token)
+	return table
+
+
+_CARDINAL_ID_TABLE: Int[np.ndarray, "3 3"] = _direction_id_table(CARDINAL_MAP)
+"ids of the cardinal direction tokens, indexed by `delta + 1` of a step"
+
+
+def _lookup_direction(
+	table: Int[np.ndarray, "3 3"],
+	deltas: Int[np.ndarray, "n 2"],
+) -> Int[np.ndarray, " n"]:
+	"""look up `deltas` in a table from `_direction_id_table`, giving `-1` where out of range"""
+	deltas = deltas.astype(np.int64)
+	in_range: Bool[np.ndarray, " n"] = (np.abs(deltas) <= 1).all(axis=1)
+	output: Int[np.ndarray, " n"] = np.full(len(deltas), -1, dtype=TOKEN_ID_DTYPE)
+	output[in_range] = table[deltas[in_range, 0] + 1, deltas[in_range, 1] + 1]
+	return output
+
+
+_DISTANCE_IDS: Int[np.ndarray, " n_distances"] = np.array(
+	[
+		_token_id(getattr(VOCAB, f"I_{d:03}"))
+		for d in range(1000)
+		if hasattr(VOCAB, f"I_{d:03}")
+	],
+	dtype=TOKEN_ID_DTYPE,
+)
+"ids of the `StepTokenizers.Distance` tokens, indexed by distance"
+
+
+def _relative_direction_ids(
+	solution: Int[np.ndarray, "n 2"],
+	starts: Int[np.ndarray, " n_steps"],
+) -> Int[np.ndarray, " n_steps"]:
+	"""ids of the `get_relative_direction` tokens of the steps at `starts`, or `-1` where it would raise
+
+	at the start of the solution, the agent is facing north
+	"""
+	current: Int[np.ndarray, "n_steps 2"] = solution[starts]
+	previous: Int[np.ndarray, "n_steps 2"] = np.where(
+		(starts == 0)[:, None],
+		current + np.array([1, 0]),
+		solution[np.maximum(starts - 1, 0)],
+	)
+	following: Int[np.ndarray, "n_steps 2"] = solution[starts + 1]
+	d_in: Int[np.ndarray, "n_steps 2"] = current - previous
+	d_out: Int[np.ndarray, "n_steps 2"] = following - current
+	turn: Int[np.ndarray, " n_steps"] = (
+		d_in[:, 0] * d_out[:, 1] - d_in[:, 1] * d_out[:, 0]
+	)
+	# same order of checks as `get_relative_direction`
+	output: Int[np.ndarray, " n_steps"] = np.select(
+		[
+			(np.abs(d_in).sum(axis=1) > 1) | (np.abs(d_out).sum(axis=1) > 1),
+			(d_out == 0).all(axis=1),
+			(previous == following).all(axis=1),
+			(d_in == 0).all(axis=1),
+			(d_in == d_out).all(axis=1),
+			turn == 1,
+			turn == -1,
+		],
+		[
+			-1,
+			_token_id(VOCAB.PATH_STAY),
+			_token_id(VOCAB.PATH_BACKWARD),
+			-1,
+			_token_id(VOCAB.PATH_FORWARD),
+			_token_id(VOCAB.PATH_LEFT),
+			_token_id(VOCAB.PATH_RIGHT),
+		],
+		default=-1,
+	)
+	return output.astype(TOKEN_ID_DTYPE)
+
+
+class _FallBack(Exception):  # noqa: N818
+	"""raised when a maze can't be encoded by the compiled path, before any RNG is consumed"""
+
+
+class CompiledMazeTokenizer:
+	"""encoder from mazes straight to token ids, specialized to one `MazeTokenizerModular`
+
+	create with `MazeTokenizerModular.compile()`. calling it on a maze is equivalent to
+	`np.array(tokenizer.encode(tokenizer.to_tokens(maze)), dtype=np.int32)`
+	"""
+
+	def __init__(self, tokenizer: "MazeTokenizerModular") -> None:
+		"""look up the tokenizer elements, see `MazeTokenizerModular.compile`"""
+		self.tokenizer: MazeTokenizerModular = tokenizer
+		self.is_supported: bool = self._check_supported()
+		"whether the tokenizer is supported, if not every maze falls back to `encode(to_tokens(maze))`"
+		self._coord_tables: dict[CoordTup, Int[np.ndarray, "row col k"] | None] = dict()
+
+	def _check_supported(self) -> bool:
+		"""whether every element of the tokenizer is handled by the compiled path"""
+		ps = self.tokenizer.prompt_sequencer
+		if type(ps) not in (PromptSequencers.AOTP, PromptSequencers.AOP):
+			return False
+		if type(ps.coord_tokenizer) not in (CoordTokenizers.UT, CoordTokenizers.CTT):
+			return False
+		if type(ps.adj_list_tokenizer) not in (
+			AdjListTokenizers.AdjListCoord,
+			AdjListTokenizers.AdjListCardinal,
+		):
+			return False
+		if isinstance(ps, PromptSequencers.AOTP) and (
+			type(ps.target_tokenizer) is not TargetTokenizers.Unlabeled
+		):
+			return False
+		if type(ps.path_tokenizer) is not PathTokenizers.StepSequence:
+			return False
+		return all(
+			type(step_tokenizer)
+			in (
+				StepTokenizers.Coord,
+				StepTokenizers.Cardinal,
+				StepTokenizers.Relative,
+				StepTokenizers.Distance,
+			)
+			for step_tokenizer in ps.path_tokenizer.step_tokenizers
+		)
+
+	def coord_table(self, grid_shape: CoordTup) -> Int[np.ndarray, "row col k"] | None:
+		"""ids of the tokens of every coord in a grid, or `None` if some are not in the vocabulary
+
+		`coord_table(grid_shape)[row, col]` is `encode(coord_tokenizer.to_tokens((row, col)))`
+		"""
+		grid_shape = tuple(grid_shape)  # type: ignore[assignment]
+		if grid_shape not in self._coord_tables:
+			table: Int[np.ndarray, "row col k"] = (
+				self.tokenizer.prompt_sequencer.coord_tokenizer.token_id_table(
+					grid_shape
+				)
+			)
+			self._coord_tables[grid_shape] = None if (table < 0).any() else table
+		return self._coord_tables[grid_shape]
+
+	def encode(self, maze: LatticeMaze) -> TokenIds:
+		"""encode a maze as an `int32` array of token ids"""
+		if self.is_supported and isinstance(maze, SolvedMaze):
+			try:
+				return self._encode_solved(maze)
+			except _FallBack:
+				pass
+		return np.array(
+			self.tokenizer.encode(self.tokenizer.to_tokens(maze)),
+			dtype=TOKEN_ID_DTYPE,
+		)
+
+	__call__ = encode
+
+	def _encode_solved(self, maze: SolvedMaze) -> TokenIds:
+		"""encode a solved maze, raising `_FallBack` before touching the RNG if not possible"""
+		ps = self.tokenizer.prompt_sequencer
+		coord_table: Int[np.ndarray, "row col k"] | None = self.coord_table(
+			maze.grid_shape,
+		)
+		if coord_table is None or len(maze.solution) == 0:
+			raise _FallBack
+		# deterministic regions first, so falling back never consumes the RNG twice
+		path: TokenIds = self._encode_path(maze, coord_table)
+		origin: TokenIds = coord_table[maze.start_pos[0], maze.start_pos[1]]
+		target: TokenIds = _ids()
+		if isinstance(ps, PromptSequencers.AOTP):
+			target = np.concatenate(
+				[
+					coord_table[maze.end_pos[0], maze.end_pos[1]],
+					_ids_if(ps.target_tokenizer.post, VOCAB.TARGET_POST),
+				],
+			)
+		adj_list: TokenIds = self._encode_adj_list(maze, coord_table)
+		return np.concatenate(
+			[
+				_ids(VOCAB.ADJLIST_START),
+				adj_list,
+				_ids(VOCAB.ADJLIST_END, VOCAB.ORIGIN_START),
+				origin,
+				_ids(VOCAB.ORIGIN_END, VOCAB.TARGET_START),
+				target,
+				_ids(VOCAB.TARGET_END, VOCAB.PATH_START),
+				path,
+				_ids(VOCAB.PATH_END),
+			],
+		).astype(TOKEN_ID_DTYPE, copy=False)
+
+	def _encode_adj_list(
+		self,
+		maze: SolvedMaze,
+		coord_table: Int[np.ndarray, "row col k"],
+	) -> TokenIds:
+		"""as in `_AdjListTokenizer.to_tokens`"""
+		adj = self.tokenizer.prompt_sequencer.adj_list_tokenizer
+		group_params: EdgeGroupings._GroupingTokenParams = (
+			adj.edge_grouping._token_params()
+		)
+		groups: typing.Sequence[np.ndarray] = adj._get_edge_groups(maze)
+		group_sizes: Int[np.ndarray, " n_groups"] = np.array(
+			[len(group) for group in groups],
+			dtype=np.int64,
+		)
+		edges: Int[np.ndarray, "n_edges 2 2"] = (
+			np.concatenate(groups)
+			if len(groups) > 0
+			else np.empty((0, 2, 2), dtype=np.int8)
+		).reshape(-1, 2, 2)
+		n_edges: int = len(edges)
+
+		leading: Int[np.ndarray, "n_edges k"] = coord_table[
+			edges[:, 0, 0], edges[:, 0, 1]
+		]
+		connector: Int[np.ndarray, "n_edges 1"] = np.where(
+			is_connection(edges, maze.connection_list),
+			_token_id(VOCAB.CONNECTOR),
+			_token_id(VOCAB.ADJLIST_WALL),
+		).reshape(-1, 1)
+		trailing: Int[np.ndarray, "n_edges k"]
+		if isinstance(adj, AdjListTokenizers.AdjListCardinal):
+			trailing = _lookup_direction(
+				_CARDINAL_ID_TABLE,
+				edges[:, 1].astype(np.int64) - edges[:, 0],
+			).reshape(-1, 1)
+		else:
+			trailing = coord_table[edges[:, 1, 0], edges[:, 1, 1]]
+		intra: Int[np.ndarray, "n_edges i"] = np.broadcast_to(
+			_ids_if(group_params["intra"], VOCAB.ADJLIST_INTRA),
+			(n_edges, int(group_params["intra"])),
+		)
+		pre: TokenIds = _ids_if(adj.pre, VOCAB.ADJLIST_PRE)
+		post: TokenIds = _ids_if(adj.post, VOCAB.ADJACENCY_ENDLINE)
+		cxn_ord: int = group_params["connection_token_ordinal"]
+
+		if not group_params["grouped"]:
+			# every group is a single edge, so each group is a row of the same length
+			parts: list[np.ndarray] = [leading, trailing]
+			parts.insert(cxn_ord, connector)
+			return np.concatenate(
+				[
+					np.broadcast_to(pre, (n_edges, len(pre))),
+					*parts,
+					intra,
+					np.broadcast_to(post, (n_edges, len(post))),
+				],
+				axis=1,
+			).ravel()
+
+		# grouped: the leading coord once per group, then the rest of each edge
+		for group in groups:
+			if len(group) == 0:
+				# raises the same error as `to_tokens` for an empty group
+				adj._tokenize_edge_grouping(
+					group,
+					maze,
+					self.tokenizer.prompt_sequencer.coord_tokenizer,
+					group_params,
+				)
+		edge_parts: list[np.ndarray] = (
+			[connector, trailing] if cxn_ord == 0 else [trailing, connector]
+		)
+		edge_rows: Int[np.ndarray, "n_edges m"] = np.concatenate(
+			[*edge_parts, intra],
+			axis=1,
+		)
+		group_first_edge: Int[np.ndarray, " n_groups"] = np.concatenate(
+			[[0], np.cumsum(group_sizes)[:-1]],
+		).astype(np.int64)
+		headers: Int[np.ndarray, "n_groups h"] = np.concatenate(
+			[
+				np.broadcast_to(pre, (len(groups), len(pre))),
+				leading[group_first_edge],
+			],
+			axis=1,
+		)
+		header_len: int = headers.shape[1]
+		row_len: int = edge_rows.shape[1]
+		group_lens: Int[np.ndarray, " n_groups"] = (
+			header_len + group_sizes * row_len + len(post)
+		)
+		group_starts: Int[np.ndarray, " n_groups"] = np.concatenate(
+			[[0], np.cumsum(group_lens)[:-1]],
+		).astype(np.int64)
+
+		output: TokenIds = np.empty(int(group_lens.sum()), dtype=TOKEN_ID_DTYPE)
+		output[group_starts[:, None] + np.arange(header_len)] = headers
+		group_of_edge: Int[np.ndarray, " n_edges"] = np.repeat(
+			np.arange(len(groups)),
+			group_sizes,
+		)
+		index_in_group: Int[np.ndarray, " n_edges"] = (
+			np.arange(n_edges) - group_first_edge[group_of_edge]
+		)
+		edge_starts: Int[np.ndarray, " n_edges"] = (
+			group_starts[group_of_edge] + header_len + index_in_group * row_len
+		)
+		output[edge_starts[:, None] + np.arange(row_len)] = edge_rows
+		post_starts: Int[np.ndarray, " n_groups"] = (
+			group_starts + header_len + group_sizes * row_len
+		)
+		output[post_starts[:, None] + np.arange(len(post))] = post
+		return output
+
+	def _encode_path(
+		self,
+		maze: SolvedMaze,
+		coord_table: Int[np.ndarray, "row col k"],
+	) -> TokenIds:
+		"""as in `StepSequence.to_tokens`"""
+		path_tokenizer = self.tokenizer.prompt_sequencer.path_tokenizer
+		solution: Int[np.ndarray, "n 2"] = np.asarray(maze.solution).astype(np.int64)
+		step_indices: Int[np.ndarray, " n_step_coords"] = self._step_indices(
+			maze,
+			solution,
+		)
+		starts: Int[np.ndarray, " n_steps"] = step_indices[:-1]
+		ends: Int[np.ndarray, " n_steps"] = step_indices[1:]
+		n_steps: int = len(starts)
+
+		intra: TokenIds = _ids_if(path_tokenizer.intra, VOCAB.PATH_INTRA)
+		pre: TokenIds = _ids_if(path_tokenizer.pre, VOCAB.PATH_PRE)
+		step_columns: list[np.ndarray] = [np.broadcast_to(pre, (n_steps, len(pre)))]
+		for step_tokenizer in path_tokenizer.step_tokenizers:
+			step_columns.append(
+				self._encode_steps(step_tokenizer, solution, starts, ends, coord_table),
+			)
+			step_columns.append(np.broadcast_to(intra, (n_steps, len(intra))))
+		post: TokenIds = _ids_if(path_tokenizer.post, VOCAB.PATH_POST)
+		step_columns.append(np.broadcast_to(post, (n_steps, len(post))))
+
+		leading: TokenIds = _ids()
+		if StepTokenizers.Coord() in path_tokenizer.step_tokenizers:
+			leading = np.concatenate(
+				[pre, coord_table[solution[0, 0], solution[0, 1]], intra],
+			)
+		return np.concatenate(
+			[leading, np.concatenate(step_columns, axis=1).ravel()],
+		)
+
+	def _step_indices(
+		self,
+		maze: SolvedMaze,
+		solution: Int[np.ndarray, "n 2"],
+	) -> Int[np.ndarray, " n_step_coords"]:
+		"""indices of the solution coords at which steps start and end, as in `_StepSize`"""
+		step_size = self.tokenizer.prompt_sequencer.path_tokenizer.step_size
+		if type(step_size) is StepSizes.Singles:
+			return np.arange(len(solution))
+		if type(step_size) is StepSizes.Forks:
+			# as in `SolvedMaze.get_solution_forking_points`, with the endpoints always included
+			connection_list: Bool[np.ndarray, "2 row col"] = maze.connection_list
+			rows, cols = solution[:, 0], solution[:, 1]
+			n_rows, n_cols = connection_list.shape[1:]
+			degree: Int[np.ndarray, " n"] = (
+				connection_list[0, rows, cols].astype(np.int64)
+				+ connection_list[1, rows, cols]
+				+ np.where(rows > 0, connection_list[0, rows - 1, cols], False)
+				+ np.where(cols > 0, connection_list[1, rows, cols - 1], False)
+			)
+			# the last row and column of the connection list point out of the grid
+			degree -= (rows == n_rows - 1) & connection_list[0, rows, cols]
+			degree -= (cols == n_cols - 1) & connection_list[1, rows, cols]
+			is_fork: Bool[np.ndarray, " n"] = degree > 2  # noqa: PLR2004
+			is_fork[[0, -1]] = True
+			return np.flatnonzero(is_fork)
+		return np.array(step_size._step_single_indices(maze), dtype=np.int64)
+
+	def _encode_steps(
+		self,
+		step_tokenizer: StepTokenizers._StepTokenizer,
+		solution: Int[np.ndarray, "n 2"],
+		starts: Int[np.ndarray, " n_steps"],
+		ends: Int[np.ndarray, " n_steps"],
+		coord_table: Int[np.ndarray, "row col k"],
+	) -> Int[np.ndarray, "n_steps k"]:
+		"""ids of the tokens for each step by `step_tokenizer`, as in its `to_tokens`"""
+		output: Int[np.ndarray, " n_steps"]
+		if isinstance(step_tokenizer, StepTokenizers.Coord):
+			return coord_table[solution[ends, 0], solution[ends, 1]]
+		elif isinstance(step_tokenizer, StepTokenizers.Cardinal):
+			output = _lookup_direction(
+				_CARDINAL_ID_TABLE,
+				solution[starts + 1] - solution[starts],
+			)
+		elif isinstance(step_tokenizer, StepTokenizers.Relative):
+			output = _relative_direction_ids(solution, starts)
+		elif isinstance(step_tokenizer, StepTokenizers.Distance):
+			distances: Int[np.ndarray, " n_steps"] = ends - starts
+			if len(distances) > 0 and distances.max() >= len(_DISTANCE_IDS):
+				raise _FallBack
+			output = _DISTANCE_IDS[distances]
+		else:
+			err_msg: str = f"unsupported step tokenizer {step_tokenizer}"
+			raise TypeError(err_msg)
+		if (output < 0).any():
+			raise _FallBack
+		return output.reshape(-1, 1)
@@ -4,11 +4,15 @@ see the code in `maze_dataset.tokenization.modular.elements` for examples of sub
 """
 
 import abc
+import dataclasses
+import functools
 from typing import (
 	Any,
 	Callable,
 	Literal,
 	TypeVar,
+	get_args,
+	get_origin,
 )
 
 from muutils.json_serialize import (
@@ -17,7 +21,7 @@ from muutils.json_serialize import (
 	serializable_field,
 )
 from muutils.json_serialize.util import _FORMAT_KEY
-from muutils.misc import flatten
+from muutils.misc import flatten, is_abstract
 from zanj.loading import load_item_recursive
 
 from maze_dataset.tokenization.modular.hashing import _hash_tokenizer_name
@@ -52,16 +56,30 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 		else:
 			return f"{k}={v}"
 
+	def _fields(self) -> dict[str, Any]:
+		"""values of the dataclass fields, in order
+
+		unlike `__dict__`, this leaves out the values memoized on the instance
+		"""
+		return {f.name: self.__dict__[f.name] for f in dataclasses.fields(self)}
+
 	@property
 	def name(self) -> str:
-		members_str: str = ", ".join(
-			[self._stringify(k, v) for k, v in self.__dict__.items() if k != "_type_"],
-		)
-		output: str = f"{type(self).__name__}({members_str})"
-		if "." in output and output.index("(") > output.index("."):
-			return "".join(output.split(".")[1:])
-		else:
-			return output
+		"""name of the element, from which `from_name` can construct it again. memoized, since elements are frozen"""
+		output: str | None = self.__dict__.get("_name")
+		if output is None:
+			members_str: str = ", ".join(
+				[
+					self._stringify(k, v)
+					for k, v in self._fields().items()
+					if k != "_type_"
+				],
+			)
+			output = f"{type(self).__name__}({members_str})"
+			if "." in output and output.index("(") > output.index("."):
+				output = "".join(output.split(".")[1:])
+			self.__dict__["_name"] = output
+		return output
 
 	def __str__(self) -> str:
 		return self.name
@@ -86,10 +104,30 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 			assert_type=False,
 		)
 		cls.__annotations__["_type_"] = Literal[repr(cls)]
+		# the frozen dataclass decorator would otherwise generate a field-wise `__hash__`
+		# for each subclass, replacing the memoized one below
+		cls.__hash__ = _TokenizerElement.__hash__  # type: ignore[method-assign]
 
 	def __hash__(self) -> int:
-		"Stable hash to identify unique `MazeTokenizerModular` instances. uses name"
-		return _hash_tokenizer_name(self.name)
+		"Stable hash to identify unique `MazeTokenizerModular` instances. uses name, memoized"
+		output: int | None = self.__dict__.get("_hash")
+		if output is None:
+			output = _hash_tokenizer_name(self.name)
+			self.__dict__["_hash"] = output
+		return output
+
+	@classmethod
+	def from_name(cls, name: str) -> "_TokenizerElement":
+		"""constructs the element named `name`, the inverse of `name`
+
+		# Raises:
+		- `ValueError` : if `name` is not the name of an instance of `cls`
+		"""
+		element: _TokenizerElement = _element_from_name(name)
+		if not isinstance(element, cls):
+			err_msg: str = f"{name!r} is the name of a {type(element)}, not a {cls}"
+			raise ValueError(err_msg)  # noqa: TRY004
+		return element
 
 	@classmethod
 	def _level_one_subclass(cls) -> type["_TokenizerElement"]:
@@ -104,22 +142,32 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 		Currently only detects `_TokenizerElement` instances which are either direct attributes of another instance or
 		which sit inside a `tuple` without further nesting.
 
+		Memoized, since elements are frozen.
+
 		# Parameters
 		- `deep: bool`: Whether to return elements nested arbitrarily deeply or just a single layer.
 		"""
-		if not any(type(el) == tuple for el in self.__dict__.values()):  # noqa: E721
+		memo_key: str = f"_tokenizer_elements_{deep}"
+		if memo_key not in self.__dict__:
+			self.__dict__[memo_key] = self._tokenizer_elements(deep)
+		return list(self.__dict__[memo_key])
+
+	def _tokenizer_elements(self, deep: bool) -> list["_TokenizerElement"]:
+		"""computes `tokenizer_elements`"""
+		field_values: list[Any] = list(self._fields().values())
+		if not any(type(el) == tuple for el in field_values):  # noqa: E721
 			return list(
 				flatten(
 					[
 						[el, *el.tokenizer_elements()]
-						for el in self.__dict__.values()
+						for el in field_values
 						if isinstance(el, _TokenizerElement)
 					],
 				)
 				if deep
 				else filter(
 					lambda x: isinstance(x, _TokenizerElement),
-					self.__dict__.values(),
+					field_values,
 				),
 			)
 		else:
@@ -127,13 +175,13 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 				flatten(
 					[
 						[el, *el.tokenizer_elements()]
-						for el in self.__dict__.values()
+						for el in field_values
 						if isinstance(el, _TokenizerElement)
 					]
 					if deep
 					else filter(
 						lambda x: isinstance(x, _TokenizerElement),
-						self.__dict__.values(),
+						field_values,
 					),
 				),
 			)
@@ -149,7 +197,7 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 							if deep
 							else filter(lambda x: isinstance(x, _TokenizerElement), el)
 						)
-						for el in self.__dict__.values()
+						for el in field_values
 						if isinstance(el, tuple)
 					],
 				),
@@ -198,7 +246,7 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 						]
 					)
 				)
-				for key, val in self.__dict__.items()
+				for key, val in self._fields().items()
 				if key != "_type_"
 			},
 		}
@@ -253,6 +301,88 @@ class _TokenizerElement(SerializableDataclass, abc.ABC):
 T = TypeVar("T", bound=_TokenizerElement)
 
 
+def _split_name_args(args: str) -> list[str]:
+	"""splits the arguments in a `_TokenizerElement.name` on the commas not inside parentheses"""
+	output: list[str] = list()
+	depth: int = 0
+	start: int = 0
+	for i, char in enumerate(args):
+		if char == "(":
+			depth += 1
+		elif char == ")":
+			depth -= 1
+		elif char == "," and depth == 0:
+			output.append(args[start:i].strip())
+			start = i + 1
+	if args[start:].strip():
+		output.append(args[start:].strip())
+	return output
+
+
+@functools.cache
+def _element_classes() -> dict[str, type[_TokenizerElement]]:
+	"""concrete subclasses of `_TokenizerElement` by class name, which is unique among them"""
+	output: dict[str, type[_TokenizerElement]] = dict()
+	to_visit: list[type[_TokenizerElement]] = [_TokenizerElement]
+	while to_visit:
+		cls: type[_TokenizerElement] = to_visit.pop()
+		to_visit.extend(cls.__subclasses__())
+		if not is_abstract(cls):
+			output[cls.__name__] = cls
+	return output
+
+
+def _literal_values(type_: Any) -> list[Any]:  # noqa: ANN401
+	"""all values of the `Literal`s in `type_`, looking through unions"""
+	if get_origin(type_) is Literal:
+		return list(get_args(type_))
+	return list(flatten(map(_literal_values, get_args(type_)), levels_to_flatten=1))
+
+
+def _element_from_name(name: str) -> _TokenizerElement:
+	"""constructs a `_TokenizerElement` from its `name`, by parsing `_TokenizerElement._stringify`"""
+	err_msg: str
+	class_name, paren, members = name.partition("(")
+	cls: type[_TokenizerElement] | None = _element_classes().get(class_name)
+	if cls is None or not paren or not members.endswith(")"):
+		err_msg = f"{name!r} is not the name of a `_TokenizerElement`"
+		raise ValueError(err_msg)
+
+	fields: list[dataclasses.Field] = [
+		f for f in dataclasses.fields(cls) if f.name != "_type_"
+	]
+	args: list[str] = _split_name_args(members[:-1])
+	if len(args) != len(fields):
+		err_msg = f"expected {len(fields)} members in {name!r}, got {len(args)}"
+		raise ValueError(err_msg)
+
+	kwargs: dict[str, Any] = dict()
+	for field, arg in zip(fields, args, strict=False):
+		prefix: str = f"{field.name}="
+		if not arg.startswith(prefix):
+			# a nested element is stringified by its name alone
+			kwargs[field.name] = _element_from_name(arg)
+			continue
+		value: str = arg[len(prefix) :]
+		if field.type is bool:
+			kwargs[field.name] = value == "T"
+		elif value.startswith("(") and value.endswith(")"):
+			kwargs[field.name] = tuple(
+				_element_from_name(el) for el in _split_name_args(value[1:-1])
+			)
+		else:
+			kwargs[field.name] = next(
+				(v for v in _literal_values(field.type) if str(v) == value),
+				value,
+			)
+	element: _TokenizerElement = cls(**kwargs)
+	# anything not parsed exactly, like a misspelled `bool`, shows up as a different name
+	if element.name != name:
+		err_msg = f"{name!r} is not the name of a `_TokenizerElement`, closest is {element.name!r}"
+		raise ValueError(err_msg)
+	return element
+
+
 def _unsupported_is_invalid(self, do_except: bool = False) -> bool:  # noqa: ANN001
 	"""Default implementation of `is_valid` for `mark_as_unsupported`-decorated classes"""
 	if do_except:
@@ -1,6 +1,7 @@
 """implements subclasses of `_TokenizerElement` to be used in `MazeTokenizerModular`"""
 
 import abc
+import functools
 import random
 from typing import (
 	Callable,
@@ -20,6 +21,7 @@ from muutils.misc import empty_sequence_if_attr_false, flatten
 # from maze_dataset import SolvedMaze
 from maze_dataset.constants import (
 	VOCAB,
+	VOCAB_TOKEN_TO_INDEX,
 	ConnectionArray,
 	ConnectionList,
 	Coord,
@@ -29,6 +31,8 @@ from maze_dataset.generation import numpy_rng
 from maze_dataset.maze.lattice_maze import LatticeMaze, SolvedMaze
 from maze_dataset.token_utils import (
 	connection_list_to_adj_list,
+	coord_token_id_table,
+	coord_token_table,
 	get_cardinal_direction,
 	get_relative_direction,
 	is_connection,
@@ -44,6 +48,16 @@ from maze_dataset.tokenization.modular.element_base import (
 from maze_dataset.utils import lattice_connection_array
 
 
+@functools.cache
+def _coord_token_tables(
+	coord_tokenizer: "CoordTokenizers._CoordTokenizer",
+	grid_shape: CoordTup,
+) -> tuple[np.ndarray, Int[np.ndarray, "row col k"]]:
+	"token strings and ids of every coord of a grid, cached per coord tokenizer and grid shape"
+	table: np.ndarray = coord_token_table(coord_tokenizer.to_tokens, grid_shape)
+	return table, coord_token_id_table(table, VOCAB_TOKEN_TO_INDEX)
+
+
 class CoordTokenizers(__TokenizerElementNamespace):
 	"""Namespace for `_CoordTokenizer` subclass hierarchy used by `MazeTokenizerModular`."""
 
@@ -57,6 +71,18 @@ class CoordTokenizers(__TokenizerElementNamespace):
 		def to_tokens(self, coord: Coord | CoordTup) -> list[str]:
 			pass
 
+		def token_table(self, grid_shape: CoordTup) -> np.ndarray:
+			"""tokens of every coord of a grid, as a read-only `(rows, cols, k)` array of strings
+
+			`token_table(grid_shape)[i, j].tolist() == to_tokens((i, j))`, so the tokens of an
+			array of coords are `token_table(grid_shape)[coords[..., 0], coords[..., 1]]`. cached
+			"""
+			return _coord_token_tables(self, tuple(grid_shape))[0]
+
+		def token_id_table(self, grid_shape: CoordTup) -> Int[np.ndarray, "row col k"]:
+			"""vocabulary ids of `token_table(grid_shape)`, with -1 for tokens not in the vocabulary. cached"""
+			return _coord_token_tables(self, tuple(grid_shape))[1]
+
 		@classmethod
 		def attribute_key(cls) -> str:
 			return CoordTokenizers.key
@@ -493,18 +519,16 @@ class AdjListTokenizers(__TokenizerElementNamespace):
 					],
 				)
 
-		def to_tokens(
-			self,
-			maze: LatticeMaze,
-			coord_tokenizer: CoordTokenizers._CoordTokenizer,
-		) -> list[str]:
+		def _get_edge_groups(self, maze: LatticeMaze) -> Sequence[ConnectionArray]:
+			"""Returns the edge groupings to be tokenized, in order.
+
+			All random draws of the adjacency list tokenization happen here, so anything
+			tokenizing the groups differently (e.g. `CompiledMazeTokenizer`) consumes the RNG identically.
+			"""
 			# Get the set of edges to be tokenized
 			edges: ConnectionArray = self.edge_subset._get_edges(maze)
 			# Systematically permute the leading coord of each edge
 			edges: ConnectionArray = self.edge_permuter._permute(edges)
-			group_params: EdgeGroupings._GroupingTokenParams = (
-				self.edge_grouping._token_params()
-			)
 			# then, we need to group the edges
 			groups: Sequence[ConnectionArray] = self.edge_grouping._group_edges(edges)
 			# shuffle the groups if specified
@@ -516,6 +540,17 @@ class AdjListTokenizers(__TokenizerElementNamespace):
 				else:
 					err_msg: str = f"`groups` is an unexpected type {type(groups)}. Only types `list` and `np.ndarray` are currently supported."
 					raise TypeError(err_msg)
+			return groups
+
+		def to_tokens(
+			self,
+			maze: LatticeMaze,
+			coord_tokenizer: CoordTokenizers._CoordTokenizer,
+		) -> list[str]:
+			group_params: EdgeGroupings._GroupingTokenParams = (
+				self.edge_grouping._token_params()
+			)
+			groups: Sequence[ConnectionArray] = self._get_edge_groups(maze)
 			# Tokenize each group with optional delimiters
 			tokens: list[str] = list(
 				flatten(
@@ -5,10 +5,17 @@ this has been superseded by the fst system
 """
 
 import hashlib
+import typing
 from pathlib import Path
+from typing import Iterable, Sequence
 
 import numpy as np
-from jaxtyping import UInt32
+from jaxtyping import Bool, Int, UInt32
+
+if typing.TYPE_CHECKING:
+	from maze_dataset.tokenization.modular.maze_tokenizer_modular import (
+		MazeTokenizerModular,
+	)
 
 # NOTE: these all need to match!
 
@@ -30,17 +37,34 @@ def _hash_tokenizer_name(s: str) -> int:
 	return (h64 >> 32) ^ (h64 & 0xFFFFFFFF)
 
 
+TOKENIZER_HASHES_FNAME: str = "MazeTokenizerModular_hashes.npy"
+"""file name of the hashes: a sorted, uncompressed `.npy` array, so it can be memory-mapped
+
+`MazeTokenizerModular_hashes.npz`, the compressed format used before, can still be read,
+but it has to be decompressed into memory in full"""
+
 _ALL_TOKENIZER_HASHES: AllTokenizersHashesArray
 "private array of all tokenizer hashes"
-_TOKENIZER_HASHES_PATH: Path = Path(__file__).parent / "MazeTokenizerModular_hashes.npz"
+_TOKENIZER_HASHES_PATH: Path = Path(__file__).parent / TOKENIZER_HASHES_FNAME
 "path to where we expect the hashes file -- in the same dir as this file, by default. change with `set_tokenizer_hashes_path`"
 
 
+def _with_npz_fallback(path: Path) -> Path:
+	"""`path`, or the legacy `.npz` file next to it if `path` is a missing `.npy` file"""
+	if (
+		path.suffix == ".npy"
+		and not path.is_file()
+		and path.with_suffix(".npz").is_file()
+	):
+		return path.with_suffix(".npz")
+	return path
+
+
 def set_tokenizer_hashes_path(path: Path) -> None:
 	"""set path to tokenizer hashes, and reload the hashes if needed
 
 	the hashes are expected to be stored in and read from `_TOKENIZER_HASHES_PATH`,
-	which by default is `Path(__file__).parent / "MazeTokenizerModular_hashes.npz"` or in this file's directory.
+	which by default is `Path(__file__).parent / TOKENIZER_HASHES_FNAME` or in this file's directory.
 
 	However, this might not always work, so we provide a way to change this.
 	"""
@@ -48,7 +72,7 @@ def set_tokenizer_hashes_path(path: Path) -> None:
 
 	path = Path(path)
 	if path.is_dir():
-		path = path / "MazeTokenizerModular_hashes.npz"
+		path = _with_npz_fallback(path / TOKENIZER_HASHES_FNAME)
 
 	if not path.is_file():
 		err_msg: str = f"could not find maze tokenizer hashes file at: {path}"
@@ -64,17 +88,23 @@ def set_tokenizer_hashes_path(path: Path) -> None:
 
 
 def _load_tokenizer_hashes() -> AllTokenizersHashesArray:
-	"""Loads the sorted list of `all_tokenizers.get_all_tokenizers()` hashes from disk."""
+	"""Loads the sorted list of `all_tokenizers.get_all_tokenizers()` hashes from disk.
+
+	a `.npy` file is memory-mapped read-only, so only the pages a lookup touches are read.
+	if it is missing, hashes saved before in the legacy `.npz` format next to it are read instead
+	"""
 	global _TOKENIZER_HASHES_PATH  # noqa: PLW0602
 	try:
-		path: Path = _TOKENIZER_HASHES_PATH
-		return np.load(path)["hashes"]
+		path: Path = _with_npz_fallback(_TOKENIZER_HASHES_PATH)
+		if path.suffix == ".npz":
+			return np.load(path)["hashes"]
+		return np.load(path, mmap_mode="r")
 	except FileNotFoundError as e:
 		err_msg: str = (
 			"Tokenizers hashes cannot be loaded. To fix this, run"
 			"\n`python -m maze-dataset.tokenization.save_hashes` which will save the hashes to"
-			"\n`data/MazeTokenizerModular_hashes.npz`"
-			"\nrelative to the current working directory -- this is where the code looks for them."
+			f"\n`{TOKENIZER_HASHES_FNAME}` next to `maze_dataset.tokenization.modular.hashing`,"
+			"\nor point `set_tokenizer_hashes_path` at an existing hashes file."
 		)
 		raise FileNotFoundError(err_msg) from e
 
@@ -93,3 +123,56 @@ def get_all_tokenizer_hashes() -> AllTokenizersHashesArray:
 		_ALL_TOKENIZER_HASHES = _load_tokenizer_hashes()
 
 	return _ALL_TOKENIZER_HASHES
+
+
+def hashes_to_table_dtype(
+	hashes: Int[np.ndarray, " n"] | Sequence[int],
+) -> AllTokenizersHashesArray:
+	"""reduce python `hash`es of tokenizers to `AllTokenizersHashDtype`, as they are stored in the table"""
+	hashes_np64: Int[np.ndarray, " n"] = np.asarray(hashes, dtype=np.int64)
+	return (
+		hashes_np64 % (1 << AllTokenizersHashBitLength)
+		if AllTokenizersHashBitLength < 64  # noqa: PLR2004
+		else hashes_np64
+	).astype(AllTokenizersHashDtype)
+
+
+def hashes_in_table(
+	hashes: Int[np.ndarray, " n"] | Sequence[int],
+) -> Bool[np.ndarray, " n"]:
+	"""whether each python `hash` of a tokenizer is in `get_all_tokenizer_hashes()`
+
+	by binary search in the sorted table
+	"""
+	table: AllTokenizersHashesArray = get_all_tokenizer_hashes()
+	hashes_table: AllTokenizersHashesArray = hashes_to_table_dtype(hashes)
+	if len(table) == 0:
+		return np.zeros(hashes_table.shape, dtype=np.bool_)
+	found: Int[np.ndarray, " n"] = np.minimum(
+		np.searchsorted(table, hashes_table),
+		len(table) - 1,
+	)
+	return np.asarray(table[found]) == hashes_table
+
+
+def are_tested_tokenizers(
+	tokenizers: Iterable["MazeTokenizerModular | str"],
+) -> Bool[np.ndarray, " n_tokenizers"]:
+	"""whether each tokenizer (or tokenizer name) is in the table of tested tokenizer hashes
+
+	batch version of checking `hash(tokenizer)` against `get_all_tokenizer_hashes()`. the table is
+	memory-mapped and binary searched, so a few checks only read a few pages of it.
+	`MazeTokenizerModular.is_tested_tokenizer` checks against the fst of names instead.
+	"""
+	return hashes_in_table(
+		np.fromiter(
+			(
+				# `hash` reduces the stable hash just like `MazeTokenizerModular.__hash__` does
+				hash(_hash_tokenizer_name(tokenizer))
+				if isinstance(tokenizer, str)
+				else hash(tokenizer)
+				for tokenizer in tokenizers
+			),
+			dtype=np.int64,
+		),
+	)
@@ -2,7 +2,7 @@
 
 import base64
 import warnings
-from functools import cached_property
+from functools import cached_property, lru_cache
 from typing import (
 	Iterable,
 	Literal,
@@ -36,6 +36,7 @@ from maze_dataset.tokenization.maze_tokenizer_legacy import (
 	MazeTokenizer,
 	TokenizationMode,
 )
+from maze_dataset.tokenization.modular.compiled import CompiledMazeTokenizer
 from maze_dataset.tokenization.modular.element_base import (
 	_load_tokenizer_element,
 	_TokenizerElement,
@@ -70,8 +71,12 @@ class MazeTokenizerModular(SerializableDataclass):
 	)
 
 	def hash_int(self) -> int:
-		"return integer hash using blake2b"
-		return _hash_tokenizer_name(self.name)
+		"return integer hash using blake2b. memoized, since tokenizers are frozen"
+		output: int | None = self.__dict__.get("_hash_int")
+		if output is None:
+			output = _hash_tokenizer_name(self.name)
+			self.__dict__["_hash_int"] = output
+		return output
 
 	def __hash__(self) -> int:
 		"Stable hash to identify unique `MazeTokenizerModular` instances. uses name"
@@ -122,9 +127,9 @@ class MazeTokenizerModular(SerializableDataclass):
 		"""Nested dictionary of the internal `TokenizerElement`s."""
 		return {type(self).__name__: self.prompt_sequencer.tokenizer_element_dict()}
 
-	@property
+	@cached_property
 	def name(self) -> str:
-		"""Serializes MazeTokenizer into a key for encoding in zanj"""
+		"""Serializes MazeTokenizer into a key for encoding in zanj. inverse of `from_name`"""
 		return "-".join([type(self).__name__, self.prompt_sequencer.name])  # noqa: FLY002
 
 	def summary(self) -> dict[str, str]:
@@ -232,6 +237,17 @@ class MazeTokenizerModular(SerializableDataclass):
 			),
 		}[legacy_maze_tokenizer]
 
+	@classmethod
+	def from_name(cls, name: str) -> "MazeTokenizerModular":
+		"""Constructs the tokenizer named `name`, the inverse of `name`.
+
+		Parsed names are kept in an LRU cache of `FROM_NAME_CACHE_SIZE` tokenizers.
+
+		# Raises:
+		- `ValueError` : if `name` is not the name of a `MazeTokenizerModular`
+		"""
+		return _tokenizer_from_name(name)
+
 	# Simple properties
 	# =================
 	@classmethod
@@ -321,6 +337,19 @@ class MazeTokenizerModular(SerializableDataclass):
 		)
 		return strings_to_coords(text=text, when_noncoord=when_noncoord)
 
+	def compile(self) -> CompiledMazeTokenizer:
+		"""specialized encoder from mazes straight to an `int32` array of token ids
+
+		`tokenizer.compile()(maze)` is identical to `encode(to_tokens(maze))`, including under the
+		same RNG state, but skips building the tokens as strings. see `compiled.CompiledMazeTokenizer`.
+		the encoder is cached on the tokenizer
+		"""
+		compiled: CompiledMazeTokenizer | None = self.__dict__.get("_compiled")
+		if compiled is None:
+			compiled = CompiledMazeTokenizer(self)
+			self.__dict__["_compiled"] = compiled
+		return compiled
+
 	@staticmethod
 	def encode(text: str | list[str]) -> list[int]:
 		"""encode a string or list of strings into a list of tokens"""
@@ -347,3 +376,21 @@ class MazeTokenizerModular(SerializableDataclass):
 			return " ".join(output)
 		else:
 			return output
+
+
+FROM_NAME_CACHE_SIZE: int = 4096
+"number of tokenizers `MazeTokenizerModular.from_name` keeps cached"
+
+
+@lru_cache(maxsize=FROM_NAME_CACHE_SIZE)
+def _tokenizer_from_name(name: str) -> MazeTokenizerModular:
+	"""implements `MazeTokenizerModular.from_name`. tokenizers are frozen, so sharing them is fine"""
+	prefix: str = f"{MazeTokenizerModular.__name__}-"
+	if not name.startswith(prefix):
+		err_msg: str = f"{name!r} is not the name of a `MazeTokenizerModular`"
+		raise ValueError(err_msg)
+	return MazeTokenizerModular(
+		prompt_sequencer=PromptSequencers._PromptSequencer.from_name(
+			name[len(prefix) :]
+		),
+	)
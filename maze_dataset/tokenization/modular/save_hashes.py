@@ -7,7 +7,7 @@ calls `maze_dataset.tokenization.all_tokenizers.save_hashes()`
 
 Usage:
 
-To save to the default location (inside package, `maze_dataset/tokenization/MazeTokenizerModular_hashes.npy`):
+To save to the default location (inside package, `maze_dataset/tokenization/modular/MazeTokenizerModular_hashes.npy`):
 ```bash
 python -m maze_dataset.tokenization.save_hashes
 ```
@@ -88,7 +88,7 @@ if __name__ == "__main__":
 		# set up path
 		if args.path is not None:
 			raise ValueError("cannot use --check with a custom path")
-		temp_path: Path = Path("tests/_temp/tok_hashes.npz")
+		temp_path: Path = Path("tests/_temp/tok_hashes.npy")
 		temp_path.parent.mkdir(parents=True, exist_ok=True)
 
 		# generate and save to temp location
@@ -104,7 +104,7 @@ if __name__ == "__main__":
 			update_interval=0.5,
 			message="loading saved hashes...",
 		):
-			read_hashes: np.ndarray = np.load(temp_path)["hashes"]
+			read_hashes: np.ndarray = np.load(temp_path)
 			read_hashes_pkg: np.ndarray = _load_tokenizer_hashes()
 			read_hashes_wrapped: np.ndarray = get_all_tokenizer_hashes()
 
@@ -1,8 +1,11 @@
 "misc utilities for the `maze_dataset` package"
 
+import abc
+import bisect
 import enum
 import itertools
 import math
+import random
 import typing
 from dataclasses import Field  # noqa: TC003
 from functools import cache, wraps
@@ -295,34 +298,28 @@ def _apply_validation_func(
 
 # TYPING: some better type hints would be nice here
 def _all_instances_wrapper(f: Callable) -> Callable:
-	"""Converts dicts to frozendicts to allow caching and applies `_apply_validation_func`."""
+	"""Converts dicts to frozendicts and applies `_apply_validation_func`.
+
+	The output is a one-shot generator, so it is not cached: a cached generator would be
+	exhausted for every call after the first. `count_instances` memoizes counts instead,
+	and `instance_space` the structure of the space.
+	"""
 
 	@wraps(f)
 	def wrapper(*args, **kwargs):  # noqa: ANN202
-		@cache
-		def cached_wrapper(  # noqa: ANN202
-			type_: type,
-			all_instances_func: Callable,
-			validation_funcs: (
-				frozendict.frozendict[FiniteValued, Callable[[FiniteValued], bool]]
-				| None
-			),
-		):
-			return _apply_validation_func(
-				type_,
-				all_instances_func(type_, validation_funcs),
-				validation_funcs,
-			)
-
 		validation_funcs: frozendict.frozendict
-		# TODO: what is this magic value here exactly?
+		# `validation_funcs` is the second positional argument
 		if len(args) >= 2 and args[1] is not None:  # noqa: PLR2004
 			validation_funcs = frozendict.frozendict(args[1])
 		elif "validation_funcs" in kwargs and kwargs["validation_funcs"] is not None:
 			validation_funcs = frozendict.frozendict(kwargs["validation_funcs"])
 		else:
 			validation_funcs = None
-		return cached_wrapper(args[0], f, validation_funcs)
+		return _apply_validation_func(
+			args[0],
+			f(args[0], validation_funcs),
+			validation_funcs,
+		)
 
 	return wrapper
 
@@ -436,3 +433,453 @@ def all_instances(
 			yield from get_args(type_)
 		else:
 			raise UnsupportedAllInstancesError(type_)
+
+
+INSTANCE_SPACE_MATERIALIZE_MAX: int = 4096
+"subtrees of an `InstanceSpace` with at most this many candidates are enumerated and validated eagerly"
+
+
+def _validation_func(
+	type_: FiniteValued,
+	validation_funcs: (
+		frozendict.frozendict[FiniteValued, Callable[[FiniteValued], bool]] | None
+	),
+) -> Callable[[FiniteValued], bool] | None:
+	"the validation function `_apply_validation_func` would apply to instances of `type_`, if any"
+	if validation_funcs is None:
+		return None
+	if type_ in validation_funcs:
+		return validation_funcs[type_]
+	for superclass in getattr(type_, "__mro__", ()):
+		if superclass in validation_funcs:
+			return validation_funcs[superclass]
+	return None
+
+
+class InstanceSpace(abc.ABC):
+	"""indexed, lazily constructed version of `all_instances(type_, validation_funcs)`
+
+	`all_instances` can only enumerate a space from the start, so getting a single instance, or a
+	random sample, means constructing and validating everything before it. an `InstanceSpace`
+	instead numbers the instances in a mixed radix: a dataclass or tuple is a product of the
+	spaces of its fields (the last field varying fastest), and an abstract dataclass or union is
+	the concatenation of the spaces of its members. instance `i` is then built directly from
+	the digits of `i`, in the same order as `all_instances` yields them.
+
+	small subtrees (at most `INSTANCE_SPACE_MATERIALIZE_MAX` candidates) are enumerated with
+	`all_instances` when the space is built, so they are validated exactly. the validation
+	functions of larger subtrees are only applied when an instance is accessed: such indices
+	are skipped by iteration and sampling, and `__getitem__` raises a `ValueError` for them.
+	`len` counts indices, so it is the number of valid instances only if every large subtree
+	is valid throughout, as is the case for `MazeTokenizerModular`.
+
+	get one with `instance_space`
+	"""
+
+	type_: FiniteValued
+	_len: int
+
+	def __len__(self) -> int:
+		"""number of indices in the space"""
+		return self._len
+
+	@abc.abstractmethod
+	def _get(self, i: int) -> tuple[FiniteValued, bool]:
+		"instance at index `i` (assumed in range), and whether it passes the deferred validation"
+		pass
+
+	@abc.abstractmethod
+	def index(self, value: FiniteValued) -> int:
+		"""index of `value`, raising a `ValueError` if it is not in the space"""
+		pass
+
+	def _check_index(self, i: int) -> int:
+		if not -self._len <= i < self._len:
+			err_msg: str = (
+				f"index {i} out of range for a space of {self._len} instances"
+			)
+			raise IndexError(err_msg)
+		return i % self._len if self._len else i
+
+	def __getitem__(self, i: int) -> FiniteValued:
+		"""instance at index `i`, raising a `ValueError` if it fails validation"""
+		value, valid = self._get(self._check_index(i))
+		if not valid:
+			err_msg: str = f"instance {i} of {self.type_} is not valid: {value}"
+			raise ValueError(err_msg)
+		return value
+
+	def is_valid(self, i: int) -> bool:
+		"""whether instance `i` passes validation"""
+		return self._get(self._check_index(i))[1]
+
+	def __iter__(self) -> typing.Iterator[FiniteValued]:
+		"""every valid instance, in the order of `all_instances`"""
+		return self.iter_range(0, self._len)
+
+	def iter_range(self, start: int, stop: int) -> Generator[FiniteValued, None, None]:
+		"""every valid instance with an index in `range(start, stop)`, in order"""
+		for i in range(max(start, 0), min(stop, self._len)):
+			value, valid = self._get(i)
+			if valid:
+				yield value
+
+	def __contains__(self, value: FiniteValued) -> bool:
+		"""whether `value` is a valid instance in the space"""
+		try:
+			return self.is_valid(self.index(value))
+		except ValueError:
+			return False
+
+	def sample(
+		self,
+		n: int,
+		exclude: Iterable[int] = (),
+		rng: "random.Random | None" = None,
+	) -> list[FiniteValued]:
+		"""`n` distinct valid instances, uniformly at random without replacement
+
+		indices are drawn from `rng` (the global `random` module by default) and rejected if
+		they are in `exclude` or fail validation, so nothing outside the sample is constructed.
+
+		# Parameters:
+		- `n : int`
+			number of instances to sample
+		- `exclude : Iterable[int]`
+			indices never to return
+			(defaults to `()`)
+		- `rng : random.Random | None`
+			source of randomness, the global `random` module if `None`
+			(defaults to `None`)
+
+		# Raises:
+		- `ValueError` : if there are fewer than `n` valid instances outside of `exclude`
+		"""
+		randrange: Callable[[int], int] = (random if rng is None else rng).randrange
+		seen: set[int] = set(exclude)
+		output: list[FiniteValued] = list()
+		while len(output) < n:
+			if len(seen) >= self._len:
+				err_msg: str = f"can't sample {n} instances, only {len(output)} valid instances outside of `exclude`"
+				raise ValueError(err_msg)
+			i: int = randrange(self._len)
+			if i in seen:
+				continue
+			seen.add(i)
+			value, valid = self._get(i)
+			if valid:
+				output.append(value)
+		return output
+
+
+class _ValuesSpace(InstanceSpace):
+	"""an explicit tuple of already validated instances"""
+
+	def __init__(self, type_: FiniteValued, values: Iterable[FiniteValued]) -> None:
+		self.type_ = type_
+		self.values: tuple[FiniteValued, ...] = tuple(values)
+		self._len = len(self.values)
+		self._positions: dict[FiniteValued, int] | None = None
+
+	def _get(self, i: int) -> tuple[FiniteValued, bool]:
+		return self.values[i], True
+
+	def index(self, value: FiniteValued) -> int:
+		if self._positions is None:
+			# reversed, so the first of any equal values is kept
+			self._positions = {v: i for i, v in reversed(list(enumerate(self.values)))}
+		try:
+			return self._positions[value]
+		except (KeyError, TypeError) as e:
+			err_msg: str = f"{value} is not an instance of {self.type_}"
+			raise ValueError(err_msg) from e
+
+
+class _UnionSpace(InstanceSpace):
+	"""the concatenation of the spaces of the subclasses or members of a union"""
+
+	def __init__(
+		self,
+		type_: FiniteValued,
+		members: list[InstanceSpace],
+		validation_func: Callable[[FiniteValued], bool] | None,
+	) -> None:
+		self.type_ = type_
+		self.members: list[InstanceSpace] = members
+		self.validation_func: Callable[[FiniteValued], bool] | None = validation_func
+		self.offsets: list[int] = [0, *itertools.accumulate(len(m) for m in members)]
+		self._len = self.offsets[-1]
+
+	def _get(self, i: int) -> tuple[FiniteValued, bool]:
+		k: int = bisect.bisect_right(self.offsets, i) - 1
+		value, valid = self.members[k]._get(i - self.offsets[k])
+		if valid and self.validation_func is not None:
+			valid = bool(self.validation_func(value))
+		return value, valid
+
+	def index(self, value: FiniteValued) -> int:
+		for offset, member in zip(self.offsets, self.members, strict=False):
+			if isinstance(member.type_, type) and not isinstance(value, member.type_):
+				continue
+			try:
+				return offset + member.index(value)
+			except ValueError:
+				continue
+		err_msg: str = f"{value} is not an instance of {self.type_}"
+		raise ValueError(err_msg)
+
+
+class _ProductSpace(InstanceSpace):
+	"""the cartesian product of the spaces of the fields of a dataclass or generic tuple"""
+
+	def __init__(
+		self,
+		type_: FiniteValued,
+		field_names: list[str] | None,
+		fields: list[InstanceSpace],
+		validation_func: Callable[[FiniteValued], bool] | None,
+	) -> None:
+		self.type_ = type_
+		self.field_names: list[str] | None = field_names
+		"names of the dataclass fields, or `None` for a tuple"
+		self.fields: list[InstanceSpace] = fields
+		self.validation_func: Callable[[FiniteValued], bool] | None = validation_func
+		self._len = math.prod(len(f) for f in fields)
+
+	def _get(self, i: int) -> tuple[FiniteValued, bool]:
+		args: list[FiniteValued] = [None] * len(self.fields)
+		valid: bool = True
+		for j in reversed(range(len(self.fields))):
+			i, digit = divmod(i, len(self.fields[j]))
+			args[j], field_valid = self.fields[j]._get(digit)
+			valid = valid and field_valid
+		value: FiniteValued = (
+			tuple(args)
+			if self.field_names is None
+			else self.type_(**dict(zip(self.field_names, args, strict=False)))
+		)
+		if valid and self.validation_func is not None:
+			valid = bool(self.validation_func(value))
+		return value, valid
+
+	def index(self, value: FiniteValued) -> int:
+		args: typing.Sequence[FiniteValued]
+		if self.field_names is None:
+			if not isinstance(value, tuple) or len(value) != len(self.fields):
+				err_msg: str = f"{value} is not an instance of {self.type_}"
+				raise ValueError(err_msg)
+			args = value
+		else:
+			if type(value) is not self.type_:
+				err_msg = f"{value} is not an instance of {self.type_}"
+				raise ValueError(err_msg)
+			args = [getattr(value, name) for name in self.field_names]
+		i: int = 0
+		for field, arg in zip(self.fields, args, strict=False):
+			i = i * len(field) + field.index(arg)
+		return i
+
+
+def _instance_space(
+	type_: FiniteValued,
+	validation_funcs: (
+		frozendict.frozendict[FiniteValued, Callable[[FiniteValued], bool]] | None
+	),
+	materialize_max: int,
+) -> InstanceSpace:
+	"builds the `InstanceSpace` of `type_`, see `instance_space`"
+	space: InstanceSpace
+	validation_func: Callable[[FiniteValued], bool] | None = _validation_func(
+		type_,
+		validation_funcs,
+	)
+	type_origin = get_origin(type_)
+	if hasattr(type_, "__dataclass_fields__"):
+		if is_abstract(type_):
+			space = _UnionSpace(
+				type_,
+				[
+					_instance_space(sub, validation_funcs, materialize_max)
+					for sub in type_.__subclasses__()
+				],
+				validation_func,
+			)
+		else:
+			fields: dict[str, Field] = type_.__dataclass_fields__
+			space = _ProductSpace(
+				type_,
+				list(fields),
+				[
+					_instance_space(f.type, validation_funcs, materialize_max)
+					for f in fields.values()
+				],
+				validation_func,
+			)
+	elif type_origin == tuple:  # noqa: E721
+		space = _ProductSpace(
+			type_,
+			None,
+			[
+				_instance_space(item, validation_funcs, materialize_max)
+				for item in get_args(type_)
+			],
+			validation_func,
+		)
+	elif type_origin in (UnionType, typing.Union):
+		space = _UnionSpace(
+			type_,
+			[
+				_instance_space(sub, validation_funcs, materialize_max)
+				for sub in get_args(type_)
+			],
+			validation_func,
+		)
+	else:
+		# `bool` and `Literal`, or unsupported types, for which `all_instances` raises
+		return _ValuesSpace(type_, all_instances(type_, validation_funcs))
+
+	if len(space) <= materialize_max:
+		return _ValuesSpace(type_, all_instances(type_, validation_funcs))
+	return space
+
+
+@cache
+def _instance_space_cached(
+	type_: FiniteValued,
+	validation_funcs: (
+		frozendict.frozendict[FiniteValued, Callable[[FiniteValued], bool]] | None
+	),
+	materialize_max: int,
+) -> InstanceSpace:
+	return _instance_space(type_, validation_funcs, materialize_max)
+
+
+def instance_space(
+	type_: FiniteValued,
+	validation_funcs: dict[FiniteValued, Callable[[FiniteValued], bool]] | None = None,
+	materialize_max: int = INSTANCE_SPACE_MATERIALIZE_MAX,
+) -> InstanceSpace:
+	"""indexed version of `all_instances(type_, validation_funcs)`, see `InstanceSpace`. cached
+
+	`list(instance_space(type_, validation_funcs)) == list(all_instances(type_, validation_funcs))`,
+	but `len`, indexing, `index` and `sample` don't construct the whole space.
+
+	# Parameters:
+	- `type_ : FiniteValued`
+		a finite-valued type, as for `all_instances`
+	- `validation_funcs : dict[FiniteValued, Callable[[FiniteValued], bool]] | None`
+		as for `all_instances`
+		(defaults to `None`)
+	- `materialize_max : int`
+		subtrees with at most this many candidates are enumerated with `all_instances` upfront
+		(defaults to `INSTANCE_SPACE_MATERIALIZE_MAX`)
+
+	# Raises:
+	- `UnsupportedAllInstancesError`: If `type_` is not supported by `all_instances`.
+	"""
+	return _instance_space_cached(
+		type_,
+		None if validation_funcs is None else frozendict.frozendict(validation_funcs),
+		materialize_max,
+	)
+
+
+def _filter_is_redundant(
+	type_: FiniteValued,
+	validation_func: Callable[[FiniteValued], bool],
+	validation_funcs: frozendict.frozendict[
+		FiniteValued,
+		Callable[[FiniteValued], bool],
+	],
+) -> bool:
+	"""whether every member of the superclass or union `type_` is already filtered by `validation_func`
+
+	in which case filtering instances of `type_` by it again changes nothing
+	"""
+	members: typing.Sequence[FiniteValued]
+	if hasattr(type_, "__dataclass_fields__") and is_abstract(type_):
+		members = type_.__subclasses__()
+	elif get_origin(type_) in (UnionType, typing.Union):
+		members = get_args(type_)
+	else:
+		return False
+	return all(
+		_validation_func(member, validation_funcs) is validation_func
+		for member in members
+	)
+
+
+@cache
+def _count_instances(
+	type_: FiniteValued,
+	validation_funcs: (
+		frozendict.frozendict[FiniteValued, Callable[[FiniteValued], bool]] | None
+	),
+) -> int:
+	"memoized implementation of `count_instances`"
+	validation_func: Callable[[FiniteValued], bool] | None = _validation_func(
+		type_,
+		validation_funcs,
+	)
+	if validation_func is not None and not _filter_is_redundant(
+		type_,
+		validation_func,
+		validation_funcs,  # type: ignore[arg-type]
+	):
+		# the validation function needs the instances themselves
+		return sum(1 for _ in iter_instances(type_, validation_funcs))
+
+	type_origin = get_origin(type_)
+	if hasattr(type_, "__dataclass_fields__"):
+		if is_abstract(type_):
+			return sum(
+				_count_instances(sub, validation_funcs)
+				for sub in type_.__subclasses__()
+			)
+		return math.prod(
+			_count_instances(f.type, validation_funcs)
+			for f in type_.__dataclass_fields__.values()
+		)
+	if type_origin == tuple:  # noqa: E721
+		return math.prod(
+			_count_instances(item, validation_funcs) for item in get_args(type_)
+		)
+	if type_origin in (UnionType, typing.Union):
+		return sum(_count_instances(sub, validation_funcs) for sub in get_args(type_))
+	# `bool` and `Literal`, or unsupported types, for which `all_instances` raises
+	return sum(1 for _ in all_instances(type_, validation_funcs))
+
+
+def count_instances(
+	type_: FiniteValued,
+	validation_funcs: dict[FiniteValued, Callable[[FiniteValued], bool]] | None = None,
+) -> int:
+	"""Number of instances `all_instances(type_, validation_funcs)` yields. cached
+
+	Counts are multiplied over the fields of dataclasses and tuples and summed over the members
+	of superclasses and unions, and memoized per `(type_, validation_funcs)` across calls.
+	Instances are only constructed for types with a validation function, since it has to be
+	called on them. A superclass or union needs no construction if all of its members are
+	already filtered by the same function.
+
+	# Raises:
+	- `UnsupportedAllInstancesError`: If `type_` is not supported by `all_instances`.
+	"""
+	return _count_instances(
+		type_,
+		None if validation_funcs is None else frozendict.frozendict(validation_funcs),
+	)
+
+
+def iter_instances(
+	type_: FiniteValued,
+	validation_funcs: dict[FiniteValued, Callable[[FiniteValued], bool]] | None = None,
+) -> Generator[FiniteValued, None, None]:
+	"""Lazily yields the instances of `all_instances(type_, validation_funcs)`, in the same order.
+
+	`all_instances` goes through `itertools.product`, which collects every instance of every
+	field first. For a type with a single huge field, like `MazeTokenizerModular`, that means
+	holding the whole space in memory. This instead iterates over `instance_space`, so only
+	the small subspaces are ever held in memory.
+	"""
+	yield from instance_space(type_, validation_funcs)
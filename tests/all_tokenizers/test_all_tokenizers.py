@@ -1,12 +1,15 @@
 import itertools
 import os
+import random
 from collections import Counter
 from typing import Callable, Iterable
 
+import numpy as np
 import pytest
 from zanj import ZANJ
 
 from maze_dataset import VOCAB, VOCAB_LIST, LatticeMaze
+from maze_dataset.generation import numpy_rng
 from maze_dataset.maze.lattice_maze import SolvedMaze
 from maze_dataset.testing_utils import MIXED_MAZES
 from maze_dataset.token_utils import equal_except_adj_list_sequence
@@ -160,6 +163,25 @@ def test_encode_decode(tokenizer: MazeTokenizerModular):
 		assert maze_tok == maze_decoded
 
 
+@pytest.mark.parametrize(
+	"tokenizer",
+	[pytest.param(tokenizer, id=tokenizer.name) for tokenizer in SAMPLED_TOKENIZERS],
+)
+def test_compiled_encode(tokenizer: MazeTokenizerModular):
+	compiled = tokenizer.compile()
+	for maze in SAMPLED_MAZES:
+		rng_state = (
+			random.getstate(),
+			np.random.get_state(),
+			numpy_rng.bit_generator.state,
+		)
+		expected: list[int] = tokenizer.encode(tokenizer.to_tokens(maze))
+		random.setstate(rng_state[0])
+		np.random.set_state(rng_state[1])
+		numpy_rng.bit_generator.state = rng_state[2]
+		assert compiled(maze).tolist() == expected
+
+
 @pytest.mark.parametrize(
 	"tokenizer",
 	[pytest.param(tokenizer, id=tokenizer.name) for tokenizer in SAMPLED_TOKENIZERS],
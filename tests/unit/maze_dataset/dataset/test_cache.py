@@ -0,0 +1,152 @@
+import shutil
+from pathlib import Path
+
+from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset import maze_dataset
+from maze_dataset.dataset.cache import (
+	CACHE_ACCESS_FLUSH_INTERVAL,
+	DATASET_CACHE_INDEX_FNAME,
+	DatasetCache,
+)
+
+CACHE_DIR: Path = Path("tests/_temp/test_dataset_cache/")
+
+
+def _fresh_cache(max_bytes: int | None = None) -> DatasetCache:
+	if CACHE_DIR.exists():
+		shutil.rmtree(CACHE_DIR)
+	return DatasetCache(CACHE_DIR, max_bytes=max_bytes)
+
+
+def _cfg(grid_n: int, name: str = "test_cache") -> MazeDatasetConfig:
+	return MazeDatasetConfig(name=name, grid_n=grid_n, n_mazes=3)
+
+
+def test_from_config_uses_index(mocker):
+	cache = _fresh_cache()
+	cfg = _cfg(3)
+	dataset = MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	assert cfg in cache
+	assert (CACHE_DIR / DATASET_CACHE_INDEX_FNAME).exists()
+	entry = cache.entries()[cache.key(cfg)]
+	assert entry["size"] == cache.path_for(cfg).stat().st_size
+
+	generate_spy = mocker.spy(MazeDataset, "generate")
+	loaded = MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	assert generate_spy.call_count == 0
+	assert loaded == dataset
+
+
+def test_put_moves_saved_dataset_into_place(mocker):
+	cache = _fresh_cache()
+	cfg = _cfg(3)
+	dataset = MazeDataset.generate(cfg)
+	save_spy = mocker.spy(MazeDataset, "save")
+	path = cache.put(cfg, dataset)
+
+	# saved under a hidden temp name, then moved to the final path
+	temp_path = Path(save_spy.call_args.args[1])
+	assert temp_path.parent == CACHE_DIR
+	assert temp_path.name.startswith(".")
+	assert not temp_path.exists()
+	assert path == cache.path_for(cfg)
+	assert [p.name for p in CACHE_DIR.glob("*.zanj")] == [path.name]
+	assert MazeDataset.read(path).mazes == dataset.mazes
+	assert cfg in cache
+
+
+def test_missing_file_is_regenerated():
+	cache = _fresh_cache()
+	cfg = _cfg(3)
+	MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	cache.path_for(cfg).unlink()
+
+	# index still has the entry, loading fails, so it's dropped and regenerated
+	MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	assert cache.path_for(cfg).exists()
+	assert cfg in cache
+
+
+def test_lru_eviction():
+	cache = _fresh_cache()
+	# datasets of (almost) the same size
+	cfgs = [_cfg(3, name=f"test_cache_{i}") for i in range(3)]
+	for cfg in cfgs[:2]:
+		MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	# touch the first, so the second is least recently used
+	assert cache.get(cfgs[0]) is not None
+
+	# room for two datasets, but not three
+	cache.max_bytes = int(cache.total_bytes() * 1.4)
+	MazeDataset.from_config(cfgs[2], cache=cache, do_download=False)
+
+	assert cfgs[0] in cache
+	assert cfgs[1] not in cache
+	assert cfgs[2] in cache
+	assert not cache.path_for(cfgs[1]).exists()
+	assert cache.total_bytes() <= cache.max_bytes
+
+
+def test_remove():
+	cache = _fresh_cache()
+	cfg = _cfg(3)
+	MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	cache.remove(cfg)
+	assert cfg not in cache
+	assert cache.get(cfg) is None
+	assert not cache.path_for(cfg).exists()
+
+
+def test_lookups_defer_index_writes():
+	cache = _fresh_cache()
+	cfg = _cfg(3)
+	MazeDataset.from_config(cfg, cache=cache, do_download=False)
+	index_path: Path = CACHE_DIR / DATASET_CACHE_INDEX_FNAME
+	last_access: float = cache.entries()[cache.key(cfg)]["last_access"]
+	stat_before = index_path.stat()
+
+	# lookups are recorded in memory only
+	for _ in range(CACHE_ACCESS_FLUSH_INTERVAL - 1):
+		assert cache.get(cfg) is not None
+	stat_after = index_path.stat()
+	assert (stat_after.st_ino, stat_after.st_mtime_ns) == (
+		stat_before.st_ino,
+		stat_before.st_mtime_ns,
+	)
+	assert cache.entries()[cache.key(cfg)]["last_access"] > last_access
+	assert (
+		DatasetCache(CACHE_DIR).entries()[cache.key(cfg)]["last_access"] == last_access
+	)
+
+	# and written out in a batch
+	cache.get(cfg)
+	assert (
+		DatasetCache(CACHE_DIR).entries()[cache.key(cfg)]["last_access"] > last_access
+	)
+
+
+def test_prefix_candidates_from_index(mocker):
+	cache = _fresh_cache()
+	cfg_large = MazeDatasetConfig(name="test_cache_prefix", grid_n=3, n_mazes=8)
+	cfg_small = MazeDatasetConfig(name="test_cache_prefix", grid_n=3, n_mazes=5)
+	MazeDataset.from_config(cfg_large, cache=cache, do_download=False)
+	assert cache.prefix_key(cfg_large) == cache.prefix_key(cfg_small)
+	assert cache.prefix_candidates(cfg_small) == [(8, cache.path_for(cfg_large))]
+
+	scan_spy = mocker.spy(maze_dataset, "_find_local_prefix_candidates")
+	generate_spy = mocker.spy(MazeDataset, "generate")
+	sliced = MazeDataset.from_config(cfg_small, cache=cache, do_download=False)
+	assert scan_spy.call_count == 0
+	assert generate_spy.call_count == 0
+	assert sliced.mazes == MazeDataset.generate(cfg_small).mazes
+
+	# filtered datasets can't be sliced
+	cfg_filtered = MazeDatasetConfig(
+		name="test_cache_prefix",
+		grid_n=3,
+		n_mazes=5,
+		applied_filters=[
+			dict(name="path_length", args=(), kwargs=dict(min_length=2)),
+		],
+	)
+	assert cache.prefix_key(cfg_filtered) is None
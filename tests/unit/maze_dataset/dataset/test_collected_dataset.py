@@ -97,3 +97,33 @@ class TestMazeDatasetCollection:
 		assert loaded.mazes == self.test_collection.mazes
 		assert loaded.cfg.diff(self.test_collection.cfg) == {}
 		assert loaded.cfg == self.test_collection.cfg
+
+
+def test_generate_parallel_single_pool():
+	config = MazeDatasetCollectionConfig(
+		name="test_collection_parallel",
+		maze_dataset_configs=[
+			MazeDatasetConfig(
+				n_mazes=n_mazes,
+				grid_n=grid_n,
+				name=f"test_dataset_{n_mazes}_{grid_n}",
+			)
+			for n_mazes, grid_n in zip(DATASET_LENGTHS, DATASET_GRID_SIZES, strict=True)
+		],
+	)
+	collection = MazeDatasetCollection.generate(
+		config,
+		gen_parallel=True,
+		pool_kwargs=dict(processes=2),
+		chunksize=1,
+	)
+	assert collection.dataset_lengths == DATASET_LENGTHS
+	for dataset, grid_n in zip(
+		collection.maze_datasets,
+		DATASET_GRID_SIZES,
+		strict=True,
+	):
+		for maze in dataset:
+			assert maze.grid_shape == (grid_n, grid_n)
+	# original configs are not modified
+	assert config.maze_dataset_configs[0].n_mazes == DATASET_LENGTHS[0]
@@ -1,3 +1,7 @@
+import json
+
+from muutils.misc import stable_hash
+
 from maze_dataset import MazeDatasetConfig
 from maze_dataset.dataset.configs import MAZE_DATASET_CONFIGS
 
@@ -29,3 +33,25 @@ def test_get_configs():
 			for key, value in MAZE_DATASET_CONFIGS.items()
 		],
 	), f".items() must be (str, config) tuples {MAZE_DATASET_CONFIGS.items()}"
+
+
+def test_stable_hash_cfg_memoized():
+	cfg: MazeDatasetConfig = MazeDatasetConfig(name="test", grid_n=3, n_mazes=5)
+	hash_a: int = cfg.stable_hash_cfg()
+	# memoized value matches a fresh computation
+	assert hash_a == stable_hash(json.dumps(cfg.serialize(), sort_keys=True))
+	assert cfg.stable_hash_cfg() == hash_a
+
+	# changing a field invalidates it
+	fname_a: str = cfg.to_fname()
+	cfg.n_mazes = 6
+	assert cfg.stable_hash_cfg() != hash_a
+	assert cfg.to_fname() != fname_a
+	cfg.n_mazes = 5
+	assert cfg.stable_hash_cfg() == hash_a
+
+	# so does editing a mutable field in place
+	cfg.applied_filters.append(dict(name="path_length", args=(), kwargs={}))
+	assert cfg.stable_hash_cfg() != hash_a
+	cfg.applied_filters.pop()
+	assert cfg.stable_hash_cfg() == hash_a
@@ -0,0 +1,125 @@
+import random
+
+import numpy as np
+import pytest
+
+from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.constants import SPECIAL_TOKENS
+from maze_dataset.dataset.encoded import _encode_seed, decode_mazes, encode_mazes
+from maze_dataset.dataset.maze_arrays import MazeArrays
+from maze_dataset.generation import LatticeMazeGenerators, numpy_rng
+from maze_dataset.tokenization import (
+	AdjListTokenizers,
+	EdgeGroupings,
+	MazeTokenizer,
+	MazeTokenizerModular,
+	PromptSequencers,
+	TokenizationMode,
+)
+
+CFG: MazeDatasetConfig = MazeDatasetConfig(
+	name="test_encoded",
+	grid_n=4,
+	n_mazes=10,
+	maze_ctor=LatticeMazeGenerators.gen_dfs,
+)
+
+TOKENIZERS: list = [
+	MazeTokenizerModular(),
+	MazeTokenizerModular(
+		prompt_sequencer=PromptSequencers.AOP(
+			adj_list_tokenizer=AdjListTokenizers.AdjListCardinal(
+				edge_grouping=EdgeGroupings.ByLeadingCoord(),
+			),
+		),
+	),
+	MazeTokenizer(
+		tokenization_mode=TokenizationMode.AOTP_UT_uniform,
+		max_grid_size=4,
+	),
+]
+
+
+@pytest.mark.parametrize("tokenizer", TOKENIZERS)
+def test_encode_all(tokenizer):
+	dataset = MazeDataset.generate(CFG)
+	token_ids, offsets = dataset.encode_all(tokenizer)
+	assert token_ids.dtype == np.int16
+	assert offsets.shape == (len(dataset) + 1,)
+	assert offsets[-1] == len(token_ids)
+
+	rng_state = np.random.get_state()
+	for i, maze in enumerate(dataset):
+		seed: int = _encode_seed(CFG.seed, i)
+		random.seed(seed)
+		np.random.seed(seed)
+		numpy_rng.bit_generator.state = np.random.PCG64(seed).state
+		expected: list[int] = tokenizer.encode(maze.as_tokens(tokenizer))
+		assert token_ids[offsets[i] : offsets[i + 1]].tolist() == expected
+	np.random.set_state(rng_state)
+
+	# independent of chunking, workers, and whether the mazes are packed
+	for mazes, kwargs in [
+		(dataset.mazes, dict(chunksize=3)),
+		(MazeArrays.from_mazes(dataset.mazes), dict(n_workers=2, chunksize=4)),
+	]:
+		other_ids, other_offsets = encode_mazes(
+			mazes,
+			tokenizer,
+			seed=CFG.seed,
+			**kwargs,
+		)
+		assert np.array_equal(other_ids, token_ids)
+		assert np.array_equal(other_offsets, offsets)
+
+
+def test_encode_all_keeps_rng_state():
+	dataset = MazeDataset.generate(CFG)
+	np.random.seed(0)
+	expected: float = np.random.rand()
+	np.random.seed(0)
+	dataset.encode_all(TOKENIZERS[1])
+	assert np.random.rand() == expected
+
+
+@pytest.mark.parametrize(
+	"tokenizer",
+	[
+		TOKENIZERS[0],
+		TOKENIZERS[2],
+		MazeTokenizer(
+			tokenization_mode=TokenizationMode.AOTP_CTT_indexed, max_grid_size=5
+		),
+	],
+)
+def test_decode_mazes(tokenizer):
+	dataset = MazeDataset.generate(CFG)
+	token_ids, offsets = dataset.encode_all(tokenizer)
+	arrays, valid = decode_mazes(token_ids, offsets, tokenizer, (4, 4))
+	assert valid.all()
+	assert arrays.to_mazes() == list(dataset.mazes)
+
+	# break a few sequences in different ways
+	sequences: list[np.ndarray] = np.split(token_ids, offsets[1:-1])
+	connector: int = tokenizer.tokenizer_map[SPECIAL_TOKENS.CONNECTOR]
+	sequences[1] = sequences[1][1:]
+	sequences[3] = np.where(sequences[3] == connector, 0, sequences[3])
+	sequences[4] = np.concatenate([sequences[4], sequences[4][-3:]])
+	broken_offsets: np.ndarray = np.cumsum([0] + [len(seq) for seq in sequences])
+	arrays, valid = decode_mazes(
+		np.concatenate(sequences),
+		broken_offsets,
+		tokenizer,
+		(4, 4),
+	)
+	assert valid.tolist() == [i not in (1, 3, 4) for i in range(len(dataset))]
+	assert arrays.to_mazes() == [m for i, m in enumerate(dataset.mazes) if valid[i]]
+
+	# coords outside the grid can't be decoded
+	_, valid = decode_mazes(token_ids, offsets, tokenizer, (3, 3))
+	assert not valid.all()
+
+
+def test_decode_mazes_unsupported():
+	with pytest.raises(NotImplementedError):
+		decode_mazes(np.zeros(0), np.zeros(1), TOKENIZERS[1], (4, 4))
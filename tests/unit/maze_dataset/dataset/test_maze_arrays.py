@@ -0,0 +1,188 @@
+import numpy as np
+import pytest
+
+from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset import maze_arrays
+from maze_dataset.dataset.maze_arrays import MAZE_COLUMNS, MazeArrays, new_data_hasher
+from maze_dataset.generation import LatticeMazeGenerators
+
+CFG: MazeDatasetConfig = MazeDatasetConfig(
+	name="test_maze_arrays",
+	grid_n=4,
+	n_mazes=6,
+	maze_ctor=LatticeMazeGenerators.gen_dfs,
+)
+
+
+def test_roundtrip():
+	dataset = MazeDataset.generate(CFG)
+	arrays = MazeArrays.from_mazes(dataset.mazes)
+
+	assert len(arrays) == len(dataset)
+	assert arrays.grid_shape == (4, 4)
+	assert arrays.connection_lists.shape == (6, 2, 4, 4)
+	assert np.array_equal(
+		arrays.solution_lengths,
+		[len(m.solution) for m in dataset],
+	)
+	assert arrays.to_mazes() == dataset.mazes
+
+
+def test_concatenate():
+	dataset = MazeDataset.generate(CFG)
+	chunks = [
+		MazeArrays.from_mazes(dataset.mazes[:2]),
+		MazeArrays.from_mazes([], grid_shape=(4, 4)),
+		MazeArrays.from_mazes(dataset.mazes[2:]),
+	]
+	combined = MazeArrays.concatenate(chunks)
+
+	assert len(combined) == len(dataset)
+	assert combined.solution_offsets[0] == 0
+	assert combined.solution_offsets[-1] == combined.solutions.shape[0]
+	assert combined.to_mazes() == dataset.mazes
+
+
+def test_empty_requires_grid_shape():
+	with pytest.raises(ValueError):  # noqa: PT011
+		MazeArrays.from_mazes([])
+
+
+def test_inconsistent_offsets():
+	with pytest.raises(ValueError):  # noqa: PT011
+		MazeArrays(
+			connection_lists=np.zeros((2, 2, 3, 3), dtype=np.bool_),
+			solutions=np.zeros((3, 2), dtype=np.int64),
+			solution_offsets=np.array([0, 3]),
+		)
+
+
+@pytest.mark.parametrize(
+	("maze_ctor", "maze_ctor_kwargs"),
+	[
+		(LatticeMazeGenerators.gen_dfs, dict()),
+		(LatticeMazeGenerators.gen_percolation, dict(p=0.4)),
+	],
+)
+def test_compute_columns(maze_ctor, maze_ctor_kwargs):
+	dataset = MazeDataset.generate(
+		MazeDatasetConfig(
+			name="test_maze_arrays",
+			grid_n=5,
+			n_mazes=20,
+			maze_ctor=maze_ctor,
+			maze_ctor_kwargs=maze_ctor_kwargs,
+			endpoint_kwargs=dict(except_on_no_valid_endpoint=False),
+		),
+	)
+	columns = MazeArrays.from_mazes(dataset.mazes).compute_columns()
+	assert set(columns) == set(MAZE_COLUMNS)
+
+	for i, maze in enumerate(dataset):
+		assert columns["solution_length"][i] == len(maze.solution)
+		assert (
+			columns["start_end_distance"][i]
+			== np.abs(
+				maze.start_pos - maze.end_pos,
+			).sum()
+		)
+		assert columns["n_forks"][i] == len(maze.get_solution_forking_points()[0])
+		assert columns["n_deadends"][i] == sum(
+			len(maze.get_coord_neighbors(c)) == 1 for c in maze.get_nodes()
+		)
+		assert columns["component_size"][i] == len(
+			maze.gen_connected_component_from(maze.start_pos),
+		)
+
+
+def test_validate():
+	arrays = MazeArrays.from_mazes(MazeDataset.generate(CFG).mazes)
+	arrays.validate()
+
+	# step through a wall: teleport the last coord of the first solution
+	bad_step = MazeArrays.from_mazes(MazeDataset.generate(CFG).mazes)
+	end: int = int(bad_step.solution_offsets[1]) - 1
+	bad_step.solutions[end] = bad_step.solutions[end - 1] + 2
+	bad_step.solutions[end] %= 4
+	with pytest.raises(ValueError, match="at indices \\[0\\]"):
+		bad_step.validate()
+
+	# out of bounds coord in the last maze
+	out_of_bounds = MazeArrays.from_mazes(MazeDataset.generate(CFG).mazes)
+	out_of_bounds.solutions[-1] = (4, 0)
+	with pytest.raises(ValueError, match="at indices \\[5\\]"):
+		out_of_bounds.validate()
+
+
+def test_lazy_dataset():
+	dataset = MazeDataset.generate(CFG)
+	mazes = list(dataset.mazes)
+	lazy = MazeDataset(cfg=CFG, mazes=MazeArrays.from_mazes(mazes))
+
+	assert len(lazy) == len(mazes)
+	assert lazy[-1] == mazes[-1]
+	assert lazy.data_hash() == dataset.data_hash()
+	assert np.array_equal(
+		lazy.maze_columns()["solution_length"],
+		dataset.maze_columns()["solution_length"],
+	)
+	assert lazy._mazes is None
+	assert lazy.mazes == mazes
+	assert lazy._maze_arrays is None
+	# the solution is a view into the arrays, not a copy
+	assert lazy.mazes[0].solution.base is not None
+
+
+def test_validate_mixed_shapes():
+	small = MazeDataset.generate(
+		MazeDatasetConfig(
+			name="test_maze_arrays_small",
+			grid_n=3,
+			n_mazes=2,
+			maze_ctor=LatticeMazeGenerators.gen_dfs,
+		),
+	)
+	broken = MazeArrays.from_mazes(MazeDataset.generate(CFG).mazes[:2])
+	broken.solutions[-1] = (4, 0)
+	dataset = MazeDataset(cfg=CFG, mazes=[*small.mazes, *broken.to_mazes()])
+	with pytest.raises(ValueError, match="at indices \\[3\\]"):
+		dataset.validate()
+
+
+def _data_hash_reference(mazes) -> int:
+	"""the byte layout of `MazeArrays.update_data_hasher`, fed one maze at a time"""
+	hasher = new_data_hasher()
+	for maze in mazes:
+		hasher.update(
+			np.array(
+				[*maze.connection_list.shape[1:], len(maze.solution)],
+				dtype="<i8",
+			).tobytes(),
+		)
+		hasher.update(np.packbits(maze.connection_list).tobytes())
+		hasher.update(np.ascontiguousarray(maze.solution, dtype="<i4").tobytes())
+	return int.from_bytes(hasher.digest(), "little")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 2**16])
+def test_data_hash_layout(chunk_size, monkeypatch):
+	monkeypatch.setattr(maze_arrays, "DATA_HASH_CHUNK_SIZE", chunk_size)
+	dataset = MazeDataset.generate(
+		MazeDatasetConfig(
+			name="test_maze_arrays",
+			grid_n=5,
+			n_mazes=10,
+			maze_ctor=LatticeMazeGenerators.gen_dfs,
+		),
+	)
+	# a slice not starting at the first solution coordinate
+	arrays = MazeArrays.from_mazes(dataset.mazes).slice(3, 10)
+	hasher = new_data_hasher()
+	arrays.update_data_hasher(hasher)
+	assert int.from_bytes(hasher.digest(), "little") == _data_hash_reference(
+		dataset.mazes[3:],
+	)
+
+	# the list backend packs runs of mazes with the same grid shape
+	mixed = MazeDataset(cfg=CFG, mazes=[*MazeDataset.generate(CFG).mazes, *dataset])
+	assert mixed.data_hash() == _data_hash_reference(mixed.mazes)
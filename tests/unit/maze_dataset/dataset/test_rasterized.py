@@ -72,6 +72,8 @@ def test_make_numpy_collection(remove_isolated_cells, extend_pixels, endpoints_a
 		n_mazes=2,
 		maze_ctor=LatticeMazeGenerators.gen_percolation,  # use percolation here to get some isolated cells
 		maze_ctor_kwargs=dict(p=0.4),
+		# on a 2x2 grid, percolation often isolates the start cell
+		endpoint_kwargs=dict(except_on_no_valid_endpoint=False),
 		remove_isolated_cells=remove_isolated_cells,
 		extend_pixels=extend_pixels,
 		endpoints_as_open=endpoints_as_open,
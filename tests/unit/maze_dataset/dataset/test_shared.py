@@ -0,0 +1,53 @@
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset.shared import SharedMazeDataset
+from maze_dataset.generation import LatticeMazeGenerators
+
+CFG: MazeDatasetConfig = MazeDatasetConfig(
+	name="test_shared",
+	grid_n=4,
+	n_mazes=6,
+	maze_ctor=LatticeMazeGenerators.gen_dfs,
+)
+
+
+def _solution_length(shared: SharedMazeDataset, i: int) -> int:
+	return len(shared[i].solution)
+
+
+@pytest.mark.parametrize("use_path", [False, True])
+def test_shared_view(use_path, tmp_path):
+	dataset = MazeDataset.generate(CFG)
+	with SharedMazeDataset.from_dataset(
+		dataset,
+		path=tmp_path if use_path else None,
+	) as shared:
+		assert len(shared) == len(dataset)
+		assert shared[-1] == dataset[-1]
+		assert not shared[0].solution.flags.writeable
+
+		unpickled: SharedMazeDataset = pickle.loads(pickle.dumps(shared))  # noqa: S301
+		assert [unpickled[i] for i in range(len(dataset))] == dataset.mazes
+		connection_list, solution = unpickled.get_arrays(2)
+		assert np.array_equal(solution, dataset[2].solution)
+		assert np.array_equal(connection_list, dataset[2].connection_list)
+		unpickled.close()
+
+		with multiprocessing.get_context("spawn").Pool(2) as pool:
+			lengths: list[int] = pool.starmap(
+				_solution_length,
+				[(shared, i) for i in range(len(dataset))],
+			)
+		assert lengths == [len(m.solution) for m in dataset]
+
+
+def test_pickle_closed_view():
+	shared = SharedMazeDataset.from_dataset(MazeDataset.generate(CFG))
+	shared.close()
+	with pytest.raises(ValueError, match="closed"):
+		pickle.dumps(shared)
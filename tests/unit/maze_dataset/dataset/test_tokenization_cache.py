@@ -0,0 +1,104 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset.dataset import maze_dataset as maze_dataset_module
+from maze_dataset.dataset.cache import (
+	TokenizationCache,
+	get_tokenization_cache,
+	set_tokenization_cache,
+)
+from maze_dataset.dataset.encoded import encode_mazes
+from maze_dataset.tokenization import (
+	MazeTokenizer,
+	MazeTokenizerModular,
+	TokenizationMode,
+)
+
+CACHE_DIR: Path = Path("tests/_temp/test_tokenization_cache/")
+
+CFG: MazeDatasetConfig = MazeDatasetConfig(
+	name="test_tokenization_cache",
+	grid_n=4,
+	n_mazes=5,
+)
+
+
+def _fresh_cache(max_bytes: int | None = None) -> TokenizationCache:
+	if CACHE_DIR.exists():
+		shutil.rmtree(CACHE_DIR)
+	return TokenizationCache(CACHE_DIR, max_bytes=max_bytes)
+
+
+def test_encode_all_cache(mocker):
+	cache = _fresh_cache()
+	dataset = MazeDataset.generate(CFG)
+	tokenizer = MazeTokenizerModular()
+	token_ids, offsets = dataset.encode_all(tokenizer, cache=cache)
+	assert cache.key(dataset.data_hash(), tokenizer, CFG.seed) in cache.entries()
+
+	encode_spy = mocker.spy(maze_dataset_module, "encode_mazes")
+	cached_ids, cached_offsets = dataset.encode_all(tokenizer, cache=cache)
+	assert not cached_ids.flags.writeable
+	assert np.array_equal(cached_ids, token_ids)
+	assert np.array_equal(cached_offsets, offsets)
+	assert encode_spy.call_count == 0
+	assert cache.get(dataset.data_hash(), tokenizer, CFG.seed + 1) is None
+
+	# a different seed is a different entry
+	dataset.encode_all(tokenizer, seed=CFG.seed + 1, cache=cache)
+	assert len(cache.entries()) == 2
+	cache.remove(dataset.data_hash(), tokenizer, CFG.seed + 1)
+	assert len(cache.entries()) == 1
+
+
+def test_lru_eviction():
+	cache = _fresh_cache()
+	dataset = MazeDataset.generate(CFG)
+	tokenizers = [
+		MazeTokenizerModular(),
+		MazeTokenizer(
+			tokenization_mode=TokenizationMode.AOTP_CTT_indexed, max_grid_size=4
+		),
+		MazeTokenizer(
+			tokenization_mode=TokenizationMode.AOTP_UT_uniform, max_grid_size=4
+		),
+	]
+	for tokenizer in tokenizers[:2]:
+		dataset.encode_all(tokenizer, cache=cache)
+	# touch the first, so the second is least recently used
+	assert cache.get(dataset.data_hash(), tokenizers[0], CFG.seed) is not None
+
+	cache.max_bytes = cache.total_bytes() + 1
+	dataset.encode_all(tokenizers[2], cache=cache)
+	assert set(cache.entries()) == {
+		cache.key(dataset.data_hash(), tokenizer, CFG.seed)
+		for tokenizer in [tokenizers[0], tokenizers[2]]
+	}
+	assert not (
+		CACHE_DIR / cache.key(dataset.data_hash(), tokenizers[1], CFG.seed)
+	).exists()
+
+
+def test_as_tokens_uses_default_cache():
+	cache = _fresh_cache()
+	dataset = MazeDataset.generate(CFG)
+	tokenizer = MazeTokenizer(
+		tokenization_mode=TokenizationMode.AOTP_UT_uniform, max_grid_size=4
+	)
+	token_ids, offsets = encode_mazes(dataset.mazes, tokenizer, seed=CFG.seed)
+	expected = [
+		tokenizer.decode(token_ids[offsets[i] : offsets[i + 1]].tolist())
+		for i in range(len(dataset))
+	]
+
+	previous = set_tokenization_cache(cache)
+	try:
+		assert get_tokenization_cache() is cache
+		assert dataset.as_tokens(tokenizer, limit=3) == expected[:3]
+		assert len(cache.entries()) == 1
+		assert dataset.as_tokens(tokenizer) == expected
+	finally:
+		set_tokenization_cache(previous)
@@ -1,21 +1,30 @@
 import copy
+import pickle
+import random
+import shutil
 from pathlib import Path
 
 import numpy as np
 import pytest
+from muutils.json_serialize import json_serialize
 from zanj import ZANJ
 
+from maze_dataset.benchmark.config_sweep import dataset_success_fraction, sweep
 from maze_dataset.constants import CoordArray
 from maze_dataset.dataset.dataset import (
 	register_dataset_filter,
 	register_filter_namespace_for_dataset,
 )
+from maze_dataset.dataset.maze_arrays import MazeArrays, new_data_hasher
 from maze_dataset.dataset.maze_dataset import (
+	MAZE_GENERATION_VERSION,
 	MazeDataset,
 	MazeDatasetConfig,
+	MazeGenerationExecutor,
 	register_maze_filter,
 	set_serialize_minimal_threshold,
 )
+from maze_dataset.generation import LatticeMazeGenerators
 from maze_dataset.generation.generators import GENERATORS_MAP
 from maze_dataset.maze import SolvedMaze
 from maze_dataset.utils import bool_array_from_string
@@ -62,6 +71,74 @@ def test_generate_parallel():
 		assert maze.grid_shape == (3, 3)
 
 
+@pytest.mark.parametrize("chunksize", [1, 2, 100])
+def test_generate_chunksize(chunksize):
+	dataset = MazeDataset.generate(TEST_CONFIGS[0], chunksize=chunksize)
+	assert len(dataset) == 5
+	assert dataset.cfg.n_mazes == 5
+
+	dataset_parallel = MazeDataset.generate(
+		TEST_CONFIGS[0],
+		gen_parallel=True,
+		pool_kwargs=dict(processes=2),
+		chunksize=chunksize,
+	)
+	assert len(dataset_parallel) == 5
+	for maze in dataset_parallel:
+		assert maze.grid_shape == (3, 3)
+		assert maze.generation_meta is not None
+
+
+def test_generation_executor_reuse():
+	with MazeGenerationExecutor(processes=2, chunksize=2) as executor:
+		datasets = [
+			MazeDataset.generate(cfg, executor=executor) for cfg in TEST_CONFIGS
+		]
+		pool = executor._pool
+		assert pool is not None
+		dataset_from_config = MazeDataset.from_config(
+			TEST_CONFIGS[2],
+			load_local=False,
+			save_local=False,
+			do_download=False,
+			executor=executor,
+		)
+		# same pool used throughout
+		assert executor._pool is pool
+	assert executor._pool is None
+
+	for dataset, cfg in zip(datasets, TEST_CONFIGS, strict=True):
+		assert len(dataset) == cfg.n_mazes
+		for maze in dataset:
+			assert maze.grid_shape == cfg.grid_shape
+	assert len(dataset_from_config) == TEST_CONFIGS[2].n_mazes
+
+
+def test_generation_executor_sweep():
+	with MazeGenerationExecutor(processes=2) as executor:
+		results = sweep(
+			TEST_CONFIGS[0],
+			param_values=[2, 4],
+			param_key="grid_n",
+			analyze_func=dataset_success_fraction,
+			executor=executor,
+		)
+		assert results == [1.0, 1.0]
+
+		# analysis functions without an `executor` argument only work without one
+		def grid_n(cfg: MazeDatasetConfig) -> int:
+			return cfg.grid_n
+
+		sweep_kwargs = dict(
+			param_values=[2, 4],
+			param_key="grid_n",
+			analyze_func=grid_n,
+		)
+		assert sweep(TEST_CONFIGS[0], **sweep_kwargs) == [2, 4]
+		with pytest.raises(TypeError, match="executor"):
+			sweep(TEST_CONFIGS[0], **sweep_kwargs, executor=executor)
+
+
 def test_data_hash_wip():
 	dataset = MazeDataset.generate(TEST_CONFIGS[0])
 	# TODO: dataset.data_hash doesn't work right now
@@ -353,3 +430,333 @@ def test_remove_duplicates_fast():
 		dataset.mazes[3],
 		dataset.mazes[4],
 	]
+
+
+def test_generate_index_deterministic():
+	cfg_small = MazeDatasetConfig(name="test_prefix", grid_n=4, n_mazes=3)
+	cfg_large = MazeDatasetConfig(name="test_prefix", grid_n=4, n_mazes=7)
+	small = MazeDataset.generate(cfg_small)
+	large = MazeDataset.generate(cfg_large, chunksize=2)
+	large_parallel = MazeDataset.generate(
+		cfg_large,
+		gen_parallel=True,
+		pool_kwargs=dict(processes=2),
+		chunksize=3,
+	)
+
+	assert small.mazes == large.mazes[:3]
+	assert large.mazes == large_parallel.mazes
+	assert list(large.generation_indices) == list(range(7))
+	assert large.n_generation_attempts == 7
+
+
+def test_generation_keeps_caller_rng():
+	cfg = MazeDatasetConfig(name="test_rng", grid_n=4, n_mazes=3)
+	np.random.seed(1)
+	random.seed(1)
+	np_state = np.random.get_state()
+	random_state = random.getstate()
+	with MazeGenerationExecutor(parallel=False) as executor:
+		executor.run(executor.split_tasks(cfg, 2))
+	assert random.getstate() == random_state
+	restored = np.random.get_state()
+	assert np.array_equal(restored[1], np_state[1])
+	assert restored[2:] == np_state[2:]
+
+
+def test_generation_version(mocker):
+	local_base_path = Path("tests/_temp/test_maze_dataset_version/")
+	if local_base_path.exists():
+		shutil.rmtree(local_base_path)
+	local_base_path.mkdir(parents=True)
+
+	def cfg(n_mazes: int) -> MazeDatasetConfig:
+		return MazeDatasetConfig(name="test_version", grid_n=4, n_mazes=n_mazes)
+
+	# configs saved before `generation_version` existed
+	cfg_old_ser = cfg(5).serialize()
+	del cfg_old_ser["generation_version"]
+	cfg_old = MazeDatasetConfig.load(cfg_old_ser)
+	assert cfg(5).generation_version == MAZE_GENERATION_VERSION
+	assert cfg_old.generation_version == 0
+	assert cfg_old != cfg(5)
+	assert cfg_old.to_fname() != cfg(5).to_fname()
+	with pytest.raises(ValueError, match="generation_version"):
+		MazeDataset.generate(cfg_old)
+
+	# a dataset generated under the old scheme is never used as a prefix
+	old = MazeDataset.generate(cfg(5))
+	old.cfg = cfg_old
+	old.save(local_base_path / f"{cfg_old.to_fname()}.zanj")
+	generate_spy = mocker.spy(MazeDataset, "generate")
+	MazeDataset.from_config(
+		cfg(9),
+		local_base_path=local_base_path,
+		do_download=False,
+	)
+	assert generate_spy.call_count > 0
+	assert all(
+		call.kwargs.get("_index_start", 0) == 0 for call in generate_spy.call_args_list
+	)
+
+
+@pytest.mark.parametrize("minimal_threshold", [None, 0])
+def test_from_config_prefix_reuse(minimal_threshold, mocker):
+	local_base_path = Path("tests/_temp/test_maze_dataset_prefix/")
+	if local_base_path.exists():
+		shutil.rmtree(local_base_path)
+	from_config_kwargs = dict(
+		local_base_path=local_base_path,
+		do_download=False,
+	)
+
+	def cfg(n_mazes: int) -> MazeDatasetConfig:
+		return MazeDatasetConfig(name="test_prefix", grid_n=4, n_mazes=n_mazes)
+
+	set_serialize_minimal_threshold(minimal_threshold)
+	try:
+		MazeDataset.from_config(cfg(5), **from_config_kwargs)
+
+		# extending: only the 4 missing mazes are generated
+		generate_spy = mocker.spy(MazeDataset, "generate")
+		extended = MazeDataset.from_config(cfg(9), **from_config_kwargs)
+		assert generate_spy.call_count > 0
+		assert all(
+			call.kwargs["_index_start"] == 5 for call in generate_spy.call_args_list
+		)
+		assert extended.mazes == MazeDataset.generate(cfg(9)).mazes
+		assert len(list(local_base_path.glob("*.zanj"))) == 2
+
+		# slicing: nothing generated, unless the saved metadata was collected
+		generate_spy.reset_mock()
+		sliced = MazeDataset.from_config(cfg(3), **from_config_kwargs)
+		assert (generate_spy.call_count == 0) == (minimal_threshold is None)
+		assert sliced.mazes == MazeDataset.generate(cfg(3)).mazes
+	finally:
+		set_serialize_minimal_threshold(100)
+
+
+def test_from_config_prefix_collected_metadata(mocker):
+	local_base_path = Path("tests/_temp/test_maze_dataset_prefix_minimal/")
+	if local_base_path.exists():
+		shutil.rmtree(local_base_path)
+	from_config_kwargs = dict(local_base_path=local_base_path, do_download=False)
+
+	def cfg(n_mazes: int) -> MazeDatasetConfig:
+		return MazeDatasetConfig(
+			name="test_prefix_minimal",
+			grid_n=4,
+			n_mazes=n_mazes,
+			maze_ctor=LatticeMazeGenerators.gen_dfs,
+			applied_filters=[
+				dict(name="collect_generation_meta", args=(), kwargs=dict()),
+			],
+		)
+
+	def expected_metadata(n_mazes: int) -> dict:
+		fresh = MazeDataset.generate(cfg(n_mazes)).filter_by.collect_generation_meta()
+		return json_serialize(fresh.generation_metadata_collected)
+
+	# saved in the minimal format, with the generation metadata collected
+	MazeDataset.from_config(cfg(200), **from_config_kwargs)
+	generate_spy = mocker.spy(MazeDataset, "generate")
+
+	# the collected counts can't be split, so a smaller dataset is generated from scratch
+	smaller = MazeDataset.from_config(cfg(50), **from_config_kwargs)
+	assert generate_spy.call_count > 0
+	assert all(
+		call.kwargs.get("_index_start", 0) == 0 for call in generate_spy.call_args_list
+	)
+	assert smaller.mazes == MazeDataset.generate(cfg(50)).mazes
+	assert json_serialize(smaller.generation_metadata_collected) == expected_metadata(
+		50
+	)
+
+	# extending adds the counts of the new mazes
+	generate_spy.reset_mock()
+	extended = MazeDataset.from_config(cfg(260), **from_config_kwargs)
+	assert all(
+		call.kwargs["_index_start"] == 200 for call in generate_spy.call_args_list
+	)
+	assert json_serialize(extended.generation_metadata_collected) == expected_metadata(
+		260
+	)
+
+
+def test_data_hash_incremental():
+	dataset: MazeDataset = MazeDataset.generate(TEST_CONFIGS[0])
+	mazes: list[SolvedMaze] = list(dataset.mazes)
+	hash_full: int = dataset.data_hash()
+
+	# hashing the packed arrays gives the same value
+	hasher = new_data_hasher()
+	MazeArrays.from_mazes(mazes).update_data_hasher(hasher)
+	assert int.from_bytes(hasher.digest(), "little") == hash_full
+
+	# appending continues from the previous hash
+	dataset_part: MazeDataset = MazeDataset(cfg=dataset.cfg, mazes=mazes[:2])
+	hash_part: int = dataset_part.data_hash()
+	assert hash_part != hash_full
+	dataset_part.mazes.extend(mazes[2:])
+	assert dataset_part.data_hash() == hash_full
+
+	# replacing a maze is detected
+	dataset_part.mazes[0] = mazes[1]
+	assert dataset_part.data_hash() != hash_full
+
+	# the memo is not pickled
+	assert pickle.loads(pickle.dumps(dataset)).data_hash() == hash_full  # noqa: S301
+
+
+def _remove_duplicates_reference(
+	mazes: list[SolvedMaze],
+	min_diff_cl: int | None,
+	min_diff_soln: int | None,
+) -> list[SolvedMaze]:
+	"""pairwise implementation of `remove_duplicates`, for comparison"""
+	unique: list[SolvedMaze] = []
+	for i, a in enumerate(mazes):
+		if not any(
+			(
+				min_diff_cl is not None
+				and a.connection_list.shape == b.connection_list.shape
+				and np.sum(a.connection_list != b.connection_list) <= min_diff_cl
+			)
+			or (
+				min_diff_soln is not None
+				and a.solution.shape == b.solution.shape
+				and np.sum(a.solution != b.solution) <= min_diff_soln
+			)
+			for b in mazes[i + 1 :]
+		):
+			unique.append(a)
+	return unique
+
+
+@pytest.mark.parametrize(
+	("min_diff_cl", "min_diff_soln"),
+	[(0, None), (1, 1), (3, None), (None, 2), (8, 0), (100, None)],
+)
+def test_remove_duplicates_matches_pairwise(min_diff_cl, min_diff_soln):
+	# small percolation mazes, so there are plenty of exact and near duplicates
+	mazes: list[SolvedMaze] = [
+		maze
+		for grid_n in [2, 3]
+		for maze in MazeDataset.from_config(
+			MazeDatasetConfig(
+				name="test",
+				grid_n=grid_n,
+				n_mazes=60,
+				maze_ctor=GENERATORS_MAP["gen_percolation"],
+				maze_ctor_kwargs=dict(p=0.6),
+				endpoint_kwargs=dict(except_on_no_valid_endpoint=False),
+			),
+			load_local=False,
+			save_local=False,
+		).mazes
+	]
+	dataset: MazeDataset = MazeDataset(cfg=TEST_CONFIGS[0], mazes=mazes)
+	deduped: MazeDataset = dataset.filter_by.remove_duplicates(
+		minimum_difference_connection_list=min_diff_cl,
+		minimum_difference_solution=min_diff_soln,
+	)
+	assert deduped.mazes == _remove_duplicates_reference(
+		mazes,
+		min_diff_cl,
+		min_diff_soln,
+	)
+
+
+def test_filters_share_mazes(mocker):
+	dataset: MazeDataset = MazeDataset.generate(TEST_CONFIGS[2])
+	spy = mocker.spy(MazeDataset, "_serialize_full")
+	filtered: MazeDataset = (
+		dataset.filter_by.path_length(min_length=2)
+		.filter_by.truncate_count(max_count=5)
+		.filter_by.remove_duplicates()
+	)
+	assert spy.call_count == 0
+
+	# mazes are shared, config is not
+	assert all(any(m is m_orig for m_orig in dataset.mazes) for m in filtered.mazes)
+	assert dataset.cfg.applied_filters == []
+	assert [f["name"] for f in filtered.cfg.applied_filters] == [
+		"path_length",
+		"truncate_count",
+		"remove_duplicates",
+	]
+	assert filtered.cfg.n_mazes == len(filtered)
+
+	# collecting metadata in the filtered dataset leaves the original alone
+	filtered.filter_by.collect_generation_meta()
+	assert all(m.generation_meta is None for m in filtered.mazes)
+	assert all(m.generation_meta is not None for m in dataset.mazes)
+
+	# an explicit copy still copies the mazes
+	copied: MazeDataset = copy.deepcopy(filtered)
+	assert spy.call_count == 1
+	assert copied.mazes == filtered.mazes
+	assert all(
+		m is not m_orig for m, m_orig in zip(copied.mazes, filtered.mazes, strict=True)
+	)
+
+
+def test_maze_columns_memoized(mocker):
+	dataset: MazeDataset = MazeDataset.generate(TEST_CONFIGS[2])
+	spy = mocker.spy(MazeArrays, "compute_column")
+	columns = dataset.maze_columns()
+	assert dataset.maze_columns() is columns
+	assert spy.call_count == 0
+
+	# filters only compute the columns they use, and carry them over
+	filtered: MazeDataset = dataset.filter_by.path_length(min_length=4)
+	assert filtered.mazes == [m for m in dataset.mazes if len(m.solution) >= 4]
+	assert [call.args[1] for call in spy.call_args_list] == ["solution_length"]
+	assert np.array_equal(
+		filtered.maze_columns()["solution_length"],
+		[len(m.solution) for m in filtered.mazes],
+	)
+	assert spy.call_count == 1
+	assert len(filtered.maze_columns()["component_size"]) == len(filtered)
+	assert spy.call_count == 2
+
+	# changing the mazes recomputes them
+	dataset.mazes.pop()
+	assert len(dataset.maze_columns()["solution_length"]) == len(dataset)
+	assert spy.call_count == 3
+
+
+def test_load_minimal_lazy():
+	dataset = MazeDataset.generate(TEST_CONFIGS[0], gen_parallel=False)
+	for serialized in (
+		dataset._serialize_minimal(),
+		dataset._serialize_minimal_soln_cat(),
+	):
+		loaded = MazeDataset.load(serialized)
+		assert loaded._mazes is None
+		assert len(loaded) == len(dataset)
+		loaded.validate()
+		assert loaded == dataset
+
+
+def test_pickle_packs_arrays():
+	dataset = MazeDataset.generate(TEST_CONFIGS[0], gen_parallel=False)
+	columns = dataset.maze_columns()
+	unpickled = pickle.loads(pickle.dumps(dataset))  # noqa: S301
+
+	assert unpickled._mazes is None
+	assert unpickled.maze_columns() is not columns
+	assert np.array_equal(
+		unpickled.maze_columns()["solution_length"],
+		columns["solution_length"],
+	)
+	assert unpickled == dataset
+	assert (
+		unpickled.mazes[0].generation_meta.keys()
+		== dataset.mazes[0].generation_meta.keys()
+	)
+
+	maze = dataset.mazes[0]
+	maze_unpickled = pickle.loads(pickle.dumps(maze))  # noqa: S301
+	assert maze_unpickled == maze
+	assert np.shares_memory(maze_unpickled.start_pos, maze_unpickled.solution)
@@ -1,6 +1,9 @@
+from collections import Counter
+
+import numpy as np
 from zanj import ZANJ
 
-from maze_dataset import MazeDataset, MazeDatasetConfig
+from maze_dataset import LatticeMazeGenerators, MazeDataset, MazeDatasetConfig
 from maze_dataset.dataset.maze_dataset import SERIALIZE_MINIMAL_THRESHOLD
 
 
@@ -53,3 +56,61 @@ def test_remove_duplicates_large():
 		minimum_difference_solution=1,
 	)
 	print(f"After removing duplicates, we have {len(dataset)} mazes")
+
+
+def test_collect_counts():
+	for maze_ctor, maze_ctor_kwargs in [
+		(LatticeMazeGenerators.gen_dfs, dict()),
+		(LatticeMazeGenerators.gen_percolation, dict(p=0.5)),
+	]:
+		dataset: MazeDataset = MazeDataset.generate(
+			MazeDatasetConfig(
+				name="test_collect",
+				grid_n=4,
+				n_mazes=20,
+				maze_ctor=maze_ctor,
+				maze_ctor_kwargs=maze_ctor_kwargs,
+				endpoint_kwargs=dict(except_on_no_valid_endpoint=False),
+			),
+		)
+		expected: dict[str, Counter] = dict()
+		for maze in dataset:
+			for key, value in maze.generation_meta.items():
+				counter: Counter = expected.setdefault(key, Counter())
+				if isinstance(value, (bool, int, float, str)):
+					counter[value] += 1
+				elif isinstance(value, set):
+					counter.update(value)
+				elif value.dtype == bool:
+					counter.update(tuple(c) for c in np.argwhere(value).tolist())
+				elif value.ndim == 1:
+					counter[tuple(value.tolist())] += 1
+				else:
+					counter.update(tuple(v) for v in value.tolist())
+
+		collected = dataset.filter_by.collect_generation_meta(inplace=False)
+		assert collected.generation_metadata_collected == {
+			key: dict(counter) for key, counter in expected.items()
+		}
+		assert all(m.generation_meta is None for m in collected.mazes)
+		assert all(m.generation_meta is not None for m in dataset.mazes)
+
+
+def test_compact_generation_meta():
+	maze = LatticeMazeGenerators.gen_dfs(np.array([4, 4]), accessible_cells=10)
+	visited_cells = maze.generation_meta["visited_cells"]
+	assert visited_cells.dtype == bool
+	assert visited_cells.shape == (4, 4)
+	assert visited_cells.sum() == 10
+	assert not maze.generation_meta["fully_connected"]
+
+	# the connected component is read from the mask
+	component = maze.get_connected_component()
+	assert component.shape == (10, 2)
+	assert {tuple(c) for c in component.tolist()} == {
+		tuple(c) for c in maze.gen_connected_component_from(component[0]).tolist()
+	}
+
+	# grid shape arrays are shared between mazes
+	maze_2 = LatticeMazeGenerators.gen_dfs(np.array([4, 4]))
+	assert maze.generation_meta["grid_shape"] is maze_2.generation_meta["grid_shape"]
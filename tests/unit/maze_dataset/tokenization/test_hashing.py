@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from maze_dataset.tokenization import (
+	CoordTokenizers,
+	MazeTokenizerModular,
+	PathTokenizers,
+	PromptSequencers,
+	StepSizes,
+	StepTokenizers,
+)
+from maze_dataset.tokenization.modular import hashing
+from maze_dataset.tokenization.modular.hashing import (
+	AllTokenizersHashDtype,
+	are_tested_tokenizers,
+	get_all_tokenizer_hashes,
+	hashes_to_table_dtype,
+	set_tokenizer_hashes_path,
+)
+
+TABLE_TOKENIZERS: list[MazeTokenizerModular] = [
+	MazeTokenizerModular(),
+	MazeTokenizerModular(
+		prompt_sequencer=PromptSequencers.AOTP(coord_tokenizer=CoordTokenizers.CTT()),
+	),
+	MazeTokenizerModular(prompt_sequencer=PromptSequencers.AOP()),
+]
+
+OTHER_TOKENIZER: MazeTokenizerModular = MazeTokenizerModular(
+	prompt_sequencer=PromptSequencers.AOTP(
+		path_tokenizer=PathTokenizers.StepSequence(
+			step_size=StepSizes.Forks(),
+			step_tokenizers=(StepTokenizers.Cardinal(),),
+		),
+	),
+)
+
+
+@pytest.fixture
+def hashes_dir(tmp_path, monkeypatch):
+	# restore the module state afterwards
+	monkeypatch.setattr(
+		hashing, "_TOKENIZER_HASHES_PATH", hashing._TOKENIZER_HASHES_PATH
+	)
+	monkeypatch.setattr(
+		hashing,
+		"_ALL_TOKENIZER_HASHES",
+		np.empty(0, dtype=AllTokenizersHashDtype),
+		raising=False,
+	)
+	hashes: np.ndarray = np.sort(
+		hashes_to_table_dtype([hash(t) for t in TABLE_TOKENIZERS]),
+	)
+	np.save(tmp_path / hashing.TOKENIZER_HASHES_FNAME, hashes)
+	np.savez_compressed(tmp_path / "legacy.npz", hashes=hashes)
+	return tmp_path
+
+
+def test_are_tested_tokenizers(hashes_dir):
+	set_tokenizer_hashes_path(hashes_dir)
+	assert isinstance(get_all_tokenizer_hashes(), np.memmap)
+	expected: list[bool] = [True] * len(TABLE_TOKENIZERS) + [False]
+	queries: list[MazeTokenizerModular] = [*TABLE_TOKENIZERS, OTHER_TOKENIZER]
+	assert are_tested_tokenizers(queries).tolist() == expected
+	assert are_tested_tokenizers([t.name for t in queries]).tolist() == expected
+	assert are_tested_tokenizers([]).shape == (0,)
+
+	# the compressed format still loads
+	set_tokenizer_hashes_path(hashes_dir / "legacy.npz")
+	assert not isinstance(get_all_tokenizer_hashes(), np.memmap)
+	assert are_tested_tokenizers(queries).tolist() == expected
+
+
+def test_default_path_falls_back_to_npz(hashes_dir, monkeypatch):
+	# only hashes in the old format next to the default `.npy` path
+	(hashes_dir / hashing.TOKENIZER_HASHES_FNAME).unlink()
+	(hashes_dir / "legacy.npz").rename(
+		(hashes_dir / hashing.TOKENIZER_HASHES_FNAME).with_suffix(".npz"),
+	)
+	monkeypatch.setattr(
+		hashing,
+		"_TOKENIZER_HASHES_PATH",
+		hashes_dir / hashing.TOKENIZER_HASHES_FNAME,
+	)
+	assert are_tested_tokenizers([*TABLE_TOKENIZERS, OTHER_TOKENIZER]).tolist() == [
+		True,
+		True,
+		True,
+		False,
+	]
@@ -12,6 +12,8 @@ from maze_dataset.generation import numpy_rng
 from maze_dataset.testing_utils import GRID_N, MAZE_DATASET
 from maze_dataset.token_utils import (
 	_coord_to_strings_UT,
+	connection_list_to_adj_list,
+	connection_lists_to_adj_lists,
 	coords_to_strings,
 	equal_except_adj_list_sequence,
 	get_adj_list_tokens,
@@ -662,3 +664,49 @@ def test_is_connection(edges: ConnectionArray, maze: LatticeMaze):
 			sorted_edges[:, 0, 1],
 		],
 	)
+
+
+def test_connection_list_to_adj_list():
+	maze = MAZE_DATASET.mazes[0]
+	adj_list = connection_list_to_adj_list(
+		maze.connection_list,
+		shuffle_d0=False,
+		shuffle_d1=False,
+	)
+	expected = [
+		[[x, y], [x + (d == 0), y + (d == 1)]]
+		for d, x, y in np.ndindex(maze.connection_list.shape)
+		if maze.connection_list[d, x, y]
+	]
+	assert adj_list.dtype == np.int8
+	assert adj_list.tolist() == expected
+
+	np.random.seed(3)
+	shuffled = connection_list_to_adj_list(maze.connection_list)
+	assert sorted(map(sorted, shuffled.tolist())) == sorted(map(sorted, expected))
+
+
+@pytest.mark.parametrize(
+	("shuffle_d0", "shuffle_d1"),
+	list(itertools.product([False, True], repeat=2)),
+)
+def test_connection_lists_to_adj_lists(shuffle_d0: bool, shuffle_d1: bool):
+	connection_lists = np.stack(
+		[maze.connection_list for maze in MAZE_DATASET.mazes]
+		+ [np.zeros_like(MAZE_DATASET.mazes[0].connection_list)],
+	)
+	np.random.seed(3)
+	adj_lists, offsets = connection_lists_to_adj_lists(
+		connection_lists,
+		shuffle_d0=shuffle_d0,
+		shuffle_d1=shuffle_d1,
+	)
+	after_batched: float = np.random.rand()
+
+	np.random.seed(3)
+	for i, connection_list in enumerate(connection_lists):
+		assert np.array_equal(
+			adj_lists[offsets[i] : offsets[i + 1]],
+			connection_list_to_adj_list(connection_list, shuffle_d0, shuffle_d1),
+		)
+	assert np.random.rand() == after_batched
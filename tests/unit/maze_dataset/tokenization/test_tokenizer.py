@@ -22,7 +22,7 @@ from maze_dataset import (
 	MazeDatasetConfig,
 	SolvedMaze,
 )
-from maze_dataset.generation import LatticeMazeGenerators
+from maze_dataset.generation import LatticeMazeGenerators, numpy_rng
 from maze_dataset.generation.seed import GLOBAL_SEED
 from maze_dataset.plotting.print_tokens import color_maze_tokens_AOTP
 from maze_dataset.testing_utils import (
@@ -52,7 +52,21 @@ from maze_dataset.tokenization import (
 	TokenizationMode,
 	_TokenizerElement,
 )
-from maze_dataset.utils import all_instances, lattice_max_degrees, manhattan_distance
+from maze_dataset.tokenization.modular.all_tokenizers import (
+	EVERY_TEST_TOKENIZERS,
+	MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS,
+	all_tokenizers_space,
+	get_tokenizer_index,
+	sample_tokenizers_for_test,
+)
+from maze_dataset.utils import (
+	all_instances,
+	count_instances,
+	instance_space,
+	iter_instances,
+	lattice_max_degrees,
+	manhattan_distance,
+)
 
 # Use for test fuzzing when there are too many possible tokenizers
 NUM_TOKENIZERS_TO_TEST = 100
@@ -592,8 +606,9 @@ def test_edge_subsets(es: EdgeSubsets._EdgeSubset, maze: LatticeMaze):
 					{
 						_TokenizerElement: lambda x: x.is_valid(),
 						# Add a condition to prune the range space that doesn't affect functionality being tested
-						EdgeGroupings.ByLeadingCoord: lambda x: x.intra
-						and x.connection_token_ordinal == 1,
+						EdgeGroupings.ByLeadingCoord: lambda x: (
+							x.intra and x.connection_token_ordinal == 1
+						),
 					},
 				),
 			),
@@ -764,3 +779,227 @@ def test_adjlist_tokenizers(  # noqa: PLR0912,C901
 )
 def test_unsupported_elements(tok_elem: _TokenizerElement, valid: bool):
 	assert tok_elem.is_valid() == valid
+
+
+@pytest.mark.parametrize(
+	"tokenizer",
+	[
+		pytest.param(tokenizer, id=tokenizer.name)
+		for tokenizer in [
+			MazeTokenizerModular(),
+			MazeTokenizerModular(
+				prompt_sequencer=PromptSequencers.AOP(
+					coord_tokenizer=CoordTokenizers.CTT(intra=False),
+					adj_list_tokenizer=AdjListTokenizers.AdjListCardinal(
+						pre=True,
+						edge_grouping=EdgeGroupings.ByLeadingCoord(
+							connection_token_ordinal=1,
+						),
+						edge_subset=EdgeSubsets.AllLatticeEdges(),
+					),
+					path_tokenizer=PathTokenizers.StepSequence(
+						step_size=StepSizes.Forks(),
+						step_tokenizers=(
+							StepTokenizers.Relative(),
+							StepTokenizers.Distance(),
+						),
+						pre=True,
+						intra=True,
+					),
+				),
+			),
+			MazeTokenizerModular(
+				prompt_sequencer=PromptSequencers.AOTP(
+					adj_list_tokenizer=AdjListTokenizers.AdjListCoord(
+						edge_grouping=EdgeGroupings.ByLeadingCoord(intra=False),
+						edge_subset=EdgeSubsets.ConnectionEdges(walls=True),
+						edge_permuter=EdgePermuters.BothCoords(),
+					),
+					target_tokenizer=TargetTokenizers.Unlabeled(post=True),
+					path_tokenizer=PathTokenizers.StepSequence(
+						step_size=StepSizes.Straightaways(),
+						step_tokenizers=(
+							StepTokenizers.Cardinal(),
+							StepTokenizers.Coord(),
+						),
+						post=True,
+					),
+				),
+			),
+		]
+	],
+)
+def test_compiled_encode(tokenizer: MazeTokenizerModular):
+	compiled = tokenizer.compile()
+	assert tokenizer.compile() is compiled
+	for maze in MIXED_MAZES[:9]:
+		rng_state = (
+			random.getstate(),
+			np.random.get_state(),
+			numpy_rng.bit_generator.state,
+		)
+		expected: list[int] = tokenizer.encode(tokenizer.to_tokens(maze))
+		expected_state = (random.random(), np.random.rand(), numpy_rng.random())  # noqa: S311
+		random.setstate(rng_state[0])
+		np.random.set_state(rng_state[1])
+		numpy_rng.bit_generator.state = rng_state[2]
+		output = compiled(maze)
+		assert output.dtype == np.int32
+		assert output.tolist() == expected
+		# and the RNGs were consumed identically
+		assert (random.random(), np.random.rand(), numpy_rng.random()) == expected_state  # noqa: S311
+
+
+@pytest.mark.parametrize(
+	"coord_tokenizer",
+	[
+		pytest.param(coord_tokenizer, id=coord_tokenizer.name)
+		for coord_tokenizer in [
+			CoordTokenizers.UT(),
+			CoordTokenizers.CTT(),
+			CoordTokenizers.CTT(pre=False, intra=False),
+		]
+	],
+)
+def test_coord_token_table(coord_tokenizer):
+	table = coord_tokenizer.token_table((4, 3))
+	ids = coord_tokenizer.token_id_table((4, 3))
+	assert coord_tokenizer.token_table((4, 3)) is table
+	assert ids.shape == table.shape
+	assert not ids.flags.writeable
+	for row, col in product(range(4), range(3)):
+		tokens: list[str] = coord_tokenizer.to_tokens((row, col))
+		assert table[row, col].tolist() == tokens
+		assert ids[row, col].tolist() == MazeTokenizerModular.encode(tokens)
+
+	coords = np.array([[3, 2], [0, 1], [2, 0]])
+	assert table[coords[:, 0], coords[:, 1]].ravel().tolist() == list(
+		flatten([coord_tokenizer.to_tokens(c) for c in coords]),
+	)
+
+
+@pytest.mark.parametrize("tok_mode", list(TokenizationMode))
+def test_legacy_coord_token_table(tok_mode):
+	tokenizer = MazeTokenizer(tokenization_mode=tok_mode, max_grid_size=5)
+	table = tokenizer.coord_token_table()
+	assert table.shape[:2] == (5, 5)
+	assert table[4, 1].tolist() == tokenizer.coords_to_strings([(4, 1)])
+	assert tokenizer.coord_token_id_table((2, 5))[1, 3].tolist() == tokenizer.encode(
+		tokenizer.coords_to_strings([(1, 3)]),
+	)
+	for maze in MIXED_MAZES[:6]:
+		rng_state = np.random.get_state()
+		expected: list[str] = tokenizer.coords_to_strings(
+			maze._as_coords_and_special_AOTP(),
+			when_noncoord="include",
+		)
+		np.random.set_state(rng_state)
+		assert maze.as_tokens(tokenizer) == expected
+
+
+@pytest.mark.parametrize(
+	"type_",
+	[
+		pytest.param(PathTokenizers._PathTokenizer, id="_PathTokenizer"),
+		pytest.param(AdjListTokenizers._AdjListTokenizer, id="_AdjListTokenizer"),
+		pytest.param(
+			StepTokenizers.StepTokenizerPermutation, id="StepTokenizerPermutation"
+		),
+	],
+)
+def test_instance_space(type_):
+	expected: list = list(
+		all_instances(type_, MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS),
+	)
+	# validation is deferred everywhere
+	space = instance_space(
+		type_,
+		MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS,
+		materialize_max=0,
+	)
+	assert list(space) == expected
+	assert len(space) >= len(expected)
+	for value in expected:
+		assert space[space.index(value)] == value
+	assert count_instances(
+		type_,
+		MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS,
+	) == len(expected)
+	assert (
+		list(iter_instances(type_, MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS))
+		== expected
+	)
+	expected_set: set = set(expected)
+	assert all(
+		space.is_valid(i) == (space._get(i)[0] in expected_set)
+		for i in range(len(space))
+	)
+
+
+def test_all_tokenizers_space():
+	space = all_tokenizers_space()
+	# `all_instances(MazeTokenizerModular)` would enumerate everything before yielding
+	prefix: list = list(
+		itertools.islice(
+			all_instances(
+				PromptSequencers._PromptSequencer,
+				MAZE_TOKENIZER_MODULAR_DEFAULT_VALIDATION_FUNCS,
+			),
+			1000,
+		),
+	)
+	assert [space[i].prompt_sequencer for i in range(len(prefix))] == prefix
+
+	for tokenizer in EVERY_TEST_TOKENIZERS:
+		i: int = get_tokenizer_index(tokenizer)
+		assert space[i] == tokenizer
+		assert get_tokenizer_index(tokenizer.name) == i
+	with pytest.raises(ValueError):  # noqa: PT011
+		get_tokenizer_index("MazeTokenizerModular-AOTP(UT())")
+
+	random.seed(GLOBAL_SEED)
+	sample: list[MazeTokenizerModular] = sample_tokenizers_for_test(50)
+	assert len(set(sample)) == len(sample) == 50
+	assert sample[-len(EVERY_TEST_TOKENIZERS) :] == EVERY_TEST_TOKENIZERS
+	for tokenizer in sample:
+		assert tokenizer.is_valid()
+		assert get_tokenizer_index(tokenizer.name) == get_tokenizer_index(tokenizer)
+	random.seed(GLOBAL_SEED)
+	assert sample_tokenizers_for_test(50) == sample
+
+
+def test_from_name():
+	random.seed(GLOBAL_SEED)
+	for tokenizer in [*EVERY_TEST_TOKENIZERS, *sample_tokenizers_for_test(50)]:
+		parsed: MazeTokenizerModular = MazeTokenizerModular.from_name(tokenizer.name)
+		assert parsed == tokenizer
+		assert hash(parsed) == hash(tokenizer)
+		for element in tokenizer.tokenizer_elements:
+			assert type(element).from_name(element.name) == element
+
+	with pytest.raises(ValueError):  # noqa: PT011
+		MazeTokenizerModular.from_name("MazeTokenizerModular-AOTP(UT())")
+	with pytest.raises(ValueError):  # noqa: PT011
+		CoordTokenizers._CoordTokenizer.from_name(StepSizes.Singles().name)
+
+
+def test_memoized_name_and_hash():
+	tokenizer = MazeTokenizerModular(
+		prompt_sequencer=PromptSequencers.AOP(coord_tokenizer=CoordTokenizers.CTT()),
+	)
+	element = tokenizer.prompt_sequencer
+	name: str = element.name
+	elements: list[_TokenizerElement] = element.tokenizer_elements()
+	element_hash: int = hash(element)
+	# memoized values are not members, so they don't show up in the name
+	assert "_name" in element.__dict__
+	assert hash(element.__dict__["_hash"]) == element_hash
+	for sub_element in elements:
+		hash(sub_element)
+		assert "_hash" in sub_element.__dict__
+	assert "_name" not in element._fields()
+	assert element.name == name
+	assert element.tokenizer_elements() == elements
+	assert element == PromptSequencers.AOP(coord_tokenizer=CoordTokenizers.CTT())
+	assert tokenizer.hash_int() == tokenizer.hash_int()
+	assert tokenizer.name == MazeTokenizerModular.from_name(tokenizer.name).name